@@ -1,20 +1,34 @@
-from fastapi import Depends, HTTPException, status
+from contextvars import ContextVar
+from typing import Callable, Sequence
+
+from fastapi import Depends, Header, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
 from app.core.security import get_security_service
+from app.core.config import get_settings
+from app.core.serialization import parse_fields, parse_includes, parse_ids, InvalidFieldsError
+from app.core.versioning import parse_if_match
 from app.repository.user_repository import UserRepository
+from app.models.user import User
 from app.core.constants import ERROR_MESSAGES, RoleEnum
 
 
 
 security = HTTPBearer()
 
+# Set by the batch endpoint: its sub-requests, sent with the batch's own token, reuse its user
+authenticated_user: ContextVar[User | None] = ContextVar("authenticated_user", default=None)
+
 async def get_current_user(
     credentials:HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_session)
 ):
     """Dependency to get authenticated user from JWT token."""
+    user = authenticated_user.get()
+    if user is not None:
+        return user
+
     token = credentials.credentials
     payload = get_security_service().decode_token(token=token)
     
@@ -35,7 +49,8 @@ async def get_current_user(
         )
         
     repo = UserRepository(session=session)
-    user = await repo.get_by_id(int(user_id))
+    # Not from the entity cache: a deactivated or demoted user must be refused at once
+    user = await repo.get_by_id(int(user_id), cached=False)
     
     if not user:
         raise HTTPException(
@@ -71,3 +86,69 @@ def require_role(*roles:RoleEnum):
             )
         return current_user
     return role_checker
+
+
+
+def sparse_fields(allowed: Sequence[str]) -> Callable[..., list[str]]:
+    """Dependency parsing ``?fields=`` against a schema's allowlist (400 on unknown fields)."""
+    def dependency(
+        fields: str | None = Query(
+            None,
+            description=f"Comma-separated fields to return (id is always included). Allowed: {', '.join(allowed)}"
+        )
+    ) -> list[str]:
+        try:
+            return parse_fields(fields, allowed)
+        except InvalidFieldsError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return dependency
+
+
+def includes(allowed: Sequence[str]) -> Callable[..., list[str]]:
+    """Dependency parsing ``?include=`` against the related resources a route can embed (400 on unknown ones)."""
+    def dependency(
+        include: str | None = Query(
+            None,
+            description=f"Comma-separated related resources to embed. Allowed: {', '.join(allowed)}"
+        )
+    ) -> list[str]:
+        try:
+            return parse_includes(include, allowed)
+        except InvalidFieldsError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    return dependency
+
+
+def id_list(
+        ids: str | None = Query(
+            None,
+            description="Comma-separated ids to fetch together; missing or inaccessible ones are left out"
+        )
+) -> list[int]:
+    """Dependency parsing ``?ids=`` for multi-get (400 on non-integers or too many ids)."""
+    try:
+        return parse_ids(ids, get_settings().multi_get_max_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def expected_version(
+        if_match: str | None = Header(None, description='Version to update from, as returned in ETag, e.g. "3"')
+) -> int | None:
+    """Dependency parsing ``If-Match`` into the version an update expects (400 if malformed)."""
+    try:
+        return parse_if_match(if_match)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
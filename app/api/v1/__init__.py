@@ -1,5 +1,5 @@
 from fastapi import  APIRouter
-from app.api.v1 import auth, users, tasks, projects, health
+from app.api.v1 import auth, users, tasks, projects, health, portfolio, jobs, profiles, batch
 
 api_v1_router = APIRouter(prefix="/api/v1")
 
@@ -7,6 +7,10 @@ api_v1_router = APIRouter(prefix="/api/v1")
 api_v1_router.include_router(users.router)
 api_v1_router.include_router(auth.router)
 api_v1_router.include_router(tasks.router)
+api_v1_router.include_router(tasks.lookup_router)
 api_v1_router.include_router(projects.router)
 api_v1_router.include_router(health.router)
-
+api_v1_router.include_router(portfolio.router)
+api_v1_router.include_router(jobs.router)
+api_v1_router.include_router(profiles.router)
+api_v1_router.include_router(batch.router)
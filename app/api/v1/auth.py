@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
 from app.schemas import UserCreate, TokenRequest, TokenResponse, TokenRefreshRequest, ErrorResponse
 from app.services.auth_service import AuthService
+from app.core.idempotency import idempotent
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -15,6 +16,7 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
         400:{"model":ErrorResponse, "description":"Email or username already exists"}
     }
 )
+@idempotent
 async def register(
     user_data:UserCreate,
     session: AsyncSession = Depends(get_session)
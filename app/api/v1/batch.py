@@ -0,0 +1,184 @@
+"""Many API calls in one round trip.
+
+Sub-requests go through the whole app, middleware included, as if sent
+separately with the batch's own token, except that:
+
+* the batch authenticates once, and its sub-requests reuse that user;
+* writes (anything but GET) run one at a time, in order, on the batch's
+  session, with its identity map cleared after each one;
+* runs of consecutive GETs run concurrently, at most
+  ``BATCH_READ_CONCURRENCY`` at a time, each on its own session. A write
+  waits for the reads before it, and the reads after it see its effects.
+
+Responses come back in request order. A failing sub-request does not stop
+the others.
+"""
+import asyncio
+import json
+import logging
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Message
+
+from app.api.dependencies import get_current_user, authenticated_user
+from app.core.config import get_settings
+from app.core.database import get_session, shared_session
+from app.core.dataloader import clear_loaders
+from app.core.query_stats import query_budget
+from app.core.serialization import encode, negotiated_response, JSON_MEDIA_TYPE
+from app.schemas import BatchRequest, BatchSubRequest, BatchResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+API_PREFIX = "/api/v1/"
+# Set from the batch itself, not from the sub-request's headers
+RESERVED_HEADERS = frozenset({"authorization", "host", "content-type", "content-length", "accept", "accept-encoding"})
+
+
+def _validate(sub: BatchSubRequest) -> str | None:
+    """Why a sub-request cannot run, if it cannot."""
+    path = sub.path.partition("?")[0]
+    if not path.startswith(API_PREFIX):
+        return f"path must start with {API_PREFIX}"
+    if path.rstrip("/") == API_PREFIX + "batch":
+        return "batches cannot be nested"
+    return None
+
+
+async def _dispatch(request: Request, sub: BatchSubRequest) -> dict[str, Any]:
+    """Run one sub-request through the app and collect its response."""
+    path, _, query = sub.path.partition("?")
+    body = b"" if sub.body is None else encode(sub.body, JSON_MEDIA_TYPE)
+    headers = [
+        (b"host", request.headers.get("host", "").encode("latin-1")),
+        (b"authorization", request.headers["authorization"].encode("latin-1")),
+        (b"accept", JSON_MEDIA_TYPE.encode("latin-1")),
+        (b"content-type", JSON_MEDIA_TYPE.encode("latin-1")),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in sub.headers.items() if name.lower() not in RESERVED_HEADERS
+    ]
+    scope = {
+        "type": "http",
+        "asgi": request.scope["asgi"],
+        "http_version": request.scope["http_version"],
+        "scheme": request.scope["scheme"],
+        "method": sub.method,
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "root_path": request.scope.get("root_path", ""),
+        "query_string": query.encode("latin-1"),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+    }
+
+    request_sent = False
+    finished = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Nobody disconnects until the response is complete
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    status_code = 500
+    response_headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+
+    async def send(message: Message) -> None:
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            response_headers.update(
+                (name.decode("latin-1"), value.decode("latin-1"))
+                for name, value in message["headers"] if name.lower() != b"content-length"
+            )
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app's error middleware has already answered 500
+        logger.exception("Batch sub-request %s %s failed", sub.method, sub.path)
+    finally:
+        finished.set()
+
+    content = b"".join(chunks)
+    if not content:
+        response_body = None
+    elif response_headers.get("content-type", "").startswith(JSON_MEDIA_TYPE):
+        response_body = json.loads(content)
+    else:
+        response_body = content.decode("utf-8", errors="replace")
+    return {"status": status_code, "headers": response_headers, "body": response_body}
+
+
+async def run_batch(request: Request, session: AsyncSession, subs: list[BatchSubRequest]) -> list[dict[str, Any]]:
+    """Run the sub-requests (see module docstring); responses in request order."""
+    results: list[dict[str, Any] | None] = [None] * len(subs)
+    semaphore = asyncio.Semaphore(get_settings().batch_read_concurrency)
+
+    async def read(index: int, sub: BatchSubRequest) -> None:
+        async with semaphore:
+            results[index] = await _dispatch(request, sub)
+
+    reads: list[asyncio.Task] = []
+    for index, sub in enumerate(subs):
+        if sub.method == "GET":
+            reads.append(asyncio.create_task(read(index, sub)))
+            continue
+        await asyncio.gather(*reads)
+        reads = []
+        token = shared_session.set(session)
+        try:
+            results[index] = await _dispatch(request, sub)
+        finally:
+            shared_session.reset(token)
+            # Next write starts clean: no objects the previous one left stale, no open transaction
+            session.expunge_all()
+            clear_loaders(session)
+            await session.rollback()
+    await asyncio.gather(*reads)
+    return results
+
+
+@router.post("", response_model=BatchResponse)
+@query_budget(1)
+async def batch(
+        batch_request: BatchRequest,
+        request: Request,
+        session: AsyncSession = Depends(get_session),
+        current_user = Depends(get_current_user)
+):
+    """Run up to ``BATCH_MAX_REQUESTS`` API calls in one request; their responses come back in order."""
+    subs = batch_request.requests
+    max_requests = get_settings().batch_max_requests
+    if len(subs) > max_requests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch holds at most {max_requests} requests"
+        )
+    for index, sub in enumerate(subs):
+        problem = _validate(sub)
+        if problem:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"requests[{index}]: {problem}")
+
+    # Detached with its attributes loaded: a sub-request rolling back the session cannot expire it
+    session.expunge(current_user)
+    token = authenticated_user.set(current_user)
+    try:
+        responses = await run_batch(request, session, subs)
+    finally:
+        authenticated_user.reset(token)
+    return negotiated_response({"responses": responses})
@@ -1,4 +1,10 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_session
+from app.core.health import readiness_probe
+from app.core.query_stats import query_budget
+from app.core.serialization import negotiated_response
+from app.schemas import LivenessResponse, ReadinessResponse
 
 router = APIRouter(tags=["health"])
 
@@ -6,4 +12,30 @@ router = APIRouter(tags=["health"])
 @router.get("/health", status_code=status.HTTP_200_OK)
 async def health_check():
     """Health check endpoint"""
-    return {"status":"healthy", "message": "API is running"}
\ No newline at end of file
+    return {"status":"healthy", "message": "API is running"}
+
+
+@router.get("/health/live", response_model=LivenessResponse)
+async def liveness():
+    """Liveness probe: the process is up and its event loop answers (no dependencies checked)."""
+    return LivenessResponse()
+
+
+@router.get(
+    "/health/ready",
+    response_model=ReadinessResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessResponse}}
+)
+@query_budget(1)
+async def readiness(
+        session: AsyncSession = Depends(get_session)
+):
+    """Readiness probe: database ping, pool saturation and event-loop lag, cached briefly.
+
+    Answers 503 while the worker should get no traffic.
+    """
+    report = await readiness_probe.check(session)
+    return negotiated_response(
+        report.as_dict(),
+        status_code=status.HTTP_200_OK if report.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
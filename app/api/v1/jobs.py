@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_session
+from app.api.dependencies import get_current_user
+from app.schemas import JobResponse
+from app.services.job_service import JobService
+from app.core.query_stats import query_budget
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+@query_budget(2)
+async def get_job(
+        job_id:int,
+        session:AsyncSession = Depends(get_session),
+        current_user = Depends(get_current_user)
+):
+    """Get the status of a background job."""
+    service = JobService(session)
+
+    try:
+        job = await service.get_job(job_id, current_user.id, current_user.role)
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
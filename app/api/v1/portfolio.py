@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_session
+from app.api.dependencies import get_admin_user
+from app.schemas import OwnerPortfolioResponse
+from app.services.portfolio_service import PortfolioService
+from app.core.query_stats import query_budget
+
+router = APIRouter(prefix="/portfolio", tags=["portfolio"])
+
+
+@router.get("/owners", response_model=dict)
+@query_budget(3)
+async def list_owner_portfolios(
+        skip:int = 0,
+        limit:int = 100,
+        session:AsyncSession = Depends(get_session),
+        current_user = Depends(get_admin_user)
+):
+    """Task breakdown per project owner (admin only)."""
+    limit = min(limit, 100)
+    service = PortfolioService(session)
+    return await service.list_owner_portfolios(skip=skip, limit=limit)
+
+
+
+@router.get("/owners/{owner_id}", response_model=OwnerPortfolioResponse)
+@query_budget(2)
+async def get_owner_portfolio(
+        owner_id:int,
+        session:AsyncSession = Depends(get_session),
+        current_user = Depends(get_admin_user)
+):
+    """Task breakdown across one owner's projects (admin only)."""
+    service = PortfolioService(session)
+    return await service.get_owner_portfolio(owner_id)
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from app.api.dependencies import get_admin_user
+from app.core.profiling import get_profile_store
+from app.core.constants import ERROR_MESSAGES
+from app.schemas import ProfileResponse
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+
+@router.get("", response_model=list[ProfileResponse])
+async def list_profiles(
+        current_user = Depends(get_admin_user)
+):
+    """List stored request profiles, newest first (admin only)."""
+    return get_profile_store().list()
+
+
+@router.get("/{profile_id}", response_class=FileResponse)
+async def download_profile(
+        profile_id:str,
+        current_user = Depends(get_admin_user)
+):
+    """Download a request profile as an HTML call tree (admin only)."""
+    profile = get_profile_store().get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES["NOT_FOUND"]
+        )
+    return FileResponse(profile.path, media_type="text/html", filename=profile.path.name)
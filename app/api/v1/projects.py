@@ -1,14 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
-from app.api.dependencies import get_current_user
-from app.schemas import ProjectCreate, ProjectUpdate, ProjectResponse
+from app.core.serialization import negotiated_response
+from app.api.dependencies import get_current_user, sparse_fields, includes, id_list, expected_version
+from app.schemas import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse, ProjectStatsResponse, ProjectDetailPage,
+    JobAcceptedResponse, PROJECT_FIELDS, PROJECT_INCLUDES
+)
 from app.services.project_service import ProjectService
 from app.core.constants import ERROR_MESSAGES
+from app.core.query_stats import query_budget
+from app.core.idempotency import idempotent
+from app.core.versioning import VersionConflictError, requested_version, etag
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(3)
+@idempotent
 async def create_project(
         project_data:ProjectCreate,
         session:AsyncSession = Depends(get_session),
@@ -25,13 +34,16 @@ async def create_project(
 
 
 
-@router.get("/{project_id}", response_model=ProjectResponse)
+@router.get("/{project_id}", response_model=ProjectDetailResponse)
+@query_budget(6)
 async def get_project(
         project_id:int,
+        fields: list[str] = Depends(sparse_fields(PROJECT_FIELDS)),
+        include: list[str] = Depends(includes(PROJECT_INCLUDES)),
         session:AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """Get project details."""
+    """Get project details, optionally only the requested fields, with the included related resources."""
     service = ProjectService(session)
     has_access = await service.verify_project_access(project_id,current_user.id, current_user.role)
 
@@ -40,7 +52,7 @@ async def get_project(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this project"
         )
-    project = await service.get_project(project_id)
+    project = await service.get_project_document(project_id, fields, include)
 
     if not project:
         raise HTTPException(
@@ -48,70 +60,124 @@ async def get_project(
             detail="Project Not found"
         )
 
-    return project
+    return negotiated_response(project)
+
 
 
+@router.get("/{project_id}/stats", response_model=ProjectStatsResponse)
+@query_budget(3)
+async def get_project_stats(
+        project_id:int,
+        session:AsyncSession = Depends(get_session),
+        current_user = Depends(get_current_user)
+):
+    """Get dashboard aggregates for a project's tasks."""
+    service = ProjectService(session)
+    has_access = await service.verify_project_access(project_id,current_user.id, current_user.role)
+
+    if not has_access:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this project"
+        )
 
-@router.get("",response_model=dict)
+    return await service.get_project_stats(project_id)
+
+
+
+@router.get("",response_model=ProjectDetailPage)
+@query_budget(5)
 async def list_user_projects(
         skip:int = 0,
         limit: int = 100,
+        fields: list[str] = Depends(sparse_fields(PROJECT_FIELDS)),
+        include: list[str] = Depends(includes(PROJECT_INCLUDES)),
+        ids: list[int] = Depends(id_list),
         session:AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """List all projects owned by current user."""
-    limit = min(limit,100)
+    """List all projects owned by current user, with the included related resources.
+    
+    With ``?ids=``, get those projects instead (any you can access, in that order).
+    """
     service = ProjectService(session)
-    return await service.list_user_projects(current_user.id,skip,limit)
+    if ids:
+        return negotiated_response(
+            await service.get_projects_by_ids(ids, current_user.id, current_user.role, fields=fields, includes=include)
+        )
+    limit = min(limit,100)
+    return negotiated_response(
+        await service.list_user_projects(current_user.id, skip, limit, fields=fields, includes=include)
+    )
 
 
 
 
 @router.put("/{project_id}",response_model=ProjectResponse)
+@query_budget(5)
+@idempotent
 async def update_project(
         project_id:int,
         project_data: ProjectUpdate,
+        response: Response,
+        if_match: int | None = Depends(expected_version),
         session:AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """Update project details."""
+    """Update project details; with If-Match (or ``version``) only if nobody changed it since (409 otherwise)."""
     service = ProjectService(session)
+    changes = project_data.model_dump(exclude_unset=True)
 
     try:
+        version = requested_version(if_match, changes.pop("version", None))
         project = await service.update_project(
             project_id,
             owner_id=current_user.id,
             user_role=current_user.role,
-            **project_data.model_dump(exclude_unset=True)
+            version=version,
+            **changes
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except PermissionError as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
+    except VersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"ETag": etag(e.current_version)}
+        )
 
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
+    response.headers["ETag"] = etag(project.version)
     return project
 
 
 
 
 
-@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{project_id}", response_model=JobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
 async  def delete_project(
         project_id:int,
+        response:Response,
         session: AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """Delete a project."""
+    """Delete a project in the background; poll the returned job."""
     service = ProjectService(session)
 
     try:
-        result = await service.delete_project(
+        job = await service.delete_project(
             project_id,
             owner_id=current_user.id,
             user_role=current_user.role
@@ -122,9 +188,10 @@ async  def delete_project(
             detail=str(e)
         )
 
-    if not result:
+    if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
-
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return JobAcceptedResponse(job_id=job.id, status=job.status)
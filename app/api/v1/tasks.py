@@ -1,17 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.core.database import  get_session
-from app.api.dependencies import get_current_user
-from app.schemas import TaskCreate, TaskUpdate, TaskResponse
+from app.core.serialization import negotiated_response, stream_response
+from app.api.dependencies import get_current_user, sparse_fields, id_list, expected_version
+from app.schemas import TaskCreate, TaskUpdate, TaskResponse, TaskFilter, TaskBulkStatusUpdate, TaskPage, JobAcceptedResponse, TASK_FIELDS
 from app.services.task_service import TaskService
-from app.core.constants import TaskStatusEnum
+from app.repository.task_filters import InvalidTaskFilterError
+from app.core.constants import TaskStatusEnum, TaskPriorityEnum
+from app.core.query_stats import query_budget
+from app.core.idempotency import idempotent
+from app.core.versioning import VersionConflictError, requested_version, etag
 
 router = APIRouter(prefix="/projects/{project_id}/tasks", tags=["tasks"])
+# Task routes not scoped to one project
+lookup_router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+def task_filter_params(
+        status_filter: TaskStatusEnum | None = Query(None, alias="status"),
+        priority: TaskPriorityEnum | None = None,
+        assignee_id: int | None = None,
+        overdue: bool = False,
+        due_after: datetime | None = None,
+        due_before: datetime | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_after: datetime | None = None,
+        updated_before: datetime | None = None,
+        sort: str | None = Query(
+            None,
+            description="created_at, updated_at or due_date, prefix with '-' for descending. "
+                        "Defaults to the range-filtered column, else -created_at."
+        )
+) -> TaskFilter:
+    """Collect task list filters from query parameters."""
+    return TaskFilter(
+        status=status_filter,
+        priority=priority,
+        assignee_id=assignee_id,
+        overdue=overdue,
+        due_after=due_after,
+        due_before=due_before,
+        created_after=created_after,
+        created_before=created_before,
+        updated_after=updated_after,
+        updated_before=updated_before,
+        sort=sort
+    )
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(5)
+@idempotent
 async def create_task(
         project_id:int,
         task_data: TaskCreate,
@@ -40,14 +85,71 @@ async def create_task(
         )
 
 
+@router.post("/bulk-status", response_model=JobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+@query_budget(4)
+async def bulk_update_task_status(
+        project_id:int,
+        update_data: TaskBulkStatusUpdate,
+        response: Response,
+        session:AsyncSession = Depends(get_session),
+        current_user = Depends(get_current_user)
+):
+    """Move all tasks with one status to another in the background; poll the returned job."""
+    service = TaskService(session)
+
+    try:
+        job = await service.bulk_update_status(
+            project_id,
+            from_status=update_data.from_status,
+            to_status=update_data.to_status,
+            user_id=current_user.id,
+            user_role=current_user.role
+        )
+    except (ValueError, PermissionError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND if isinstance(e, ValueError) else status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return JobAcceptedResponse(job_id=job.id, status=job.status)
+
+
+@router.get("/export", response_class=StreamingResponse)
+@query_budget(4)
+async def export_project_tasks(
+        project_id: int,
+        fields: list[str] = Depends(sparse_fields(TASK_FIELDS)),
+        session: AsyncSession = Depends(get_session),
+        current_user = Depends(get_current_user)
+):
+    """Stream every task of a project: one JSON object per line, or MessagePack maps."""
+    service = TaskService(session)
+
+    try:
+        batches = await service.export_project_tasks(
+            project_id,
+            current_user.id,
+            current_user.role,
+            fields=fields
+        )
+    except (ValueError, PermissionError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND if isinstance(e, ValueError) else status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    return stream_response(batches)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
+@query_budget(3)
 async def get_task(
         project_id: int,
         task_id: int,
+        fields: list[str] = Depends(sparse_fields(TASK_FIELDS)),
         session: AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """Get task details."""
+    """Get task details, optionally only the requested fields."""
     service = TaskService(session)
 
     try:
@@ -72,38 +174,45 @@ async def get_task(
             detail="Not authorized to access this project"
         )
 
-    task  = await service.get_task(task_id)
+    task = await service.get_task_fields(project_id, task_id, fields)
 
-    if not task or task.project_id != project_id:
+    if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    return  task
+    return negotiated_response(task)
 
 
-@router.get("",response_model=dict)
+@router.get("",response_model=TaskPage)
+@query_budget(4)
 async def list_project_tasks(
         project_id: int,
         skip: int = 0,
         limit: int = 100,
-        status_filter: TaskStatusEnum | None = Query(None,alias="status"),
+        filters: TaskFilter = Depends(task_filter_params),
+        fields: list[str] = Depends(sparse_fields(TASK_FIELDS)),
         session:AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """List all tasks in a project with optional status filter."""
+    """List tasks in a project, filtered and sorted by index-backed fields."""
     limit = min(limit, 100)
     service = TaskService(session)
 
     try:
-        return await service.list_project_tasks(
+        page = await service.list_project_tasks(
             project_id,
             current_user.id,
             current_user.role,
             skip,
             limit,
-            status_filter,
-
+            filters=filters,
+            fields=fields
+        )
+    except InvalidTaskFilterError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except (ValueError, PermissionError) as e:
         raise HTTPException(
@@ -111,44 +220,66 @@ async def list_project_tasks(
             detail=str(e)
 
         )
+    return negotiated_response(page)
 
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
+@query_budget(8)
+@idempotent
 async def update_task(
         project_id:int,
         task_id:int,
         task_data: TaskUpdate,
+        response: Response,
+        if_match: int | None = Depends(expected_version),
         session: AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
-    """Update task details."""
+    """Update task details; with If-Match (or ``version``) only if nobody changed it since (409 otherwise)."""
     service = TaskService(session)
+    changes = task_data.model_dump(exclude_unset=True)
 
     try:
+        version = requested_version(if_match, changes.pop("version", None))
         task = await service.update_task(
             task_id,
             user_id=current_user.id,
             user_role=current_user.role,
-            **task_data.model_dump(exclude_unset=True)
+            project_id=project_id,
+            version=version,
+            **changes
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except PermissionError as e:
         raise HTTPException(
             status_code = status.HTTP_403_FORBIDDEN,
             detail=str(e)
         )
+    except VersionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"ETag": etag(e.current_version)}
+        )
 
-    if not task or task.project_id != project_id:
+    if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task was not found!"
         )
 
+    response.headers["ETag"] = etag(task.version)
     return task
 
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(6)
 async def delete_task(
         task_id:int,
         session:AsyncSession = Depends(get_session),
@@ -174,4 +305,25 @@ async def delete_task(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
-        )
\ No newline at end of file
+        )
+
+
+
+@lookup_router.get("", response_model=TaskPage)
+@query_budget(3)
+async def get_tasks_by_ids(
+        ids: list[int] = Depends(id_list),
+        fields: list[str] = Depends(sparse_fields(TASK_FIELDS)),
+        session: AsyncSession = Depends(get_session),
+        current_user = Depends(get_current_user)
+):
+    """Get many tasks by id at once (``?ids=1,2,3``), in that order; ones you cannot see are left out."""
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids is required"
+        )
+    service = TaskService(session)
+    return negotiated_response(
+        await service.get_tasks_by_ids(ids, user_id=current_user.id, user_role=current_user.role, fields=fields)
+    )
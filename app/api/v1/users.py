@@ -1,24 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_session
-from app.api.dependencies import get_current_user, get_admin_user
-from app.schemas import UserResponse, UserUpdate
-from app.core.constants import ERROR_MESSAGES
+from app.core.serialization import negotiated_response
+from app.api.dependencies import get_current_user, get_admin_user, sparse_fields, id_list
+from app.schemas import UserResponse, UserUpdate, UserPage, JobAcceptedResponse, USER_FIELDS
+from app.core.constants import ERROR_MESSAGES, RoleEnum
 from app.services.user_service import  UserService
+from app.core.query_stats import query_budget
+from app.core.idempotency import idempotent
 
 router = APIRouter(prefix="/users",tags=["users"])
 
 @router.get("/me",response_model=UserResponse)
+@query_budget(1)
 async def get_current_user_info(
+        fields: list[str] = Depends(sparse_fields(USER_FIELDS)),
         current_user=Depends(get_current_user)
 ):
-    """Get current authenticated user information."""
-    return current_user
+    """Get current authenticated user information, optionally only the requested fields."""
+    # Already loaded for authentication, so project it here rather than query again
+    return negotiated_response({field: getattr(current_user, field) for field in fields})
 
 
 @router.get("/{user_id}",response_model=UserResponse)
+@query_budget(2)
 async def get_user(
         user_id:int,
+        fields: list[str] = Depends(sparse_fields(USER_FIELDS)),
         session: AsyncSession = Depends(get_session),
         current_user = Depends(get_current_user)
 ):
@@ -30,7 +38,7 @@ async def get_user(
         )
 
     service  = UserService(session)
-    user = await service.get_user(user_id)
+    user = await service.get_user_fields(user_id, fields)
 
     if not user:
         raise HTTPException(
@@ -38,26 +46,44 @@ async def get_user(
             detail=ERROR_MESSAGES["NOT_FOUND"]
         )
 
-    return  user
+    return negotiated_response(user)
 
 
 
-@router.get("", response_model=dict)
+@router.get("", response_model=UserPage)
+@query_budget(3)
 async def list_users(
         skip:int = 0,
         limit: int = 100,
+        fields: list[str] = Depends(sparse_fields(USER_FIELDS)),
+        ids: list[int] = Depends(id_list),
         session: AsyncSession = Depends(get_session),
-        current_user = Depends(get_admin_user)
+        current_user = Depends(get_current_user)
 ):
-    """List all users (admin only)."""
-    limit = min(limit,100) # Max per page
+    """List all users (admin only), or with ``?ids=`` get those users in that order.
+    
+    Non-admins may only multi-get themselves; other ids are left out.
+    """
+    is_admin = current_user.role == RoleEnum.ADMIN
     service = UserService(session)
-    return await service.list_users(skip=skip,limit=limit)
+    if ids:
+        if not is_admin:
+            ids = [user_id for user_id in ids if user_id == current_user.id]
+        return negotiated_response(await service.get_users_by_ids(ids, fields=fields))
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=ERROR_MESSAGES["FORBIDDEN"]
+        )
+    limit = min(limit,100) # Max per page
+    return negotiated_response(await service.list_users(skip=skip, limit=limit, fields=fields))
 
 
 
 
 @router.put("/{user_id}",response_model=UserResponse)
+@query_budget(4)
+@idempotent
 async def update_user_profile(
         user_id: int,
         userUpdate:UserUpdate,
@@ -78,19 +104,41 @@ async def update_user_profile(
 
 
 
-@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{user_id}", response_model=JobAcceptedResponse, status_code=status.HTTP_202_ACCEPTED)
+@query_budget(8)
 async def deactivate_user(
         user_id:int,
+        response:Response,
+        reassign_to:int | None = None,
+        transfer_projects_to:int | None = None,
         session:AsyncSession = Depends(get_session),
         current_user = Depends(get_admin_user)
 ):
-    """Deactivate user account (admin only)"""
+    """Deactivate user account (admin only).
+
+    Open tasks are reassigned to ``reassign_to`` or unassigned, owned projects
+    transferred to ``transfer_projects_to`` or archived, and memberships
+    removed, by a background job.
+    """
     service = UserService(session)
-    result = await service.deactivate_user(user_id)
 
-    if not result:
+    try:
+        job = await service.deactivate_user(
+            user_id,
+            requested_by=current_user.id,
+            reassign_to=reassign_to,
+            transfer_projects_to=transfer_projects_to
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="NOT_FOUND"
         )
-
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return JobAcceptedResponse(job_id=job.id, status=job.status)
@@ -0,0 +1,35 @@
+"""Rebuild the portfolio task rollups from the tasks table.
+
+Mandatory once right after deploying the rollups (startup creates the
+table empty, so task writes before the rebuild would drive counts
+negative), and again after restoring data or whenever the rollups are
+suspected to have drifted:
+
+    python -m app.commands.rebuild_rollups
+"""
+import asyncio
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.base import Base
+from app.models import user, project, project_member, task, task_rollup  # noqa: F401 (register mappers)
+from app.repository.task_rollup_repository import TaskRollupRepository
+
+
+async def rebuild_rollups() -> int:
+    """Recompute all rollup buckets; returns how many were written."""
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSessionLocal() as session:
+            return await TaskRollupRepository(session=session).rebuild()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    buckets = asyncio.run(rebuild_rollups())
+    print(f"Rebuilt {buckets} task rollup buckets")
+
+
+if __name__ == "__main__":
+    main()
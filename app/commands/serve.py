@@ -0,0 +1,230 @@
+"""Production server: several uvicorn workers sharing one socket and one connection budget.
+
+    python -m app.commands.serve [--host 0.0.0.0] [--port 8000] [--workers N]
+
+``main.py`` is for development (one process, optional reload). This
+launcher:
+
+* imports the app and creates the schema once in the master, then forks
+  ``SERVER_WORKERS`` workers (default: one per CPU) that share the
+  preloaded code and the listening socket;
+* runs them on uvloop and httptools when installed;
+* splits ``DATABASE_MAX_CONNECTIONS`` (the connections this server may
+  hold in total, e.g. PostgreSQL ``max_connections`` minus headroom,
+  divided by the number of replicas) between the workers, capping each
+  worker's ``DATABASE_POOL_SIZE`` and ``DATABASE_MAX_OVERFLOW``; every
+  worker opens its pool at startup (``DATABASE_POOL_WARM``);
+* on SIGTERM or SIGINT, has every worker answer 503 on
+  ``/api/v1/health/ready`` for ``SERVER_DRAIN_SECONDS`` while still
+  serving, so load balancers stop routing to it, then stop accepting
+  connections and finish in-flight requests within
+  ``SERVER_GRACEFUL_TIMEOUT_SECONDS``;
+* restarts workers that die, but exits non-zero once more than
+  ``SERVER_MAX_RESTARTS`` happen within ``SERVER_RESTART_WINDOW_SECONDS``
+  (workers that crash on startup would otherwise restart forever), so
+  the process manager sees the failure.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.process import BaseProcess
+from types import FrameType
+
+import uvicorn
+
+from app.core.config import Settings
+
+logger = logging.getLogger("uvicorn.error")
+
+HANDLED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def worker_pool_sizes(budget: int, workers: int, pool_size: int, max_overflow: int) -> tuple[int, int]:
+    """Pool size and overflow per worker, so that all workers together stay within ``budget``.
+
+    The configured sizes are upper bounds; a budget of 0 leaves them as they are.
+    """
+    if budget <= 0:
+        return pool_size, max_overflow
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(f"DATABASE_MAX_CONNECTIONS={budget} leaves no connection for each of {workers} workers")
+    worker_pool = min(pool_size, per_worker)
+    return worker_pool, min(max_overflow, per_worker - worker_pool)
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that, on the first exit signal, keeps serving for a while as not ready."""
+
+    def __init__(self, config: uvicorn.Config, drain_seconds: float):
+        super().__init__(config)
+        self.drain_seconds = drain_seconds
+        self.drain_until: float | None = None
+
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        if self.drain_seconds > 0 and self.drain_until is None and not self.should_exit:
+            from app.core.health import readiness_probe
+
+            readiness_probe.draining = True
+            self.drain_until = time.monotonic() + self.drain_seconds
+            logger.info("Draining for %.1fs before shutting down", self.drain_seconds)
+            return
+        # No drain, or a second signal: shut down now
+        super().handle_exit(sig, frame)
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.drain_until is not None and time.monotonic() >= self.drain_until:
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+class RestartBudget:
+    """At most ``max_restarts`` restarts within any ``window_seconds``."""
+
+    def __init__(self, max_restarts: int, window_seconds: float):
+        self.max_restarts = max_restarts
+        self.window_seconds = window_seconds
+        self._restarts: deque[float] = deque()
+
+    def allow(self, now: float) -> bool:
+        """Record a restart at ``now``; False if it is one too many."""
+        while self._restarts and self._restarts[0] <= now - self.window_seconds:
+            self._restarts.popleft()
+        if len(self._restarts) >= self.max_restarts:
+            return False
+        self._restarts.append(now)
+        return True
+
+
+class Supervisor:
+    """Fork the workers, restart the ones that die, and stop them all on a signal."""
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        sock: socket.socket,
+        workers: int,
+        drain_seconds: float,
+        graceful_timeout: int,
+        restarts: RestartBudget
+    ):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self.drain_seconds = drain_seconds
+        self.graceful_timeout = graceful_timeout
+        self.restarts = restarts
+        self.processes: list[BaseProcess] = []
+        self.should_exit = threading.Event()
+        # Fork: workers start from the master's preloaded modules
+        self._context = multiprocessing.get_context("fork")
+
+    def _serve(self) -> None:
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, signal.SIG_DFL)
+        DrainingServer(self.config, self.drain_seconds).run(sockets=[self.sock])
+
+    def _spawn(self) -> BaseProcess:
+        process = self._context.Process(target=self._serve, name="nexus-worker")
+        process.start()
+        logger.info("Started worker [%s]", process.pid)
+        return process
+
+    def _signal(self, sig: int, frame: FrameType | None) -> None:
+        self.should_exit.set()
+
+    def run(self) -> int:
+        """Serve until a signal, or until workers die too often; the exit code."""
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, self._signal)
+        self.processes = [self._spawn() for _ in range(self.workers)]
+
+        exit_code = 0
+        while not self.should_exit.wait(0.5):
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                if not self.restarts.allow(time.monotonic()):
+                    logger.error(
+                        "Worker [%s] exited with %s, more than %d restarts within %.0fs: giving up",
+                        process.pid, process.exitcode, self.restarts.max_restarts, self.restarts.window_seconds
+                    )
+                    exit_code = 1
+                    self.should_exit.set()
+                    break
+                logger.warning("Worker [%s] exited with %s, restarting", process.pid, process.exitcode)
+                self.processes[index] = self._spawn()
+
+        for process in self.processes:
+            if process.is_alive():
+                # SIGTERM
+                process.terminate()
+        deadline = time.monotonic() + self.drain_seconds + self.graceful_timeout + 5
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.error("Worker [%s] did not stop in time, killing it", process.pid)
+                process.kill()
+                process.join()
+        logger.info("Stopped %d workers", len(self.processes))
+        return exit_code
+
+
+async def _prepare() -> None:
+    """Create the schema once, before the workers start, and leave no connection to inherit."""
+    from app.core.database import engine
+    from app.models.base import Base
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    settings = Settings()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=settings.server_workers or os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pool_size, max_overflow = worker_pool_sizes(
+        settings.database_max_connections, args.workers, settings.database_pool_size, settings.database_max_overflow
+    )
+    # Before anything reads the settings: every worker inherits these
+    os.environ["DATABASE_POOL_SIZE"] = str(pool_size)
+    os.environ["DATABASE_MAX_OVERFLOW"] = str(max_overflow)
+
+    from app.main import app
+
+    config = uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        proxy_headers=True,
+        timeout_graceful_shutdown=settings.server_graceful_timeout_seconds
+    )
+    logger.info(
+        "Serving on %s:%d with %d workers, database pool %d + %d overflow each",
+        args.host, args.port, args.workers, pool_size, max_overflow
+    )
+    asyncio.run(_prepare())
+    sock = config.bind_socket()
+    restarts = RestartBudget(settings.server_max_restarts, settings.server_restart_window_seconds)
+    sys.exit(Supervisor(
+        config, sock, args.workers, settings.server_drain_seconds, settings.server_graceful_timeout_seconds, restarts
+    ).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Bring an existing database up to the current models.
+
+``Base.metadata.create_all`` (run at startup) only creates missing tables;
+it never adds columns or indexes to tables that already exist, nor drops
+retired ones. Run this once after deploying a release that changes them:
+
+    python -m app.commands.upgrade_schema
+
+Every step is idempotent. On PostgreSQL, indexes are built with
+``CREATE INDEX CONCURRENTLY`` and foreign keys whose ``ON DELETE`` rule
+changed are re-added ``NOT VALID`` and validated separately, so large
+tables stay writable. SQLite cannot alter constraints; rebuild the
+database there to pick up new rules.
+"""
+import asyncio
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateColumn
+
+from app.core.database import engine
+from app.models.base import Base
+from app.models import user, project, project_member, task, task_rollup, deadline_scan_state, job, idempotency_key  # noqa: F401 (register mappers)
+
+# Indexes superseded by newer ones, dropped per table
+RETIRED_INDEXES = {
+    # Covered by ix_task_project_status_created / ix_task_project_status_due
+    "tasks": ["ix_task_project_status", "ix_task_project_assignee_status", "ix_task_project_priority_status"],
+}
+
+# Columns no longer mapped, dropped per table
+RETIRED_COLUMNS = {
+    "deadline_scan_state": ["due_soon_task_id"],
+}
+
+
+def _missing_columns(conn: Connection) -> list[str]:
+    """ALTER TABLE statements for model columns the database lacks or no longer maps."""
+    inspector = inspect(conn)
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                statements.append(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+        for name in RETIRED_COLUMNS.get(table.name, []):
+            if name in existing:
+                statements.append(f"ALTER TABLE {table.name} DROP COLUMN {name}")
+    return statements
+
+
+def _index_changes(conn: Connection) -> tuple[list, list[str]]:
+    """Model indexes to create and retired indexes to drop."""
+    inspector = inspect(conn)
+    to_create, to_drop = [], []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        to_create.extend(i for i in table.indexes if i.name not in existing)
+        to_drop.extend(name for name in RETIRED_INDEXES.get(table.name, []) if name in existing)
+    return to_create, to_drop
+
+
+def _foreign_key_changes(conn: Connection) -> list[str]:
+    """Statements re-adding foreign keys whose ON DELETE rule changed (PostgreSQL only)."""
+    if conn.dialect.name != "postgresql":
+        return []
+    inspector = inspect(conn)
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = inspector.get_foreign_keys(table.name)
+        for fk in table.foreign_key_constraints:
+            columns = [c.name for c in fk.columns]
+            current = next((f for f in existing if f["constrained_columns"] == columns), None)
+            if current is None or current["options"].get("ondelete") == fk.ondelete:
+                continue
+            referred = ", ".join(e.column.name for e in fk.elements)
+            ondelete = f" ON DELETE {fk.ondelete}" if fk.ondelete else ""
+            name = current["name"]
+            statements.append(
+                f"ALTER TABLE {table.name} DROP CONSTRAINT {name}, "
+                f"ADD CONSTRAINT {name} FOREIGN KEY ({', '.join(columns)}) "
+                f"REFERENCES {fk.referred_table.name} ({referred}){ondelete} NOT VALID"
+            )
+            statements.append(f"ALTER TABLE {table.name} VALIDATE CONSTRAINT {name}")
+    return statements
+
+
+async def upgrade_schema(db_engine: AsyncEngine = engine) -> list[str]:
+    """Apply pending schema changes; returns the statements executed."""
+    executed = []
+    try:
+        async with db_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for statement in await conn.run_sync(_missing_columns):
+                await conn.execute(text(statement))
+                executed.append(statement)
+            to_create, to_drop = await conn.run_sync(_index_changes)
+            foreign_keys = await conn.run_sync(_foreign_key_changes)
+
+        concurrently = " CONCURRENTLY" if db_engine.dialect.name == "postgresql" else ""
+        # CONCURRENTLY cannot run inside a transaction block
+        async with db_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for index in to_create:
+                columns = ", ".join(c.name for c in index.columns)
+                unique = "UNIQUE " if index.unique else ""
+                statement = (
+                    f"CREATE {unique}INDEX{concurrently} IF NOT EXISTS {index.name} "
+                    f"ON {index.table.name} ({columns})"
+                )
+                await conn.execute(text(statement))
+                executed.append(statement)
+            for name in to_drop:
+                statement = f"DROP INDEX{concurrently} IF EXISTS {name}"
+                await conn.execute(text(statement))
+                executed.append(statement)
+            # Each statement commits on its own: the validation scan holds no write lock
+            for statement in foreign_keys:
+                await conn.execute(text(statement))
+                executed.append(statement)
+    finally:
+        await db_engine.dispose()
+    return executed
+
+
+def main() -> None:
+    for statement in asyncio.run(upgrade_schema()):
+        print(statement)
+    print("Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from app.core.config import get_settings
+
+
+class TTLCache:
+    """Small in-process LRU cache with per-entry expiry.
+
+    Entries are only visible to the worker that stored them, and so are
+    invalidations: with several workers, another worker may serve a stale
+    entry until its TTL runs out. Keep the TTL short or run one worker
+    where that matters, or put a shared tier behind it (see
+    ``app.core.entity_cache``).
+
+    Writers call ``invalidate`` after committing. Readers take a ``token``
+    before querying and pass it to ``set``, so a result computed before a
+    concurrent invalidation is never stored.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Logical clock of the latest invalidation per key, bounded like the entries
+        self._clock = 0
+        self._invalidated: OrderedDict[Hashable, int] = OrderedDict()
+        self._forgotten = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value, or ``default`` if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def token(self) -> int:
+        """Current invalidation clock; take it before computing a value to ``set``."""
+        return self._clock
+
+    def set(self, key: Hashable, value: Any, token: int | None = None) -> bool:
+        """Store a value, evicting the least recently used entry when full.
+
+        With ``token``, the value is dropped if ``key`` was invalidated
+        since the token was taken. Returns whether it was stored.
+        """
+        if token is not None and self._invalidated.get(key, self._forgotten) > token:
+            return False
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+        self._clock += 1
+        self._invalidated[key] = self._clock
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > self.maxsize:
+            # Keys whose clock is forgotten are treated as just invalidated
+            _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+        self._clock += 1
+        self._invalidated.clear()
+        self._forgotten = self._clock
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Per-project task aggregates, invalidated by TaskRepository writes
+project_stats_cache = TTLCache(
+    ttl_seconds=get_settings().project_stats_cache_ttl_seconds,
+    maxsize=get_settings().project_stats_cache_size
+)
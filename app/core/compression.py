@@ -0,0 +1,269 @@
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: brotli is only offered when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is only offered when installed
+    zstandard = None
+
+
+# Content types that are already compressed; recompressing them only costs CPU
+COMPRESSED_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip", "application/zstd",
+    "application/x-bzip2", "application/x-xz", "application/x-7z-compressed",
+)
+UNCOMPRESSED_IMAGE_TYPES = ("image/svg+xml", "image/bmp")
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Compress a chunk; with ``flush`` everything so far is emitted."""
+
+    def finish(self) -> bytes:
+        """End the compressed stream."""
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.process(data)
+        return out + self._compressor.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else out
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encoders() -> dict[str, Callable[[], Encoder]]:
+    """Encoder factories by content-coding, in server preference order."""
+    settings = get_settings()
+    encoders: dict[str, Callable[[], Encoder]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = lambda: _ZstdEncoder(settings.compression_zstd_level)
+    if brotli is not None:
+        encoders["br"] = lambda: _BrotliEncoder(settings.compression_brotli_quality)
+    encoders["gzip"] = lambda: _GzipEncoder(settings.compression_gzip_level)
+    return encoders
+
+
+def negotiate_encoding(accept_encoding: str | None, offered: list[str]) -> str | None:
+    """Pick the client's highest-ranked coding among ``offered`` (ties go to offer order)."""
+    if not accept_encoding:
+        return None
+    ranks: dict[str, float] = {}
+    for coding_range in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in coding_range.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranks[coding.lower()] = q
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = ranks.get(coding, ranks.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+@dataclass
+class EncodingStats:
+    responses: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    cpu_seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        """Uncompressed bytes per compressed byte."""
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+
+@dataclass
+class CompressionStats:
+    """Process-wide compression counters, per content-coding and per skip reason."""
+    encodings: dict[str, EncodingStats] = field(default_factory=dict)
+    skipped: dict[str, int] = field(default_factory=dict)
+
+    def record(self, coding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        stats = self.encodings.setdefault(coding, EncodingStats())
+        stats.bytes_in += bytes_in
+        stats.bytes_out += bytes_out
+        stats.cpu_seconds += cpu_seconds
+
+    def skip(self, reason: str) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Compress responses with zstd, brotli or gzip, as negotiated with Accept-Encoding.
+
+    Bodies under ``min_size`` bytes, responses that already carry a
+    Content-Encoding and already-compressed content types pass through.
+    Streamed bodies are compressed chunk by chunk, each flushed so clients
+    get data as it is produced; only the first ``min_size`` bytes are held
+    back to decide whether compressing is worth it.
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int | None = None, stats: CompressionStats = compression_stats):
+        self.app = app
+        self.min_size = get_settings().compression_min_size if min_size is None else min_size
+        self.encoders = available_encoders()
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), list(self.encoders))
+        if coding is None:
+            self.stats.skip("not_accepted")
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, coding, send).run(scope, receive)
+
+
+class _CompressedResponse:
+    """Send-side state of one response going through CompressionMiddleware."""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Message | None = None
+        self.pending: list[bytes] = []
+        self.encoder: Encoder | None = None
+        self.passthrough = False
+        self.bytes_in = self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.on_send)
+
+    def _skip_reason(self, start: Message) -> str | None:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return "no_body"
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return "already_encoded"
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(COMPRESSED_CONTENT_TYPES) and not content_type.startswith(UNCOMPRESSED_IMAGE_TYPES):
+            return "compressed_content_type"
+        return None
+
+    def _compress(self, data: bytes, flush: bool, finish: bool) -> bytes:
+        began = time.thread_time()
+        out = self.encoder.compress(data, flush=flush and not finish)
+        if finish:
+            out += self.encoder.finish()
+        self.cpu_seconds += time.thread_time() - began
+        self.bytes_in += len(data)
+        self.bytes_out += len(out)
+        return out
+
+    async def on_send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            reason = self._skip_reason(message)
+            if reason:
+                self.middleware.stats.skip(reason)
+                self.passthrough = True
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            self.pending.append(body)
+            held = sum(len(chunk) for chunk in self.pending)
+            if more_body and held < self.middleware.min_size:
+                return
+            body = b"".join(self.pending)
+            self.pending = []
+            if held < self.middleware.min_size:
+                # The whole body turned out small: send it as it was
+                self.middleware.stats.skip("too_small")
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+
+            self.encoder = self.middleware.encoders[self.coding]()
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.coding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self._compress(body, flush=False, finish=True)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+                self._record()
+                return
+            await self.send(self.start)
+
+        compressed = self._compress(body, flush=True, finish=not more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+        if not more_body:
+            self._record()
+
+    def _record(self) -> None:
+        stats = self.middleware.stats
+        stats.encodings.setdefault(self.coding, EncodingStats()).responses += 1
+        stats.record(self.coding, self.bytes_in, self.bytes_out, self.cpu_seconds)
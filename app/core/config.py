@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import Literal
 from functools import lru_cache
@@ -21,6 +22,104 @@ class Settings(BaseSettings):
     database_echo:bool = False
     database_pool_size:int = 20
     database_max_overflow:int = 10
+    # Connections all workers of one server may hold together (0: no budget);
+    # app.commands.serve caps each worker's pool size and overflow to its share
+    database_max_connections:int = 0
+    # Open the pool's connections at startup instead of on the first requests
+    database_pool_warm:bool = True
+    
+    # Production server (python -m app.commands.serve)
+    server_host:str = "0.0.0.0"
+    server_port:int = 8000
+    # 0: one worker per CPU
+    server_workers:int = 0
+    # On SIGTERM: seconds of answering 503 on readiness while still serving, then
+    # seconds in-flight requests get to finish
+    server_drain_seconds:float = 0.0
+    server_graceful_timeout_seconds:int = 30
+    # Worker restarts allowed within the window; one more and the server exits non-zero
+    server_max_restarts:int = 10
+    server_restart_window_seconds:float = 60.0
+    
+    # Caching
+    project_stats_cache_ttl_seconds:int = 30
+    project_stats_cache_size:int = 4096
+    # Projects and users by id (app.core.entity_cache): per-worker tier in front of a shared one
+    entity_cache_enabled:bool = True
+    entity_cache_local_ttl_seconds:float = 5.0
+    entity_cache_local_size:int = 10000
+    # "" for no shared tier, "memory" for the in-process stand-in
+    entity_cache_shared_backend:Literal["", "memory"] = ""
+    entity_cache_shared_ttl_seconds:float = 60.0
+    
+    # Due-date scanner
+    deadline_scan_enabled:bool = True
+    deadline_scan_interval_seconds:int = 60
+    deadline_due_soon_minutes:int = 60
+    deadline_scan_batch_size:int = 500
+    deadline_lease_seconds:int = 180
+    deadline_wheel_tick_seconds:float = 1.0
+    
+    # Background jobs
+    jobs_enabled:bool = True
+    job_workers:int = 4
+    job_poll_interval_seconds:float = 1.0
+    job_lease_seconds:int = 300
+    job_max_attempts:int = 5
+    job_retry_base_seconds:float = 5.0
+    job_retry_max_seconds:float = 600.0
+    project_delete_batch_size:int = 5000
+    user_deactivation_batch_size:int = 5000
+    # Rows per query (and per streamed chunk) of task exports
+    export_batch_size:int = 1000
+    
+    # Idempotency-Key on create and update routes
+    idempotency_ttl_seconds:int = 86400
+    # How long a retry waits for the first request with its key before answering 409
+    idempotency_wait_seconds:float = 10.0
+    # A request processing a key holds it this long; past that its worker is presumed dead
+    idempotency_lock_seconds:int = 60
+    idempotency_cache_ttl_seconds:float = 60.0
+    idempotency_cache_size:int = 10000
+    idempotency_purge_interval_seconds:float = 300.0
+    idempotency_purge_batch_size:int = 1000
+    
+    # Most members and tasks returned per project with ?include=
+    include_members_limit:int = 100
+    include_tasks_limit:int = 50
+    
+    # Most ids per ?ids= multi-get
+    multi_get_max_ids:int = 100
+    
+    # POST /api/v1/batch
+    batch_max_requests:int = 50
+    # GET sub-requests run concurrently, each on its own pooled connection
+    batch_read_concurrency:int = 4
+    
+    # Readiness probe (GET /api/v1/health/ready)
+    readiness_cache_ttl_seconds:float = 2.0
+    readiness_db_timeout_seconds:float = 1.0
+    readiness_max_loop_lag_ms:float = 250.0
+    # Not ready once this fraction of the pool (size + overflow) is checked out
+    readiness_max_pool_saturation:float = 1.0
+    
+    # Metrics (Prometheus text format, unauthenticated: keep it off the public proxy)
+    metrics_enabled:bool = True
+    metrics_path:str = "/metrics"
+    
+    # Request profiling (off: the middleware is not installed at all)
+    profiling_enabled:bool = False
+    profiling_sample_rate:float = 0.0
+    profiling_interval_seconds:float = 0.001
+    profiling_dir:str = "/tmp/nexus-profiles"
+    profiling_max_files:int = 200
+    
+    # Response compression
+    compression_enabled:bool = True
+    compression_min_size:int = 1024
+    compression_gzip_level:int = 6
+    compression_brotli_quality:int = 4
+    compression_zstd_level:int = 3
     
     # Security
     secret_key:str = "your-super-key-change-in-prodcution"
@@ -36,6 +135,16 @@ class Settings(BaseSettings):
     cors_headers:list = ["*"]
     
     
+    @model_validator(mode="after")
+    def check_deadline_lease(self) -> "Settings":
+        """The scanner renews its lease once per pass, so a pass must come before it expires."""
+        if self.deadline_scan_interval_seconds >= self.deadline_lease_seconds:
+            raise ValueError(
+                "deadline_scan_interval_seconds must be shorter than deadline_lease_seconds"
+            )
+        return self
+    
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
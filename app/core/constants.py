@@ -15,6 +15,14 @@ class TaskStatusEnum(str, Enum):
     BLOCKED = "blocked"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
+
+
+# Statuses of tasks that are still being worked on (count as load and can be overdue)
+OPEN_TASK_STATUSES = (
+    TaskStatusEnum.OPEN,
+    TaskStatusEnum.IN_PROGRESS,
+    TaskStatusEnum.BLOCKED,
+)
     
     
 class TaskPriorityEnum(str,Enum):
@@ -34,6 +42,14 @@ class ProjectStatusEnum(str,Enum):
     ARCHIVED = "archived"
     
     
+class JobStatusEnum(str,Enum):
+    """Background job lifecycle."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    
+    
 # Pagination defaults
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
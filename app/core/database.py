@@ -1,17 +1,40 @@
+import asyncio
+import contextlib
+from contextvars import ContextVar
 from typing import Any, AsyncGenerator
 
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from app.core.config import get_settings
+from app.core.query_stats import instrument_engine
 
 settings = get_settings()
+
+
+def engine_options(database_url: str) -> dict[str, Any]:
+    """Pool sizing for server databases; SQLite (local runs, benchmarks) keeps SQLAlchemy's own pool.
+
+    SQLite has one writer at a time, so concurrent requests wait up to 30s
+    for the write lock instead of the driver's default 5s.
+    """
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {"connect_args": {"timeout": 30}}
+    return {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow
+    }
+
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.database_echo,
-    pool_size=settings.database_pool_size,
-    max_overflow=settings.database_max_overflow,
-    future=True
+    future=True,
+    **engine_options(settings.database_url)
 )
+# Per-request query counts and timings
+instrument_engine(engine.sync_engine)
 
 
 # Create async session factory
@@ -22,7 +45,28 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+async def warm_pool() -> int:
+    """Open the pool's steady-state connections now, so first requests skip connecting.
+
+    Returns how many were opened (none for pools that keep no connections, like SQLite's).
+    """
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+    async with contextlib.AsyncExitStack() as stack:
+        await asyncio.gather(*(stack.enter_async_context(engine.connect()) for _ in range(pool.size())))
+    return pool.size()
+
+
+# Set by the batch endpoint while it runs a write sub-request: its routes share the batch's session
+shared_session: ContextVar[AsyncSession | None] = ContextVar("shared_session", default=None)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession | Any, Any]:
     """Dependency to get database session."""
+    shared = shared_session.get()
+    if shared is not None:
+        yield shared
+        return
     async with AsyncSessionLocal() as session:
         yield session
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""Request-scoped batching of lookups by id.
+
+Services look entities up one id at a time, often the same id several
+times per request (access check, then the operation) and sometimes many
+ids at once. A ``DataLoader`` collects the keys requested in the same
+event-loop tick into one ``batch_load`` call (one ``IN`` query) and
+remembers each result, so every id is fetched at most once.
+
+Loaders live in the session's ``info`` (``session_loader``), so they share
+its lifetime: one request, with the default ``get_session``. Writes that
+change whether a lookup finds a row (soft deletes, deactivation) call
+``clear`` for it; updates need not, the loader holds the session's own
+identity-mapped object.
+"""
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, Mapping, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ValueT = TypeVar("ValueT")
+
+BatchLoad = Callable[[list[KeyT]], Awaitable[Mapping[KeyT, ValueT]]]
+
+
+class DataLoader(Generic[KeyT, ValueT]):
+    """Batch and cache loads by key (None for keys ``batch_load`` did not return)."""
+
+    def __init__(self, batch_load: BatchLoad, lock: asyncio.Lock | None = None):
+        self._batch_load = batch_load
+        # Loaders sharing a session share a lock: a session runs one statement at a time
+        self._lock = lock or asyncio.Lock()
+        self._futures: dict[KeyT, asyncio.Future] = {}
+        self._pending: list[tuple[KeyT, asyncio.Future]] = []
+
+    async def load(self, key: KeyT) -> ValueT | None:
+        return await self._future(key)
+
+    async def load_many(self, keys: Iterable[KeyT]) -> list[ValueT | None]:
+        """Values in key order, fetched together."""
+        return list(await asyncio.gather(*[self._future(key) for key in keys]))
+
+    def prime(self, key: KeyT, value: ValueT) -> None:
+        """Remember a value loaded some other way, unless the key is already known."""
+        if key not in self._futures:
+            future = self._futures[key] = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+
+    def clear(self, key: KeyT) -> None:
+        """Forget a key, so the next load fetches it again."""
+        self._futures.pop(key, None)
+
+    def _future(self, key: KeyT) -> asyncio.Future:
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._pending.append((key, future))
+            if len(self._pending) == 1:
+                # After the callbacks already queued: loads started in this tick join the batch
+                loop.call_soon(lambda: loop.create_task(self._dispatch()))
+        return future
+
+    async def _dispatch(self) -> None:
+        batch, self._pending = self._pending, []
+        try:
+            async with self._lock:
+                values = await self._batch_load([key for key, _ in batch])
+        except BaseException as exc:
+            for key, future in batch:
+                # Failures are not remembered
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+                if future.done():
+                    continue
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+        for key, future in batch:
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+def session_loader(session: AsyncSession, name: str, batch_load: BatchLoad) -> DataLoader:
+    """The session's loader called ``name``, created with ``batch_load`` on first use."""
+    loaders = session.info.setdefault("loaders", {})
+    loader = loaders.get(name)
+    if loader is None:
+        lock = session.info.setdefault("loader_lock", asyncio.Lock())
+        loader = loaders[name] = DataLoader(batch_load, lock=lock)
+    return loader
+
+
+def clear_loaders(session: AsyncSession) -> None:
+    """Forget everything the session's loaders hold."""
+    session.info.pop("loaders", None)
@@ -0,0 +1,250 @@
+"""Two-tier cache of entities looked up by id (projects and users).
+
+Every request resolves its user, and most a project, by id; the per-session
+DataLoader (``app.core.dataloader``) fetches each at most once per request,
+and this cache carries them across requests:
+
+* the local tier is a per-worker ``TTLCache``: LRU, with a short TTL since
+  other workers' invalidations never reach it;
+* the shared tier (optional, ``ENTITY_CACHE_SHARED_BACKEND``) is seen by
+  every worker. ``SharedCache`` is its interface; ``MemorySharedCache`` is
+  the in-process stand-in, for development and tests.
+
+Entries are column values, not ORM objects, so they can cross sessions and
+workers; ``attach`` turns them back into a session's instance without a
+query. Misses for the same id from concurrent requests share one load
+(singleflight). Repository writes call ``invalidate`` after committing,
+which drops both tiers; only other workers' local tiers can stay stale, for
+at most ``ENTITY_CACHE_LOCAL_TTL_SECONDS``.
+
+Entries leave out secrets (users' password hashes): those attributes are
+unloaded on attached instances, and whatever needs them (authentication)
+reads the row itself, uncached.
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Sequence
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+Values = dict[str, Any]
+Load = Callable[[list[int]], Awaitable[Mapping[int, Values]]]
+
+ENTITY_CACHE_LOOKUPS = registry.counter(
+    "entity_cache_lookups_total",
+    "Entity lookups by id, by entity and where they were answered "
+    "(local_hit, shared_hit, coalesced onto a concurrent load, or miss).",
+    ("entity", "result")
+)
+
+
+class SharedCache(ABC):
+    """A cache every worker sees (e.g. Redis), keyed by strings."""
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Values]:
+        """The live entries among the keys."""
+
+    @abstractmethod
+    async def set_many(self, values: Mapping[str, Values], ttl_seconds: float) -> None:
+        """Store entries for ``ttl_seconds``."""
+
+    @abstractmethod
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        """Drop entries, present or not."""
+
+
+class MemorySharedCache(SharedCache):
+    """Stand-in shared tier living in this process; shared only by the caches of one worker."""
+
+    def __init__(self):
+        self._entries: dict[str, tuple[float, Values]] = {}
+
+    async def get_many(self, keys: Sequence[str]) -> dict[str, Values]:
+        now = time.monotonic()
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry[0] <= now:
+                del self._entries[key]
+                continue
+            found[key] = entry[1]
+        return found
+
+    async def set_many(self, values: Mapping[str, Values], ttl_seconds: float) -> None:
+        expires_at = time.monotonic() + ttl_seconds
+        for key, value in values.items():
+            self._entries[key] = (expires_at, value)
+
+    async def delete_many(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class EntityCache:
+    """Column values of one entity by id: local tier, shared tier, then one batched load."""
+
+    def __init__(
+        self,
+        name: str,
+        local: TTLCache,
+        shared: SharedCache | None = None,
+        shared_ttl_seconds: float = 60.0,
+        enabled: bool = True
+    ):
+        self.name = name
+        self.local = local
+        self.shared = shared
+        self.shared_ttl_seconds = shared_ttl_seconds
+        self.enabled = enabled
+        self._inflight: dict[int, asyncio.Future] = {}
+
+    def _key(self, entity_id: int) -> str:
+        return f"{self.name}:{entity_id}"
+
+    def _count(self, result: str, amount: int) -> None:
+        if amount:
+            ENTITY_CACHE_LOOKUPS.inc((self.name, result), amount)
+
+    async def get_many(self, ids: Sequence[int], load: Load) -> dict[int, Values | None]:
+        """Values of the given ids, None for those ``load`` did not return.
+
+        ``load`` fetches the ids missing from both tiers (in one query) and
+        is not called for ids another request is already loading.
+        """
+        if not self.enabled:
+            loaded = await load(list(ids))
+            return {entity_id: loaded.get(entity_id) for entity_id in ids}
+
+        # Taken first: values read before a concurrent invalidation are not stored
+        token = self.local.token()
+        found: dict[int, Values | None] = {}
+        for entity_id in ids:
+            value = self.local.get(entity_id)
+            if value is not None:
+                found[entity_id] = value
+        self._count("local_hit", len(found))
+
+        missing = [entity_id for entity_id in ids if entity_id not in found]
+        if missing and self.shared is not None:
+            shared = await self.shared.get_many([self._key(entity_id) for entity_id in missing])
+            for entity_id in missing:
+                value = shared.get(self._key(entity_id))
+                if value is not None:
+                    found[entity_id] = value
+                    self.local.set(entity_id, value, token=token)
+            self._count("shared_hit", len(shared))
+            missing = [entity_id for entity_id in missing if entity_id not in found]
+
+        waiting = {entity_id: self._inflight[entity_id] for entity_id in missing if entity_id in self._inflight}
+        owned = [entity_id for entity_id in missing if entity_id not in waiting]
+        self._count("coalesced", len(waiting))
+        self._count("miss", len(owned))
+        if owned:
+            found.update(await self._load(owned, load, token))
+        for entity_id, future in waiting.items():
+            # Shielded: a waiter being cancelled must not cancel the load others wait for
+            found[entity_id] = await asyncio.shield(future)
+        return found
+
+    async def _load(self, ids: list[int], load: Load, token: int) -> dict[int, Values | None]:
+        loop = asyncio.get_running_loop()
+        futures = {entity_id: loop.create_future() for entity_id in ids}
+        self._inflight.update(futures)
+        try:
+            loaded = await load(ids)
+        except BaseException as exc:
+            for future in futures.values():
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+                    # Raised here; waiters, if any, get it too
+                    future.exception()
+            raise
+        finally:
+            for entity_id, future in futures.items():
+                if self._inflight.get(entity_id) is future:
+                    del self._inflight[entity_id]
+
+        values = {entity_id: loaded.get(entity_id) for entity_id in ids}
+        to_share = {}
+        for entity_id, value in values.items():
+            futures[entity_id].set_result(value)
+            # Missing entities are not cached: creating one needs no invalidation
+            if value is not None and self.local.set(entity_id, value, token=token):
+                to_share[self._key(entity_id)] = value
+        if to_share and self.shared is not None:
+            await self.shared.set_many(to_share, self.shared_ttl_seconds)
+        return values
+
+    async def invalidate(self, ids: Iterable[int]) -> None:
+        """Drop entities from both tiers; call after committing a write to them."""
+        ids = list(ids)
+        for entity_id in ids:
+            self.local.invalidate(entity_id)
+            # Later lookups must not join a load started before the write
+            self._inflight.pop(entity_id, None)
+        if ids and self.shared is not None:
+            await self.shared.delete_many([self._key(entity_id) for entity_id in ids])
+
+    def clear(self) -> None:
+        """Drop this worker's entries (the shared tier keeps its own until they expire)."""
+        self.local.clear()
+        self._inflight.clear()
+
+
+def column_values(instance: Any, exclude: Sequence[str] = ()) -> Values:
+    """An ORM instance's column values, as cached, without the ``exclude``d ones."""
+    return {
+        attr.key: getattr(instance, attr.key)
+        for attr in inspect(type(instance)).column_attrs
+        if attr.key not in exclude
+    }
+
+
+def attach(session: AsyncSession, model: type, values: Values) -> Any:
+    """The session's instance for cached values: the one it holds already, else one built without a query."""
+    instance = session.identity_map.get(identity_key(model, values["id"]))
+    if instance is not None:
+        return instance
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    session.add(instance)
+    return instance
+
+
+def _shared_cache() -> SharedCache | None:
+    if get_settings().entity_cache_shared_backend == "memory":
+        return MemorySharedCache()
+    return None
+
+
+def _entity_cache(name: str, shared: SharedCache | None) -> EntityCache:
+    settings = get_settings()
+    return EntityCache(
+        name,
+        local=TTLCache(settings.entity_cache_local_ttl_seconds, maxsize=settings.entity_cache_local_size),
+        shared=shared,
+        shared_ttl_seconds=settings.entity_cache_shared_ttl_seconds,
+        enabled=settings.entity_cache_enabled
+    )
+
+
+shared_cache = _shared_cache()
+# Invalidated by ProjectRepository and UserRepository writes
+project_cache = _entity_cache("projects", shared_cache)
+user_cache = _entity_cache("users", shared_cache)
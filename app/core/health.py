@@ -0,0 +1,141 @@
+"""Readiness checks for load balancers.
+
+A worker is ready when its database answers a ping within
+``READINESS_DB_TIMEOUT_SECONDS``, its connection pool is not saturated and
+its event loop is not lagging. Reports are cached for
+``READINESS_CACHE_TTL_SECONDS`` and computed by one request at a time, so
+a storm of probes costs at most one ping per interval per worker.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.core.config import get_settings
+
+
+@dataclass
+class ReadinessReport:
+    ready: bool
+    checked_at: datetime
+    database_ok: bool
+    database_latency_ms: float | None
+    database_error: str | None
+    # None when the pool does not bound connections (e.g. SQLite's)
+    pool_checked_out: int | None
+    pool_capacity: int | None
+    pool_saturation: float | None
+    event_loop_lag_ms: float
+    # Shutting down: still serving, but asking for no new traffic
+    draining: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        status = "draining" if self.draining else "ready" if self.ready else "not_ready"
+        return {"status": status, **asdict(self)}
+
+
+# How long the lag probe sleeps; the lag is how much longer it took to wake up
+LAG_SAMPLE_SECONDS = 0.01
+
+
+def pool_usage(pool: Pool, max_overflow: int) -> tuple[int | None, int | None]:
+    """Connections checked out and the most the pool hands out, when it has a limit.
+
+    The pool has no public accessor for its overflow limit, so it comes
+    from the settings the engine was built with; negative means unbounded.
+    """
+    if not isinstance(pool, QueuePool):
+        return None, None
+    capacity = pool.size() + max_overflow if max_overflow >= 0 else None
+    return pool.checkedout(), capacity
+
+
+async def event_loop_lag(interval: float = LAG_SAMPLE_SECONDS) -> float:
+    """Seconds a timer due now fires late, behind the work already queued on the loop.
+
+    Sleeps for ``interval`` and subtracts it: unlike a bare ``sleep(0)``,
+    which resumes after a single pass over the ready callbacks, this also
+    catches callbacks that block the loop while the probe waits.
+    """
+    started = time.perf_counter()
+    await asyncio.sleep(interval)
+    return max(time.perf_counter() - started - interval, 0.0)
+
+
+class ReadinessProbe:
+    """Cached, one-at-a-time readiness checks for this worker."""
+
+    def __init__(self):
+        self._report: ReadinessReport | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        # Set by the server on SIGTERM (see app.commands.serve)
+        self.draining = False
+
+    async def check(self, session: AsyncSession) -> ReadinessReport:
+        """The cached report, or a fresh one once it has expired; never ready while draining."""
+        report = await self._cached_check(session)
+        if self.draining:
+            return replace(report, ready=False, draining=True)
+        return report
+
+    async def _cached_check(self, session: AsyncSession) -> ReadinessReport:
+        if self._report and time.monotonic() < self._expires_at:
+            return self._report
+        async with self._lock:
+            # Another request may have refreshed it while this one waited
+            if self._report and time.monotonic() < self._expires_at:
+                return self._report
+            self._report = await self._run_checks(session)
+            self._expires_at = time.monotonic() + get_settings().readiness_cache_ttl_seconds
+            return self._report
+
+    def clear(self) -> None:
+        """Forget the cached report and draining state (and start over with a lock for the running loop)."""
+        self._report = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self.draining = False
+
+    async def _run_checks(self, session: AsyncSession) -> ReadinessReport:
+        settings = get_settings()
+        lag = await event_loop_lag()
+        # Before the ping, which checks out a connection of its own
+        checked_out, capacity = pool_usage(session.get_bind().pool, settings.database_max_overflow)
+        saturation = checked_out / capacity if capacity else None
+
+        database_error = None
+        started = time.perf_counter()
+        try:
+            # Also bounds the wait for a connection when the pool is exhausted
+            await asyncio.wait_for(session.execute(text("SELECT 1")), settings.readiness_db_timeout_seconds)
+        except asyncio.TimeoutError:
+            database_error = f"no answer within {settings.readiness_db_timeout_seconds}s"
+        except Exception as exc:
+            database_error = f"{type(exc).__name__}: {exc}"
+        latency = time.perf_counter() - started
+
+        ready = (
+            database_error is None
+            and (saturation is None or saturation < settings.readiness_max_pool_saturation)
+            and lag * 1000 <= settings.readiness_max_loop_lag_ms
+        )
+        return ReadinessReport(
+            ready=ready,
+            checked_at=datetime.now(timezone.utc),
+            database_ok=database_error is None,
+            database_latency_ms=round(latency * 1000, 2) if database_error is None else None,
+            database_error=database_error,
+            pool_checked_out=checked_out,
+            pool_capacity=capacity,
+            pool_saturation=round(saturation, 3) if saturation is not None else None,
+            event_loop_lag_ms=round(lag * 1000, 2)
+        )
+
+
+readiness_probe = ReadinessProbe()
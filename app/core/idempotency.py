@@ -0,0 +1,304 @@
+"""``Idempotency-Key`` support for create and update routes.
+
+A client retrying a request sends the same ``Idempotency-Key`` header; the
+first request with a key runs, its response is stored in the
+``idempotency_keys`` table for ``IDEMPOTENCY_TTL_SECONDS`` and every retry
+gets that response back (with ``Idempotent-Replayed: true``) instead of
+running the route again. Keys are scoped to the token's subject, and a key
+reused for a different request (method, path, query or body) is rejected
+with 422.
+
+A retry arriving while the first request is still running waits for it:
+on the same worker on an in-process event, across workers by polling the
+table (whose unique constraint lets only one request claim a key), for at
+most ``IDEMPOTENCY_WAIT_SECONDS`` before answering 409. Completed responses
+are also kept in a per-worker cache, so most retries never touch the
+database. Server errors and transient 4xx (401, 403, 408, 409, 425, 429)
+are not stored: the key is released and a retry runs again.
+
+Routes opt in with ``@idempotent``; requests without the header are not
+affected.
+"""
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncContextManager, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.database import get_session
+from app.core.query_stats import untracked_queries
+from app.core.security import get_security_service
+from app.core.serialization import negotiated_response
+from app.repository.idempotency_repository import IdempotencyRepository
+
+EndpointT = TypeVar("EndpointT", bound=Callable)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+IDEMPOTENT_METHODS = frozenset({"POST", "PUT", "PATCH"})
+# Responses that may well differ on a retry: not stored
+TRANSIENT_STATUSES = frozenset({401, 403, 408, 409, 425, 429})
+# Between looks at a key another worker is processing
+POLL_SECONDS = 0.1
+
+KeyScope = tuple[str, str]
+
+
+def idempotent(endpoint: EndpointT) -> EndpointT:
+    """Let clients make a route's requests idempotent with an ``Idempotency-Key`` header."""
+    endpoint.idempotent = True
+    return endpoint
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    headers: list[list[str]]
+    body: bytes
+
+
+# Completed responses by (principal, key), in front of the table
+idempotency_cache = TTLCache(
+    ttl_seconds=get_settings().idempotency_cache_ttl_seconds,
+    maxsize=get_settings().idempotency_cache_size
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _storable(status_code: int) -> bool:
+    return status_code < 500 and status_code not in TRANSIENT_STATUSES
+
+
+def request_fingerprint(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def request_principal(headers: Headers) -> str:
+    """The verified token subject, or ``anonymous`` (e.g. for registration)."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = get_security_service().decode_token(token=token)
+        if payload and payload.get("sub"):
+            return str(payload["sub"])
+    return "anonymous"
+
+
+def _endpoint(scope: Scope) -> Callable | None:
+    """The endpoint the app's router will dispatch this request to."""
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, child_scope = route.matches(scope)
+        if match == Match.FULL:
+            return child_scope.get("endpoint")
+    return None
+
+
+def _session(scope: Scope) -> AsyncContextManager[AsyncSession]:
+    """A session from the app's ``get_session`` dependency, overrides included."""
+    provider = scope["app"].dependency_overrides.get(get_session, get_session)
+    return asynccontextmanager(provider)()
+
+
+async def _read_body(receive: Receive) -> bytes | None:
+    """The whole request body; None if the client disconnected."""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay_receive(body: bytes, receive: Receive) -> Receive:
+    """Hand the already-read body to the app, then pass through (for disconnects)."""
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive_body() -> Message:
+        if pending:
+            return pending.pop()
+        return await receive()
+    return receive_body
+
+
+class IdempotencyMiddleware:
+    """Run each ``Idempotency-Key`` once and replay its response to retries (see module docstring)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Keys being processed by this worker, set once their response is stored
+        self._in_flight: dict[KeyScope, asyncio.Event] = {}
+        self._next_purge = 0.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None or not getattr(_endpoint(scope), "idempotent", False):
+            await self.app(scope, receive, send)
+            return
+
+        if not 0 < len(key) <= MAX_KEY_LENGTH:
+            response = negotiated_response(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_KEY_LENGTH} characters"}, 400
+            )
+            await response(scope, receive, send)
+            return
+        body = await _read_body(receive)
+        if body is None:
+            return
+        await self._handle(
+            scope, _replay_receive(body, receive), send,
+            (request_principal(headers), key), request_fingerprint(scope, body)
+        )
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send, key_scope: KeyScope, fingerprint: str) -> None:
+        deadline = time.monotonic() + get_settings().idempotency_wait_seconds
+        while True:
+            stored = idempotency_cache.get(key_scope)
+            if stored is not None:
+                await self._replay(scope, receive, send, stored, fingerprint)
+                return
+
+            in_flight = self._in_flight.get(key_scope)
+            if in_flight is not None:
+                # This worker is running the first request: wait for its response
+                try:
+                    await asyncio.wait_for(in_flight.wait(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    await self._still_processing(scope, receive, send)
+                    return
+                continue
+
+            event = self._in_flight[key_scope] = asyncio.Event()
+            try:
+                claimed = await self._claim(scope, key_scope, fingerprint)
+                if isinstance(claimed, int):
+                    await self._process(scope, receive, send, key_scope, fingerprint, claimed)
+                    return
+            finally:
+                del self._in_flight[key_scope]
+                event.set()
+            if claimed is not None:
+                idempotency_cache.set(key_scope, claimed)
+                await self._replay(scope, receive, send, claimed, fingerprint)
+                return
+
+            # Another worker is running the first request
+            if time.monotonic() >= deadline:
+                await self._still_processing(scope, receive, send)
+                return
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def _claim(self, scope: Scope, key_scope: KeyScope, fingerprint: str) -> int | StoredResponse | None:
+        """The id of the record this request now processes, the stored response, or None when another request holds the key."""
+        settings = get_settings()
+        now = _utcnow()
+        locked_until = now + timedelta(seconds=settings.idempotency_lock_seconds)
+        expires_at = now + timedelta(seconds=settings.idempotency_ttl_seconds)
+        # Bookkeeping of the middleware, not of the route: kept out of its query budget
+        with untracked_queries():
+            async with _session(scope) as session:
+                repo = IdempotencyRepository(session)
+                if time.monotonic() >= self._next_purge:
+                    self._next_purge = time.monotonic() + settings.idempotency_purge_interval_seconds
+                    await repo.purge_expired(now, settings.idempotency_purge_batch_size)
+
+                record = await repo.claim(*key_scope, fingerprint, locked_until, expires_at)
+                if record is not None:
+                    return record.id
+                record = await repo.get(*key_scope)
+                if record is None:
+                    # Released since the claim failed; the next attempt can take it
+                    return None
+                if record.response_status is not None and record.expires_at > now:
+                    return StoredResponse(
+                        fingerprint=record.fingerprint,
+                        status_code=record.response_status,
+                        headers=record.response_headers,
+                        body=record.response_body
+                    )
+                if await repo.take_over(record.id, fingerprint, now, locked_until, expires_at):
+                    return record.id
+                return None
+
+    async def _process(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key_scope: KeyScope,
+        fingerprint: str,
+        record_id: int
+    ) -> None:
+        status_code: int | None = None
+        headers: list[list[str]] = []
+        chunks: list[bytes] = []
+
+        async def send_and_capture(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in message["headers"]]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_capture)
+        except Exception:
+            await self._release(scope, record_id)
+            raise
+
+        if status_code is None or not _storable(status_code):
+            await self._release(scope, record_id)
+            return
+        stored = StoredResponse(fingerprint=fingerprint, status_code=status_code, headers=headers, body=b"".join(chunks))
+        with untracked_queries():
+            async with _session(scope) as session:
+                await IdempotencyRepository(session).complete(record_id, status_code, headers, stored.body)
+        idempotency_cache.set(key_scope, stored)
+
+    async def _release(self, scope: Scope, record_id: int) -> None:
+        with untracked_queries():
+            async with _session(scope) as session:
+                await IdempotencyRepository(session).release(record_id)
+
+    async def _replay(self, scope: Scope, receive: Receive, send: Send, stored: StoredResponse, fingerprint: str) -> None:
+        if stored.fingerprint != fingerprint:
+            response = negotiated_response(
+                {"detail": f"{IDEMPOTENCY_KEY_HEADER} was already used for a different request"}, 422
+            )
+            await response(scope, receive, send)
+            return
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+        headers.append((REPLAYED_HEADER.lower().encode("latin-1"), b"true"))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
+
+    async def _still_processing(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = negotiated_response(
+            {"detail": f"A request with this {IDEMPOTENCY_KEY_HEADER} is still being processed; retry later"}, 409
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,249 @@
+"""In-process application metrics, exposed in the Prometheus text format.
+
+Metrics are updated from the event loop only (middleware and async code),
+so they take no locks; every worker process keeps its own values, which is
+what Prometheus expects when it scrapes each worker.
+"""
+import bisect
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import compression_stats
+
+LabelValues = tuple[str, ...]
+
+# Seconds; spans fast cached reads up to slow exports
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Exposition lines of this metric's values."""
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value per label set that goes up and down."""
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set; observing is one bisect and three adds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf), sum]
+        self._values: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, labels: LabelValues = ()) -> int:
+        series = self._values.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+Collector = Callable[[], Iterable[_Metric]]
+
+
+class MetricsRegistry:
+    """Metrics to expose, plus collectors building metrics from other state at scrape time."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics.extend(collector())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")
+)
+HTTP_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+HTTP_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "HTTP requests being handled.", ("method",)
+)
+HTTP_REQUEST_SIZE = registry.histogram(
+    "http_request_size_bytes", "HTTP request body size by route template.", ("method", "route"), SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes", "HTTP response body size on the wire by route template.", ("method", "route"), SIZE_BUCKETS
+)
+
+
+def _compression_metrics() -> list[_Metric]:
+    responses = Counter("http_compressed_responses_total", "Responses compressed, by coding.", ("coding",))
+    bytes_in = Counter("http_compression_input_bytes_total", "Bytes before compression, by coding.", ("coding",))
+    bytes_out = Counter("http_compression_output_bytes_total", "Bytes after compression, by coding.", ("coding",))
+    cpu = Counter("http_compression_cpu_seconds_total", "Thread CPU time spent compressing, by coding.", ("coding",))
+    skipped = Counter("http_compression_skipped_total", "Responses not compressed, by reason.", ("reason",))
+    for coding, stats in compression_stats.encodings.items():
+        responses.inc((coding,), stats.responses)
+        bytes_in.inc((coding,), stats.bytes_in)
+        bytes_out.inc((coding,), stats.bytes_out)
+        cpu.inc((coding,), stats.cpu_seconds)
+    for reason, count in compression_stats.skipped.items():
+        skipped.inc((reason,), count)
+    return [responses, bytes_in, bytes_out, cpu, skipped]
+
+
+registry.add_collector(_compression_metrics)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled a request, e.g. ``/api/v1/projects/{project_id}``.
+
+    Unmatched paths share one label so scanners cannot blow up cardinality.
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Record latency, status, in-flight count and body sizes of every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        # Declared size, which avoids wrapping receive; chunked uploads count as 0
+        request_size = 0
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                request_size = int(value) if value.isdigit() else 0
+                break
+        response = [500, 0]  # status, body bytes
+
+        async def counting_send(message: Message) -> None:
+            if message["type"] == "http.response.body":
+                response[1] += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                response[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec((method,))
+            route = route_template(scope)
+            labels = (method, route)
+            HTTP_REQUESTS.inc((method, route, str(response[0])))
+            HTTP_LATENCY.observe(elapsed, labels)
+            HTTP_REQUEST_SIZE.observe(request_size, labels)
+            HTTP_RESPONSE_SIZE.observe(response[1], labels)
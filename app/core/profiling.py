@@ -0,0 +1,157 @@
+"""Opt-in sampling profiler for HTTP requests.
+
+``ProfilingMiddleware`` is only installed when ``PROFILING_ENABLED`` is set,
+so it costs nothing otherwise. When installed, it profiles a random
+``PROFILING_SAMPLE_RATE`` fraction of requests, plus any request sending
+``X-Profile: 1`` with an admin access token. Profiles are pyinstrument
+HTML call trees, kept per request in a bounded directory and served by the
+admin endpoints under ``/api/v1/admin/profiles``.
+"""
+import asyncio
+import logging
+import random
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.constants import RoleEnum
+from app.core.metrics import route_template
+from app.core.security import get_security_service
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional: only needed when profiling is enabled
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_REQUEST_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# <profile id>__<METHOD>__<route slug>__<milliseconds>ms.html
+_PROFILE_FILE = re.compile(r"^(?P<id>\d{8}T\d{12}-[0-9a-f]{8})__(?P<method>[A-Z]+)__(?P<route>[\w.-]*)__(?P<ms>\d+)ms\.html$")
+_PROFILE_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{8}$")
+
+
+@dataclass(frozen=True)
+class StoredProfile:
+    profile_id: str
+    method: str
+    route: str
+    duration_ms: int
+    size_bytes: int
+    path: Path
+
+
+class ProfileStore:
+    """Profiles on local disk, keeping only the newest ``max_files``."""
+
+    def __init__(self, directory: str | Path, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def save(self, profile_id: str, method: str, route: str, duration_ms: int, html: str) -> Path:
+        """Write a profile, then drop the oldest ones over the limit (blocking I/O)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", route.replace("{", "").replace("}", "")).strip("_")
+        path = self.directory / f"{profile_id}__{method}__{slug}__{duration_ms}ms.html"
+        path.write_text(html, encoding="utf-8")
+        for stale in self.list()[self.max_files:]:
+            stale.path.unlink(missing_ok=True)
+        return path
+
+    def list(self) -> list[StoredProfile]:
+        """Stored profiles, newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in self.directory.iterdir():
+            match = _PROFILE_FILE.match(path.name)
+            if match:
+                profiles.append(StoredProfile(
+                    profile_id=match["id"],
+                    method=match["method"],
+                    route=match["route"],
+                    duration_ms=int(match["ms"]),
+                    size_bytes=path.stat().st_size,
+                    path=path
+                ))
+        # Ids start with a UTC timestamp
+        return sorted(profiles, key=lambda p: p.profile_id, reverse=True)
+
+    def get(self, profile_id: str) -> StoredProfile | None:
+        """A stored profile by id; ids are validated, never used as paths."""
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        return next((p for p in self.list() if p.profile_id == profile_id), None)
+
+
+def get_profile_store() -> ProfileStore:
+    settings = get_settings()
+    return ProfileStore(settings.profiling_dir, settings.profiling_max_files)
+
+
+def _admin_requested(headers: Headers) -> bool:
+    """Whether the request asks for a profile with an admin access token."""
+    if headers.get(PROFILE_REQUEST_HEADER) != "1":
+        return False
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer":
+        return False
+    payload = get_security_service().decode_token(token)
+    return bool(payload) and payload.get("type") == "access" and payload.get("role") == RoleEnum.ADMIN.value
+
+
+class ProfilingMiddleware:
+    """Profile sampled or admin-requested requests and store their call trees."""
+
+    def __init__(self, app: ASGIApp, store: ProfileStore | None = None):
+        if Profiler is None:
+            raise RuntimeError("Profiling is enabled but pyinstrument is not installed")
+        settings = get_settings()
+        self.app = app
+        self.store = store or get_profile_store()
+        self.sample_rate = settings.profiling_sample_rate
+        self.interval = settings.profiling_interval_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not (random.random() < self.sample_rate or _admin_requested(Headers(scope=scope))):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        # Async mode follows this request's task only, not others sharing the loop
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session = profiler.stop()
+            try:
+                # Rendering and writing are slow; keep them off the event loop
+                await asyncio.to_thread(
+                    lambda: self.store.save(
+                        profile_id,
+                        scope["method"],
+                        route_template(scope),
+                        round(session.duration * 1000),
+                        profiler.output_html()
+                    )
+                )
+            except Exception:
+                logger.exception("Storing profile %s failed", profile_id)
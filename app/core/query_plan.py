@@ -0,0 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper around a statement, keeping its bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement: ClauseElement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _compile_explain_sqlite(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+async def explain_plan(session: AsyncSession, statement: ClauseElement) -> list[str]:
+    """Return the database's query plan for a statement, one line per step."""
+    result = await session.execute(Explain(statement))
+    # SQLite returns (id, parent, notused, detail); PostgreSQL a single text column
+    return [row[-1] for row in result.all()]
@@ -0,0 +1,157 @@
+"""Per-request SQL query accounting.
+
+``instrument_engine`` hooks the engine's cursor events; every statement run
+while a ``QueryStats`` is active (one per HTTP request, set by
+``QueryAccountingMiddleware``, or any block under ``track_queries``) is
+counted and timed. Routes declare how many queries they may run with
+``@query_budget(n)``; going over is logged, counted in the metrics and, in
+the test suite, fails the test.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry, route_template
+
+logger = logging.getLogger(__name__)
+
+EndpointT = TypeVar("EndpointT", bound=Callable)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+DB_QUERIES = registry.histogram(
+    "db_queries_per_request", "SQL statements run per HTTP request, by route template.",
+    ("method", "route"), buckets=(1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+DB_QUERY_TIME = registry.histogram(
+    "db_query_seconds_per_request", "Time spent in SQL statements per HTTP request, by route template.",
+    ("method", "route")
+)
+DB_QUERY_BUDGET_EXCEEDED = registry.counter(
+    "db_query_budget_exceeded_total", "Requests that ran more SQL statements than their route's budget.",
+    ("method", "route")
+)
+
+
+@dataclass
+class QueryStats:
+    """Statements run (and time spent in them) in one unit of work."""
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+# Called with a message for every request over its budget (the test suite listens)
+budget_exceeded_listeners: list[Callable[[str], None]] = []
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the statements run in the block (by this task)."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def untracked_queries() -> Iterator[None]:
+    """Leave the statements run in the block (by this task) out of the active QueryStats."""
+    token = _current_stats.set(None)
+    try:
+        yield
+    finally:
+        _current_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = conn.info["query_started"].pop()
+    stats.count += 1
+    stats.seconds += time.perf_counter() - started
+    stats.statements.append(statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time the engine's statements into the active QueryStats, if any."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def query_budget(max_queries: int) -> Callable[[EndpointT], EndpointT]:
+    """Declare the most SQL statements a route handler may run per request."""
+    def declare(endpoint: EndpointT) -> EndpointT:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return declare
+
+
+class QueryAccountingMiddleware:
+    """Track the SQL statements of each request, against its route's budget.
+
+    With ``debug_headers``, the count and time so far are added to the
+    response headers (queries of a streamed body after that are only in
+    the metrics).
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        send_with_headers = send
+        if self.debug_headers:
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers[QUERY_TIME_HEADER] = f"{stats.seconds * 1000:.2f}"
+                await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                self._record(scope, stats)
+
+    def _record(self, scope: Scope, stats: QueryStats) -> None:
+        labels = (scope["method"], route_template(scope))
+        DB_QUERIES.observe(stats.count, labels)
+        DB_QUERY_TIME.observe(stats.seconds, labels)
+
+        budget = getattr(scope.get("endpoint"), "query_budget", None)
+        if budget is None or stats.count <= budget:
+            return
+        DB_QUERY_BUDGET_EXCEEDED.inc(labels)
+        message = (
+            f"{labels[0]} {labels[1]} ran {stats.count} SQL statements, over its budget of {budget}:\n  "
+            + "\n  ".join(stats.statements)
+        )
+        logger.warning(message)
+        for listener in budget_exceeded_listeners:
+            listener(message)
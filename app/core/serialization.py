@@ -0,0 +1,197 @@
+from contextvars import ContextVar
+from datetime import date
+from typing import Any, AsyncIterator, Mapping, Sequence
+
+import msgpack
+import orjson
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import Row
+from sqlalchemy.orm import InstrumentedAttribute
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack"}
+_JSON_RANGES = {JSON_MEDIA_TYPE, "application/*", "*/*"}
+
+# Body encoding negotiated for the current request, set by ContentNegotiationMiddleware
+response_media_type: ContextVar[str] = ContextVar("response_media_type", default=JSON_MEDIA_TYPE)
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a sparse fieldset names fields outside the schema's allowlist."""
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> list[str]:
+    """Parse a comma-separated ``fields`` parameter against an allowlist.
+
+    Returns the allowed fields in allowlist order, ``id`` always included;
+    all of them when ``fields`` is empty.
+    """
+    if not fields:
+        return list(allowed)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    requested.add("id")
+    return [name for name in allowed if name in requested]
+
+
+def parse_includes(include: str | None, allowed: Sequence[str]) -> list[str]:
+    """Parse a comma-separated ``include`` parameter against an allowlist, in allowlist order."""
+    if not include:
+        return []
+    requested = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise InvalidFieldsError(
+            f"Unknown includes: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    return [name for name in allowed if name in requested]
+
+
+def parse_ids(ids: str | None, max_ids: int) -> list[int]:
+    """Parse a comma-separated ``ids`` parameter: distinct ids in request order, at most ``max_ids``."""
+    if not ids:
+        return []
+    try:
+        parsed = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise ValueError("ids must be comma-separated integers") from None
+    if len(parsed) > max_ids:
+        raise ValueError(f"At most {max_ids} ids per request")
+    return parsed
+
+
+def response_columns(model: type, fields: Sequence[str]) -> list[InstrumentedAttribute]:
+    """Columns of ``model`` backing the given response fields."""
+    return [getattr(model, name) for name in fields]
+
+
+def page_content(
+    total: int,
+    skip: int,
+    limit: int,
+    rows: Sequence[Row]
+) -> dict[str, Any]:
+    """Page of plain column rows, ready to be encoded as is."""
+    return {
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "items": [row._asdict() for row in rows]
+    }
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """Pick MessagePack when the Accept header ranks it at least as high as JSON, else JSON."""
+    if not accept:
+        return JSON_MEDIA_TYPE
+    msgpack_q = json_q = 0.0
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        if media_type in _MSGPACK_ALIASES:
+            msgpack_q = max(msgpack_q, q)
+        elif media_type in _JSON_RANGES:
+            json_q = max(json_q, q)
+    return MSGPACK_MEDIA_TYPE if msgpack_q > 0 and msgpack_q >= json_q else JSON_MEDIA_TYPE
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Same wire values as the JSON encoding: ISO datetimes (enums are str subclasses)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Type is not MessagePack serializable: {type(value).__name__}")
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    """Encode content as JSON (orjson) or MessagePack."""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content, default=_msgpack_default, datetime=False)
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class NegotiatedResponse(Response):
+    """Response encoded as JSON or MessagePack, whichever the request negotiated.
+
+    Used as the app's default response class, so routes returning models or
+    dicts get MessagePack for ``Accept: application/msgpack`` unchanged.
+    """
+    media_type = JSON_MEDIA_TYPE
+
+    def __init__(
+        self,
+        content: Any = None,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None
+    ):
+        headers = {**(headers or {}), "Vary": "Accept"}
+        super().__init__(content, status_code, headers, media_type or response_media_type.get(), background)
+
+    def render(self, content: Any) -> bytes:
+        return encode(content, self.media_type)
+
+
+class ContentNegotiationMiddleware:
+    """Record the response encoding each request negotiated from its Accept header."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = response_media_type.set(negotiate_media_type(Headers(scope=scope).get("accept")))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            response_media_type.reset(token)
+
+
+def negotiated_response(content: Any, status_code: int = 200) -> NegotiatedResponse:
+    """Encode straight to JSON or MessagePack bytes.
+
+    Returning a response object skips FastAPI's ``response_model``
+    validation and ``jsonable_encoder`` pass; the content must already be
+    made of wire-ready values (rows selected from the response columns are:
+    enums encode by value and datetimes in ISO format, like pydantic).
+    """
+    return NegotiatedResponse(content=content, status_code=status_code)
+
+
+def stream_response(batches: AsyncIterator[Sequence[Mapping[str, Any]]]) -> StreamingResponse:
+    """Stream items as NDJSON, or as a sequence of MessagePack maps, one chunk per batch.
+
+    A MessagePack stream is read with ``msgpack.Unpacker``.
+    """
+    media_type = response_media_type.get()
+    if media_type == JSON_MEDIA_TYPE:
+        media_type = NDJSON_MEDIA_TYPE
+
+    async def body() -> AsyncIterator[bytes]:
+        async for batch in batches:
+            if media_type == MSGPACK_MEDIA_TYPE:
+                yield b"".join(encode(item, MSGPACK_MEDIA_TYPE) for item in batch)
+            else:
+                yield b"".join(encode(item, JSON_MEDIA_TYPE) + b"\n" for item in batch)
+
+    return StreamingResponse(body(), media_type=media_type, headers={"Vary": "Accept"})
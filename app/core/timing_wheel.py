@@ -0,0 +1,138 @@
+import math
+from typing import Any, Hashable
+
+
+class HierarchicalTimingWheel:
+    """Hierarchical timing wheel for many near-term deadlines.
+
+    Level 0 has one slot per tick; every higher level has slots that span a
+    full rotation of the level below. Scheduling and expiring are O(1) per
+    item: an entry sits in the coarsest level that can hold it and cascades
+    down a level each time the wheel below completes a rotation. Deadlines
+    beyond the top level wait in an overflow list until they come in range.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        wheel_size: int = 60,
+        levels: int = 3,
+        start: float = 0.0
+    ):
+        self.tick_seconds = tick_seconds
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self._now = int(start // tick_seconds)
+        self._wheels: list[list[list[tuple[int, Hashable, Any]]]] = [
+            [[] for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._overflow: list[tuple[int, Hashable, Any]] = []
+        self._counts = [0] * levels
+        self._scheduled: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._scheduled
+
+    def schedule(self, deadline: float, key: Hashable, item: Any = None) -> bool:
+        """Schedule ``item`` under ``key`` to expire at ``deadline`` (seconds).
+
+        Rescheduling a key replaces its earlier deadline. Returns False when
+        the deadline is not in the future; the caller should handle it now.
+        """
+        # Round up so an item never expires before its deadline
+        tick = math.ceil(deadline / self.tick_seconds)
+        if tick <= self._now:
+            self.cancel(key)
+            return False
+        self._scheduled[key] = tick
+        self._insert((tick, key, item))
+        return True
+
+    def cancel(self, key: Hashable) -> None:
+        """Forget a key; its slot entry is dropped lazily when reached."""
+        self._scheduled.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop everything scheduled."""
+        for wheel in self._wheels:
+            for slot in wheel:
+                slot.clear()
+        self._overflow.clear()
+        self._counts = [0] * self.levels
+        self._scheduled.clear()
+
+    def advance(self, now: float) -> list[Any]:
+        """Move the wheel to ``now`` and return the expired items in deadline order."""
+        target = int(now // self.tick_seconds)
+        expired: list[Any] = []
+        while self._now < target:
+            if not self._scheduled:
+                # Nothing to expire on the way, jump straight to the target
+                self._now = target
+                break
+            level = next((i for i, count in enumerate(self._counts) if count), self.levels)
+            if level:
+                # Finer levels are empty: nothing can expire before the next coarse slot starts
+                span = self.wheel_size ** level
+                boundary = (self._now // span + 1) * span
+                if boundary > target:
+                    self._now = target
+                    break
+                self._now = boundary - 1
+            self._now += 1
+            self._cascade()
+            for entry in self._take(0, self._now % self.wheel_size):
+                self._expire(entry, expired)
+        return expired
+
+    def _take(self, level: int, index: int) -> list[tuple[int, Hashable, Any]]:
+        slot = self._wheels[level][index]
+        entries, slot[:] = slot[:], []
+        self._counts[level] -= len(entries)
+        return entries
+
+    def _live(self, entry: tuple[int, Hashable, Any]) -> bool:
+        tick, key, _ = entry
+        return self._scheduled.get(key) == tick
+
+    def _expire(self, entry: tuple[int, Hashable, Any], expired: list[Any]) -> None:
+        if self._live(entry):
+            del self._scheduled[entry[1]]
+            expired.append(entry[2])
+
+    def _insert(self, entry: tuple[int, Hashable, Any]) -> None:
+        delta = entry[0] - self._now
+        span = 1
+        for level in range(self.levels):
+            if delta < span * self.wheel_size:
+                self._wheels[level][(entry[0] // span) % self.wheel_size].append(entry)
+                self._counts[level] += 1
+                return
+            span *= self.wheel_size
+        self._overflow.append(entry)
+
+    def _cascade(self) -> None:
+        """Redistribute the coarse slots whose span starts at the current tick."""
+        top_span = self.wheel_size ** self.levels
+        if self._now % top_span == 0 and self._overflow:
+            entries, self._overflow = self._overflow, []
+            self._reinsert(entries)
+        for level in range(self.levels - 1, 0, -1):
+            span = self.wheel_size ** level
+            if self._now % span:
+                continue
+            self._reinsert(self._take(level, (self._now // span) % self.wheel_size))
+
+    def _reinsert(self, entries: list[tuple[int, Hashable, Any]]) -> None:
+        for entry in entries:
+            if not self._live(entry):
+                continue
+            if entry[0] <= self._now:
+                # Due on this very tick: park it in the level-0 slot being expired
+                self._wheels[0][self._now % self.wheel_size].append(entry)
+                self._counts[0] += 1
+            else:
+                self._insert(entry)
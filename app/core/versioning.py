@@ -0,0 +1,45 @@
+"""Optimistic concurrency for updates.
+
+Tasks and projects carry a ``version`` that every write bumps. A client
+that read version N sends it back (``If-Match: "N"`` or ``"version": N``
+in the body), and the update only applies if the row is still at N,
+checked in the UPDATE itself. Otherwise the client gets 409 with the
+current version in ``ETag``, and re-reads before retrying. Updates
+without a version apply unconditionally, as before.
+"""
+
+
+class VersionConflictError(Exception):
+    """Raised when an update names a version the row has moved past."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Version conflict: the resource is now at version {current_version}")
+        self.current_version = current_version
+
+
+def requested_version(header_version: int | None, body_version: int | None) -> int | None:
+    """The version an update expects, from ``If-Match`` or the body; ValueError if they disagree."""
+    if header_version is not None and body_version is not None and header_version != body_version:
+        raise ValueError("If-Match and version disagree")
+    return header_version if header_version is not None else body_version
+
+
+def etag(version: int) -> str:
+    """Strong ETag for a version."""
+    return f'"{version}"'
+
+
+def parse_if_match(value: str | None) -> int | None:
+    """Version named by an ``If-Match`` header (``"3"``, ``W/"3"`` or ``3``); None without one.
+
+    Raises ValueError for anything else, lists of ETags and ``*`` included.
+    """
+    if value is None:
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    if not tag.isdigit():
+        raise ValueError("If-Match must be a single version ETag, e.g. \"3\"")
+    return int(tag)
@@ -1,10 +1,19 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import  get_settings
+from app.core.serialization import NegotiatedResponse, ContentNegotiationMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.query_stats import QueryAccountingMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.idempotency import IdempotencyMiddleware
 from app.api.v1 import  api_v1_router
 from app.models.base import  Base
-from app.core.database import engine
+from app.core.database import engine, AsyncSessionLocal, warm_pool
+from app.services.deadline_scanner import DeadlineScanner
+from app.services.job_worker import JobWorkerPool
 
 
 @asynccontextmanager
@@ -13,8 +22,24 @@ async def lifespan(app:FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    if get_settings().database_pool_warm:
+        await warm_pool()
+
+    deadline_scanner = None
+    if get_settings().deadline_scan_enabled:
+        deadline_scanner = DeadlineScanner(session_factory=AsyncSessionLocal)
+        await deadline_scanner.start()
+
+    job_workers = None
+    if get_settings().jobs_enabled:
+        job_workers = JobWorkerPool(session_factory=AsyncSessionLocal)
+        await job_workers.start()
     yield
     # Shutdown
+    if job_workers:
+        await job_workers.stop()
+    if deadline_scanner:
+        await deadline_scanner.stop()
     await engine.dispose()
 
 
@@ -26,12 +51,38 @@ def create_app() -> FastAPI:
         version=get_settings().app_version,
         debug=get_settings().debug,
         lifespan=lifespan,
+        default_response_class=NegotiatedResponse,
         openapi_url="/api/v1/openapi.json",
         docs_url="/api/v1/docs",
         redoc_url="/api/v1/redoc"
     )
 
-    # Add CORS middleware
+    # Sampled / admin-requested call-tree profiles; not installed when off
+    if get_settings().profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+
+    # Idempotency-Key replays, of the route's own response (before encoding and compression)
+    app.add_middleware(IdempotencyMiddleware)
+
+    # JSON or MessagePack bodies, per the request's Accept header
+    app.add_middleware(ContentNegotiationMiddleware)
+
+    # gzip / brotli / zstd, per the request's Accept-Encoding
+    if get_settings().compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+
+    # SQL statements per request, checked against route query budgets
+    app.add_middleware(QueryAccountingMiddleware, debug_headers=get_settings().debug)
+
+    # Outermost but for CORS, so latency and sizes are what clients see
+    if get_settings().metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get(get_settings().metrics_path, include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    # Add CORS middleware, outermost so every response (replays included) gets its headers
     app.add_middleware(
         CORSMiddleware,
         allow_origins=get_settings().cors_origins,
@@ -17,6 +17,7 @@ class TimestampMixin:
     updated_at = Column(
         DateTime,
         default=lambda: datetime.now(pytz.UTC),
+        onupdate=lambda: datetime.now(pytz.UTC),
         nullable=False
     )
     
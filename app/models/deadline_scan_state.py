@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from app.models.base import Base
+
+
+class DeadlineScanState(Base):
+    """Lease and watermarks of the due-date scanner, shared by all workers."""
+    __tablename__ = "deadline_scan_state"
+
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    # Time of the last completed scan pass: open tasks due up to this plus the
+    # due soon window, and unchanged since, were announced as due soon
+    due_soon_watermark = Column(DateTime, nullable=True)
+
+    # Tasks due up to this point were announced as overdue
+    overdue_watermark = Column(DateTime, nullable=True)
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, Integer, JSON, LargeBinary, DateTime, Index, UniqueConstraint
+from app.models.base import BaseModel
+
+
+class IdempotencyKey(BaseModel):
+    """Response stored for a client's ``Idempotency-Key``, replayed to retries until it expires."""
+    __tablename__ = "idempotency_keys"
+
+    # Whose key it is: the token's subject, or "anonymous"
+    principal = Column(String(64), nullable=False)
+    key = Column(String(255), nullable=False)
+    # Hash of method, path, query and body: a key reused for another request is rejected
+    fingerprint = Column(String(64), nullable=False)
+    # Null while the first request is still being processed
+    response_status = Column(Integer, nullable=True)
+    response_headers = Column(JSON, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    # Until when the processing request holds the key; a lapsed lock means its worker died
+    locked_until = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("principal", "key", name="uq_idempotency_key_principal_key"),
+        # Purge of expired keys
+        Index("ix_idempotency_key_expires_at", "expires_at"),
+    )
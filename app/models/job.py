@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, JSON, DateTime, Enum as SQLEnum, Index
+from app.models.base import BaseModel
+from app.core.constants import JobStatusEnum
+
+
+class Job(BaseModel):
+    """Durable background job, claimed and run by the in-process worker pool."""
+    __tablename__ = "jobs"
+
+    kind = Column(String(100), nullable=False)
+    status = Column(SQLEnum(JobStatusEnum), default=JobStatusEnum.QUEUED, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    # Handler-reported progress of the running attempt
+    progress = Column(JSON, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    # Not claimable before this time (retry backoff)
+    run_after = Column(DateTime, nullable=False)
+    # Worker running the job and until when; a lapsed lock means the worker died
+    locked_by = Column(String(255), nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    __table_args__ = (
+        # Claim queries: queued jobs that are due, and running jobs with lapsed locks
+        Index("ix_job_status_run_after", "status", "run_after"),
+        Index("ix_job_status_locked_until", "status", "locked_until"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum as SQLEnum, Index
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
 from app.core.constants import ProjectStatusEnum
@@ -11,13 +11,19 @@ class Project(BaseModel):
     description = Column(Text, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(SQLEnum(ProjectStatusEnum), default=ProjectStatusEnum.PLANNING, nullable=False)
+    # Set when deletion is requested; the project is hidden while a job purges its rows
+    deleted_at = Column(DateTime, nullable=True)
+    # Bumped by every write; updates compare-and-set on it (optimistic concurrency)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     
-    # Relationships
+    # Relationships; children are removed by ON DELETE CASCADE, never loaded to be deleted
     owner = relationship("User", back_populates="projects")
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
-    members = relationship("ProjectMember", back_populates="project", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+    members = relationship("ProjectMember", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
 
     __table_args__ = (
         Index("ix_project_owner_status", "owner_id", "status"),
+        # Excluding projects being purged (few rows are ever non-null)
+        Index("ix_project_deleted_at", "deleted_at"),
     )
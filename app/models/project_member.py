@@ -6,8 +6,8 @@ class ProjectMember(BaseModel):
     """Project membership model linking users to projects."""
     __tablename__ = "project_members"
     
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     role = Column(String(50), default="member", nullable=False)
     
     # Relationships
@@ -11,11 +11,13 @@ class Task(BaseModel):
     
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     status = Column(SQLEnum(TaskStatusEnum), default=TaskStatusEnum.OPEN, nullable=False)
     priority = Column(SQLEnum(TaskPriorityEnum), default=TaskPriorityEnum.MEDIUM, nullable=False)
     due_date = Column(DateTime, nullable=True)
+    # Bumped by every write; updates compare-and-set on it (optimistic concurrency)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     
     # Relationships
@@ -23,8 +25,25 @@ class Task(BaseModel):
     assignee = relationship("User", back_populates="tasks")
     
     
+    # Task list indexes: each is an equality prefix followed by the column the
+    # list is ordered or range-filtered by (see app/repository/task_filters.py)
     __table_args__ = (
-        Index("ix_task_project_status", "project_id", "status"),
+        # Assigned-to-me lists across projects (TaskRepository.get_user_assigned_tasks)
         Index("ix_task_assignee", "assignee_id"),
-        Index("ix_task_due_date", "due_date")
-    )
\ No newline at end of file
+        # Due-date scanner range scans across all projects
+        Index("ix_task_due_date", "due_date"),
+        # Unfiltered project list, newest first; created_at ranges
+        Index("ix_task_project_created_at", "project_id", "created_at"),
+        # Status filter (board columns), newest first; also the project stats aggregate
+        Index("ix_task_project_status_created", "project_id", "status", "created_at"),
+        # Status filter with due-date range or ordering
+        Index("ix_task_project_status_due", "project_id", "status", "due_date"),
+        # Due-date range or ordering, overdue
+        Index("ix_task_project_due_date", "project_id", "due_date"),
+        # Assignee filter, newest first
+        Index("ix_task_project_assignee_created", "project_id", "assignee_id", "created_at"),
+        # Priority filter, newest first
+        Index("ix_task_project_priority_created", "project_id", "priority", "created_at"),
+        # Recently updated lists and updated_at ranges
+        Index("ix_task_project_updated_at", "project_id", "updated_at")
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, ForeignKey, Enum as SQLEnum, Index
+from app.models.base import Base
+from app.core.constants import TaskPriorityEnum, TaskStatusEnum
+
+
+class TaskRollup(Base):
+    """Task counts per (owner, project, status, priority), maintained by TaskRepository writes."""
+    __tablename__ = "task_rollups"
+
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(SQLEnum(TaskStatusEnum), primary_key=True)
+    priority = Column(SQLEnum(TaskPriorityEnum), primary_key=True)
+    task_count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_rollup_project", "project_id"),
+    )
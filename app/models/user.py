@@ -17,8 +17,10 @@ class User(BaseModel):
 
     # Relationships
     projects = relationship("Project", back_populates="owner", cascade="all, delete-orphan")
-    tasks = relationship("Task", back_populates="assignee", cascade="all, delete-orphan")
-    project_memberships = relationship("ProjectMember", back_populates="user", cascade="all, delete-orphan")
+    # Assigned tasks outlive the user (assignee_id is SET NULL by the database), and
+    # memberships cascade there too; neither is ever loaded to be updated or deleted
+    tasks = relationship("Task", back_populates="assignee", passive_deletes=True)
+    project_memberships = relationship("ProjectMember", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     __table_args__ = (
         Index("ix_user_email_active", "email", "is_active"),
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, or_
+from sqlalchemy.exc import IntegrityError
+from app.models.deadline_scan_state import DeadlineScanState
+
+
+class DeadlineScanRepository:
+    """Lease and watermark storage for the due-date scanner."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    async def try_acquire_lease(
+        self,
+        name:str,
+        holder:str,
+        now:datetime,
+        ttl:timedelta
+    ) -> bool:
+        """Take or renew the named lease; False if another live holder has it."""
+        stmt = (
+            update(DeadlineScanState)
+            .where(DeadlineScanState.name == name)
+            .where(or_(
+                DeadlineScanState.holder == holder,
+                DeadlineScanState.lease_expires_at.is_(None),
+                DeadlineScanState.lease_expires_at < now
+            ))
+            .values(holder=holder, lease_expires_at=now + ttl)
+        )
+        result = await self.session.execute(stmt)
+        if result.rowcount:
+            await self.session.commit()
+            return True
+
+        # First scanner ever: create the row, racing the other workers
+        self.session.add(DeadlineScanState(
+            name=name,
+            holder=holder,
+            lease_expires_at=now + ttl
+        ))
+        try:
+            await self.session.commit()
+            return True
+        except IntegrityError:
+            await self.session.rollback()
+            return False
+
+
+    async def release_lease(self, name:str, holder:str) -> None:
+        """Give up the lease so another worker can take over right away."""
+        await self.session.execute(
+            update(DeadlineScanState)
+            .where(DeadlineScanState.name == name, DeadlineScanState.holder == holder)
+            .values(holder=None, lease_expires_at=None)
+        )
+        await self.session.commit()
+
+
+    async def get_state(self, name:str) -> DeadlineScanState | None:
+        """Get the scanner state row."""
+        stmt = select(DeadlineScanState).where(DeadlineScanState.name == name)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+
+    async def save_watermarks(
+        self,
+        name:str,
+        holder:str,
+        **watermarks
+    ) -> bool:
+        """Persist watermarks if the lease is still ours."""
+        result = await self.session.execute(
+            update(DeadlineScanState)
+            .where(DeadlineScanState.name == name, DeadlineScanState.holder == holder)
+            .values(**watermarks)
+        )
+        await self.session.commit()
+        return bool(result.rowcount)
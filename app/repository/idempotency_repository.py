@@ -0,0 +1,120 @@
+from datetime import datetime
+
+from sqlalchemy import select, update, delete, or_, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.idempotency_key import IdempotencyKey
+
+
+class IdempotencyRepository:
+    """Storage of idempotency keys and the responses they replay."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    async def claim(
+        self,
+        principal:str,
+        key:str,
+        fingerprint:str,
+        locked_until:datetime,
+        expires_at:datetime
+    ) -> IdempotencyKey | None:
+        """Record a key as being processed and commit; None when the key is already recorded.
+
+        The unique constraint on (principal, key) makes the first claim win
+        across workers.
+        """
+        record = IdempotencyKey(
+            principal=principal,
+            key=key,
+            fingerprint=fingerprint,
+            locked_until=locked_until,
+            expires_at=expires_at
+        )
+        self.session.add(record)
+        try:
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            return None
+        return record
+
+
+    async def get(self, principal:str, key:str) -> IdempotencyKey | None:
+        """Get a key's record."""
+        stmt = select(IdempotencyKey).where(IdempotencyKey.principal == principal, IdempotencyKey.key == key)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+
+    async def take_over(
+        self,
+        record_id:int,
+        fingerprint:str,
+        now:datetime,
+        locked_until:datetime,
+        expires_at:datetime
+    ) -> bool:
+        """Reclaim an expired key, or one whose processing worker's lock lapsed, and commit.
+
+        Guarded UPDATE: of several requests taking over the same record, one wins.
+        """
+        result = await self.session.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == record_id,
+                or_(
+                    IdempotencyKey.expires_at <= now,
+                    and_(IdempotencyKey.response_status.is_(None), IdempotencyKey.locked_until < now)
+                )
+            )
+            .values(
+                fingerprint=fingerprint,
+                response_status=None,
+                response_headers=None,
+                response_body=None,
+                locked_until=locked_until,
+                expires_at=expires_at
+            )
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+
+    async def complete(
+        self,
+        record_id:int,
+        status_code:int,
+        headers:list[list[str]],
+        body:bytes
+    ) -> None:
+        """Store the response of a processed key and commit."""
+        await self.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == record_id)
+            .values(response_status=status_code, response_headers=headers, response_body=body, locked_until=None)
+        )
+        await self.session.commit()
+
+
+    async def release(self, record_id:int) -> None:
+        """Forget a key whose request failed, so a retry runs it again, and commit."""
+        await self.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == record_id))
+        await self.session.commit()
+
+
+    async def purge_expired(self, now:datetime, limit:int) -> int:
+        """Delete up to ``limit`` expired keys and commit; returns how many."""
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at <= now)
+            .order_by(IdempotencyKey.expires_at)
+            .limit(limit)
+        )
+        result = await self.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired)).execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
@@ -0,0 +1,41 @@
+"""Related rows of many projects, a bounded number per project, in one query.
+
+``selectinload`` loads every child of every parent; for compound
+documents (``?include=``) each project's collection is capped instead.
+Each project gets its own ``ORDER BY ... LIMIT`` branch, which reads only
+those rows off the (project_id, order column) index, and the branches are
+combined with UNION ALL into a single statement.
+"""
+from typing import Sequence
+
+from sqlalchemy import Select, select, union_all
+
+
+def _ordering(source, order_by: Sequence[str]) -> list:
+    return [
+        getattr(source, name[1:]).desc() if name.startswith("-") else getattr(source, name)
+        for name in order_by
+    ]
+
+
+def first_rows_per_project(
+    model: type,
+    columns: Sequence,
+    project_ids: Sequence[int],
+    order_by: Sequence[str],
+    limit: int
+) -> Select:
+    """The first ``limit`` rows of ``model`` per project, ordered by project then ``order_by``.
+
+    ``order_by`` names columns of ``model``, prefixed with '-' for
+    descending; ``columns`` must include them and ``project_id``.
+    """
+    branches = [
+        select(*columns).where(model.project_id == project_id).order_by(*_ordering(model, order_by)).limit(limit)
+        for project_id in project_ids
+    ]
+    if len(branches) == 1:
+        return branches[0]
+    # SQLite only accepts LIMIT on a compound's branches inside subqueries
+    combined = union_all(*(select(branch.subquery()) for branch in branches)).subquery()
+    return select(combined).order_by(combined.c.project_id, *_ordering(combined.c, order_by))
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, or_, and_
+from app.models.job import Job
+from app.core.constants import JobStatusEnum
+
+
+class JobRepository:
+    """Storage and claiming of background jobs."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    async def enqueue(
+        self,
+        kind:str,
+        payload:dict[str, Any],
+        max_attempts:int,
+        run_after:datetime,
+        created_by:int | None = None
+    ) -> Job:
+        """Queue a job and commit."""
+        job = Job(
+            kind=kind,
+            payload=payload,
+            status=JobStatusEnum.QUEUED,
+            max_attempts=max_attempts,
+            run_after=run_after,
+            created_by=created_by
+        )
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+
+    async def get_by_id(self, job_id:int) -> Job | None:
+        """Get a job by id."""
+        stmt = select(Job).where(Job.id == job_id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+
+    async def claim(
+        self,
+        worker_id:str,
+        now:datetime,
+        lease:timedelta
+    ) -> Job | None:
+        """Claim the next due job, or a running one whose worker's lock lapsed, and commit.
+
+        A lapsed job that has used up its attempts is failed instead, in the
+        same transaction: a job that keeps killing its worker is not retried
+        forever. On PostgreSQL the candidate row is locked with ``FOR UPDATE
+        SKIP LOCKED`` so concurrent workers never wait on each other; the
+        guarded UPDATE makes the claim safe on databases without row locks.
+        """
+        lapsed = and_(Job.status == JobStatusEnum.RUNNING, Job.locked_until < now)
+        await self.session.execute(
+            update(Job)
+            .where(lapsed, Job.attempts >= Job.max_attempts)
+            .values(
+                status=JobStatusEnum.FAILED,
+                error="Worker lost while running the last attempt",
+                locked_by=None,
+                locked_until=None
+            )
+        )
+
+        claimable = or_(
+            and_(Job.status == JobStatusEnum.QUEUED, Job.run_after <= now),
+            and_(lapsed, Job.attempts < Job.max_attempts)
+        )
+        stmt = (
+            select(Job.id, Job.status, Job.attempts)
+            .where(claimable)
+            .order_by(Job.run_after, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        candidate = (await self.session.execute(stmt)).first()
+        if candidate is None:
+            await self.session.commit()
+            return None
+
+        result = await self.session.execute(
+            update(Job)
+            .where(
+                Job.id == candidate.id,
+                Job.status == candidate.status,
+                Job.attempts == candidate.attempts
+            )
+            .values(
+                status=JobStatusEnum.RUNNING,
+                attempts=Job.attempts + 1,
+                locked_by=worker_id,
+                locked_until=now + lease
+            )
+        )
+        await self.session.commit()
+        if not result.rowcount:
+            # Another worker got there first
+            return None
+        return await self.session.get(Job, candidate.id, populate_existing=True)
+
+
+    async def extend_lock(
+        self,
+        job_id:int,
+        worker_id:str,
+        locked_until:datetime
+    ) -> bool:
+        """Push back the lock of a job this worker is running; False if it lost the job."""
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatusEnum.RUNNING)
+            .values(locked_until=locked_until)
+        )
+        await self.session.commit()
+        return bool(result.rowcount)
+
+
+    async def set_progress(
+        self,
+        job_id:int,
+        worker_id:str,
+        progress:dict[str, Any],
+        locked_until:datetime
+    ) -> bool:
+        """Store progress of a job this worker is running, extending its lock."""
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatusEnum.RUNNING)
+            .values(progress=progress, locked_until=locked_until)
+        )
+        await self.session.commit()
+        return bool(result.rowcount)
+
+
+    async def finish(
+        self,
+        job_id:int,
+        worker_id:str,
+        **values
+    ) -> bool:
+        """Record the outcome of a job this worker is running and release its lock."""
+        result = await self.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatusEnum.RUNNING)
+            .values(locked_by=None, locked_until=None, **values)
+        )
+        await self.session.commit()
+        return bool(result.rowcount)
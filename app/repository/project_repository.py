@@ -1,9 +1,17 @@
+from datetime import datetime, timezone
 from typing import Any, Coroutine, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, Row, RowMapping
+from sqlalchemy import select, func, and_, update, delete, Row, RowMapping
+from sqlalchemy.orm import joinedload
 from app.models.project import Project
 from app.models.project_member import ProjectMember
+from app.models.task import Task
+from app.repository.task_rollup_repository import TaskRollupRepository
+from app.repository.includes import first_rows_per_project
+from app.core.dataloader import DataLoader, session_loader
+from app.core.entity_cache import project_cache, column_values, attach
+from app.core.cache import project_stats_cache
 from app.core.constants import ProjectStatusEnum
 
 
@@ -36,39 +44,140 @@ class ProjectRepository:
     
     
     
+    def _loader(self) -> DataLoader[int, Project]:
+        return session_loader(self.session, "projects", self._load_by_ids)
+    
+    
+    async def _load_by_ids(self, project_ids:list[int]) -> dict[int, Project]:
+        cached = await project_cache.get_many(project_ids, self._select_by_ids)
+        return {project_id: attach(self.session, Project, values) for project_id, values in cached.items() if values}
+    
+    
+    async def _select_by_ids(self, project_ids:list[int]) -> dict[int, dict]:
+        stmt = select(Project).where(Project.id.in_(project_ids), Project.deleted_at.is_(None))
+        result = await self.session.execute(stmt)
+        return {project.id: column_values(project) for project in result.scalars()}
+    
+    
     async def get_by_id(self, project_id:int) -> Project | None:
-        """Get project by ID.""" 
-        stmt = select(Project).where(Project.id == project_id)
+        """Get project by ID (batched per request, cached across them: see app.core.dataloader, app.core.entity_cache).""" 
+        return await self._loader().load(project_id)
+    
+    
+    async def get_many(self, project_ids:Sequence[int], with_owner:bool = False) -> list[Project]:
+        """Get the projects that exist among the given IDs, in that order, in one query (owners joined if asked)."""
+        if with_owner:
+            stmt = (
+                select(Project)
+                .where(Project.id.in_(project_ids), Project.deleted_at.is_(None))
+                .options(joinedload(Project.owner))
+            )
+            result = await self.session.execute(stmt)
+            by_id = {project.id: project for project in result.scalars()}
+            loader = self._loader()
+            for project_id in project_ids:
+                loader.prime(project_id, by_id.get(project_id))
+            return [by_id[project_id] for project_id in project_ids if project_id in by_id]
+        return [project for project in await self._loader().load_many(project_ids) if project is not None]
+    
+    
+    async def get_member_project_ids(self, user_id:int, project_ids:Sequence[int]) -> set[int]:
+        """Which of the given projects the user is a member of."""
+        if not project_ids:
+            return set()
+        stmt = select(ProjectMember.project_id).where(
+            ProjectMember.user_id == user_id, ProjectMember.project_id.in_(project_ids)
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars())
+    
+    
+    async def get_with_owner(self, project_id:int) -> Project | None:
+        """Get project by ID, its owner joined in the same query."""
+        stmt = (
+            select(Project)
+            .options(joinedload(Project.owner))
+            .where(Project.id == project_id, Project.deleted_at.is_(None))
+        )
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
     
     
+    async def get_row(self, project_id:int, columns:Sequence) -> Row | None:
+        """Get only the given columns of a project."""
+        stmt = select(*columns).where(Project.id == project_id, Project.deleted_at.is_(None))
+        result = await self.session.execute(stmt)
+        return result.first()
+    
+    
     async def get_user_projects(
         self,
         user_id:int,
         skip:int = 0,
-        limit:int = 100
+        limit:int = 100,
+        with_owner:bool = False
     ) -> Sequence[Project]:
-        """Get all projects owned by user."""
+        """Get a page of the projects owned by user, optionally with the owner joined."""
         stmt = (
-            select(Project).where(Project.owner_id == user_id).offset(skip).limit(limit=limit)
+            select(Project)
+            .where(Project.owner_id == user_id, Project.deleted_at.is_(None))
+            .order_by(Project.id)
+            .offset(skip)
+            .limit(limit=limit)
         )
+        if with_owner:
+            stmt = stmt.options(joinedload(Project.owner))
         result = await self.session.execute(stmt)
         return result.scalars().all()
     
     
     
+    async def get_user_project_rows(
+        self,
+        user_id:int,
+        columns:Sequence,
+        skip:int = 0,
+        limit:int = 100
+    ) -> Sequence[Row]:
+        """Get a page of a user's projects as plain column rows (no ORM objects)."""
+        stmt = (
+            select(*columns)
+            .where(Project.owner_id == user_id, Project.deleted_at.is_(None))
+            .order_by(Project.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
+    
     async def get_user_projects_count(
         self,
         user_id:int
     ) -> int:
         """Count user's projects"""
-        stmt = select(func.count(Project.id)).where(Project.owner_id == user_id)
+        stmt = select(func.count(Project.id)).where(Project.owner_id == user_id, Project.deleted_at.is_(None))
         result = await self.session.execute(stmt)
         return result.scalar() or 0
     
     
     
+    async def get_member_rows_by_project(
+        self,
+        project_ids:Sequence[int],
+        columns:Sequence,
+        limit:int
+    ) -> Sequence[Row]:
+        """The first ``limit`` memberships of each project as plain column rows, in one query."""
+        if not project_ids:
+            return []
+        stmt = first_rows_per_project(ProjectMember, columns, project_ids, ("id",), limit)
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
+    
     async def get_projects_by_member(
         self,
         user_id:int,
@@ -79,7 +188,7 @@ class ProjectRepository:
         stmt = (
             select(Project)
             .join(ProjectMember, Project.id==ProjectMember.project_id)
-            .where(ProjectMember.user_id == user_id)
+            .where(ProjectMember.user_id == user_id, Project.deleted_at.is_(None))
             .offset(skip)
             .limit(limit)
         )
@@ -91,37 +200,192 @@ class ProjectRepository:
     async def update(
         self,
         project_id,
+        expected_version:int | None = None,
+        owner_id:int | None = None,
         **kwargs
     ) -> Project | None:
-        """Update project fields"""
-        project = await self.get_by_id(project_id=project_id)
-        if not project:
+        """Update project fields in one compare-and-set UPDATE ... RETURNING, bumping the version.
+        
+        The project must be live, still at ``expected_version`` (if given)
+        and owned by ``owner_id`` (if given). Returns None, having changed
+        nothing, when it does not match (see ``get_write_state``).
+        """
+        conditions = [Project.id == project_id, Project.deleted_at.is_(None)]
+        if expected_version is not None:
+            conditions.append(Project.version == expected_version)
+        if owner_id is not None:
+            conditions.append(Project.owner_id == owner_id)
+        result = await self.session.execute(
+            update(Project)
+            .where(*conditions)
+            .values(**kwargs, version=Project.version + 1)
+            .returning(Project)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        project = result.scalar_one_or_none()
+        if project is None:
+            await self.session.rollback()
             return None
-        for key, item in kwargs.items():
-            if hasattr(project,key):
-                setattr(project,key,item)
-                
         await self.session.commit()
-        await self.session.refresh(project)
+        await project_cache.invalidate([project_id])
         return project
     
     
+    async def get_write_state(self, project_id:int) -> Row | None:
+        """(version, owner_id) of a live project, to explain a failed update."""
+        stmt = select(Project.version, Project.owner_id).where(Project.id == project_id, Project.deleted_at.is_(None))
+        result = await self.session.execute(stmt)
+        return result.first()
+    
+    
     
-    async def delete(
+    async def transfer_owned_batch(
         self,
-        project_id: int
+        owner_id: int,
+        new_owner_id: int,
+        batch_size: int
     ) -> int:
-        """Delete project and cascade"""
-        project = await self.get_by_id(project_id=project_id)
-        if not project:
-            return False
+        """Give up to ``batch_size`` projects of an owner to another user, rollups included.
         
-        await self.session.delete(project)
-        await self.session.commit()
-        return True
+        Returns how many were transferred; 0 once none are left.
+        """
+        stmt = select(Project.id).where(Project.owner_id == owner_id).limit(batch_size)
+        project_ids = (await self.session.execute(stmt)).scalars().all()
+        if not project_ids:
+            return 0
         
+        await self.session.execute(
+            update(Project)
+            .where(Project.id.in_(project_ids))
+            .values(owner_id=new_owner_id, version=Project.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await TaskRollupRepository(session=self.session).transfer_projects(project_ids, new_owner_id)
+        await self.session.commit()
+        await project_cache.invalidate(project_ids)
+        return len(project_ids)
+    
     
+    async def archive_owned_batch(
+        self,
+        owner_id: int,
+        batch_size: int
+    ) -> int:
+        """Archive up to ``batch_size`` live projects of an owner; 0 once none are left."""
+        batch = (
+            select(Project.id)
+            .where(
+                Project.owner_id == owner_id,
+                Project.status != ProjectStatusEnum.ARCHIVED,
+                Project.deleted_at.is_(None)
+            )
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(Project)
+            .where(Project.id.in_(batch))
+            .values(status=ProjectStatusEnum.ARCHIVED, version=Project.version + 1)
+            .returning(Project.id)
+            .execution_options(synchronize_session=False)
+        )
+        project_ids = result.scalars().all()
+        await self.session.commit()
+        await project_cache.invalidate(project_ids)
+        return len(project_ids)
     
     
+    async def delete_memberships_batch(
+        self,
+        user_id: int,
+        batch_size: int
+    ) -> int:
+        """Remove up to ``batch_size`` project memberships of a user; 0 once none are left."""
+        batch = (
+            select(ProjectMember.id)
+            .where(ProjectMember.user_id == user_id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            delete(ProjectMember)
+            .where(ProjectMember.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+    
+    
+    async def mark_deleted(
+        self,
+        project_id: int
+    ) -> bool:
+        """Hide a project from every read right away; its rows are purged later.
+
+        Also drops the project's rollups and cached stats. Safe to repeat.
+        """
+        self._loader().clear(project_id)
+        result = await self.session.execute(
+            update(Project)
+            .where(Project.id == project_id, Project.deleted_at.is_(None))
+            .values(deleted_at=datetime.now(timezone.utc).replace(tzinfo=None), version=Project.version + 1)
+        )
+        await TaskRollupRepository(session=self.session).delete_project(project_id)
+        await self.session.commit()
+        await project_cache.invalidate([project_id])
+        project_stats_cache.invalidate(project_id)
+        return bool(result.rowcount)
+    
+    
+    async def count_tasks(
+        self,
+        project_id: int
+    ) -> int:
+        """Count the tasks of a project, deleted or not."""
+        stmt = select(func.count(Task.id)).where(Task.project_id == project_id)
+        result = await self.session.execute(stmt)
+        return result.scalar() or 0
+    
+    
+    async def delete_tasks_batch(
+        self,
+        project_id: int,
+        batch_size: int
+    ) -> int:
+        """Delete up to ``batch_size`` tasks of a deleted project in a short transaction.
         
-        
\ No newline at end of file
+        Returns how many were deleted; 0 once none are left.
+        """
+        batch = (
+            select(Task.id)
+            .where(Task.project_id == project_id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            delete(Task)
+            .where(Task.id.in_(batch))
+            .where(Task.project_id.in_(select(Project.id).where(Project.deleted_at.isnot(None))))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+    
+    
+    async def purge(
+        self,
+        project_id: int
+    ) -> bool:
+        """Delete a deleted project's memberships and row once its tasks are gone."""
+        stmt = select(Project.id).where(Project.id == project_id, Project.deleted_at.isnot(None))
+        if (await self.session.execute(stmt)).scalar() is None:
+            return False
+        
+        await self.session.execute(delete(ProjectMember).where(ProjectMember.project_id == project_id))
+        await self.session.execute(
+            delete(Project)
+            .where(Project.id == project_id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return True
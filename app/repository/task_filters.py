@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import ColumnElement, UnaryExpression, asc, desc
+from app.models.task import Task
+from app.core.constants import OPEN_TASK_STATUSES
+from app.schemas import TaskFilter
+
+
+class InvalidTaskFilterError(ValueError):
+    """Raised when a task filter cannot be served by an index."""
+
+
+# Columns a task list can be ordered by, with their default direction
+SORTABLE_COLUMNS = {
+    "created_at": desc,
+    "updated_at": desc,
+    "due_date": asc,
+}
+
+
+@dataclass(frozen=True)
+class CompiledTaskFilter:
+    """WHERE/ORDER BY clauses for a task filter and the indexes able to serve both."""
+    where: tuple[ColumnElement, ...]
+    order_by: tuple[UnaryExpression, ...]
+    indexes: tuple[str, ...]
+
+    @property
+    def index(self) -> str:
+        """The narrowest covering index."""
+        return self.indexes[0]
+
+
+def _as_utc_naive(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC, matching how timestamps are stored."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _covering_indexes(equality: set[str], order_column: str) -> tuple[str, ...]:
+    """Find indexes whose leading columns are the equality columns followed by the order column."""
+    covering = []
+    for index in sorted(Task.__table__.indexes, key=lambda i: (len(i.columns), i.name)):
+        columns = [c.name for c in index.columns]
+        if len(columns) <= len(equality) or set(columns[:len(equality)]) != equality:
+            continue
+        if columns[len(equality)] == order_column:
+            covering.append(index.name)
+    return tuple(covering)
+
+
+def compile_task_filter(
+    project_id: int,
+    filters: TaskFilter,
+    now: datetime | None = None
+) -> CompiledTaskFilter:
+    """Compile a task filter into parameterized clauses.
+
+    Filters are equalities on the leading columns of an index; the next
+    index column is the one the list is ordered by, and the only column a
+    range may be applied to. The result is always an index search returning
+    rows already in order. Combinations no index covers are rejected.
+    """
+    where: list[ColumnElement] = [Task.project_id == project_id]
+    equality = {"project_id"}
+    ranges: dict[str, list[ColumnElement]] = {}
+
+    if filters.status is not None:
+        where.append(Task.status == filters.status)
+        equality.add("status")
+    if filters.priority is not None:
+        where.append(Task.priority == filters.priority)
+        equality.add("priority")
+    if filters.assignee_id is not None:
+        where.append(Task.assignee_id == filters.assignee_id)
+        equality.add("assignee_id")
+
+    if filters.overdue:
+        if filters.status is not None and filters.status not in OPEN_TASK_STATUSES:
+            raise InvalidTaskFilterError(f"Tasks with status '{filters.status.value}' cannot be overdue")
+        now = _as_utc_naive(now or datetime.now(timezone.utc))
+        if filters.status is None:
+            # Residual check on the due-date range; open statuses are not selective enough to lead
+            where.append(Task.status.in_(OPEN_TASK_STATUSES))
+        ranges.setdefault("due_date", []).append(Task.due_date < now)
+
+    bounds = (
+        ("due_date", Task.due_date, filters.due_after, filters.due_before),
+        ("created_at", Task.created_at, filters.created_after, filters.created_before),
+        ("updated_at", Task.updated_at, filters.updated_after, filters.updated_before),
+    )
+    for name, column, after, before in bounds:
+        if after is not None:
+            ranges.setdefault(name, []).append(column >= _as_utc_naive(after))
+        if before is not None:
+            ranges.setdefault(name, []).append(column < _as_utc_naive(before))
+
+    if len(ranges) > 1:
+        raise InvalidTaskFilterError(
+            f"Only one range filter is supported per query, got: {', '.join(sorted(ranges))}"
+        )
+    range_column = next(iter(ranges), None)
+    if range_column:
+        where.extend(ranges[range_column])
+
+    sort_key, direction = range_column or "created_at", None
+    if filters.sort:
+        direction = desc if filters.sort.startswith("-") else asc
+        sort_key = filters.sort.lstrip("+-")
+        if sort_key not in SORTABLE_COLUMNS:
+            raise InvalidTaskFilterError(
+                f"Unsupported sort field '{sort_key}'. Allowed: {', '.join(SORTABLE_COLUMNS)}"
+            )
+        if range_column and sort_key != range_column:
+            raise InvalidTaskFilterError(
+                f"A {range_column} range can only be sorted by {range_column}"
+            )
+    direction = direction or SORTABLE_COLUMNS[sort_key]
+
+    indexes = _covering_indexes(equality, sort_key)
+    if not indexes:
+        filtered = sorted(equality - {"project_id"}) + ([range_column] if range_column else [])
+        raise InvalidTaskFilterError(
+            f"Unsupported filter combination: {', '.join(filtered) or 'none'} sorted by {sort_key}"
+        )
+
+    column = getattr(Task, sort_key)
+    return CompiledTaskFilter(
+        where=tuple(where),
+        order_by=(direction(column), direction(Task.id)),
+        indexes=indexes
+    )
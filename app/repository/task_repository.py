@@ -1,13 +1,29 @@
-from typing import  Sequence
+from collections import Counter
+from datetime import datetime
+from typing import  AsyncIterator, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, func, and_, or_, desc, case, update, Select, Row, ColumnElement
 from app.models.task import Task
-from app.core.constants import TaskStatusEnum, TaskPriorityEnum
+from app.models.project import Project
+from app.models.project_member import ProjectMember
+from app.core.cache import project_stats_cache
+from app.core.constants import TaskStatusEnum, TaskPriorityEnum, OPEN_TASK_STATUSES
+from app.repository.task_filters import compile_task_filter
+from app.repository.task_rollup_repository import TaskRollupRepository
+from app.repository.includes import first_rows_per_project
+from app.core.dataloader import DataLoader, session_loader
+from app.schemas import TaskFilter
+
+def _in_live_project() -> ColumnElement:
+    """Exclude tasks of projects being purged."""
+    return Task.project_id.not_in(select(Project.id).where(Project.deleted_at.isnot(None)))
+
 
 class TaskRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.rollups = TaskRollupRepository(session=session)
         
     async def create(
         self,
@@ -23,57 +39,169 @@ class TaskRepository:
             title=title,
             description=description,
             project_id=project_id,
-            priority=priority,
+            status=TaskStatusEnum.OPEN,
+            priority=priority or TaskPriorityEnum.MEDIUM,
             assignee_id=assignee_id,
             due_date=due_date
         )
         self.session.add(task)
+        await self.rollups.apply_delta(project_id, task.status, task.priority, delta=1)
         await  self.session.commit()
         await  self.session.refresh(task)
+        project_stats_cache.invalidate(project_id)
         return task
     
     
     
+    def _loader(self) -> DataLoader[int, Task]:
+        return session_loader(self.session, "tasks", self._load_by_ids)
+    
+    
+    async def _load_by_ids(self, task_ids:list[int]) -> dict[int, Task]:
+        result = await self.session.execute(select(Task).where(Task.id.in_(task_ids)))
+        return {task.id: task for task in result.scalars()}
+    
+    
     async def get_by_id(
         self,
         task_id:int
     ) -> Task | None:
-        """Get task by ID"""
-        stmt = select(Task).where(Task.id == task_id)
+        """Get task by ID (batched and remembered for the session, see app.core.dataloader)."""
+        return await self._loader().load(task_id)
+    
+    
+    async def get_many(self, task_ids:Sequence[int]) -> list[Task]:
+        """Get the tasks that exist among the given IDs, in that order, in one query."""
+        return [task for task in await self._loader().load_many(task_ids) if task is not None]
+    
+    
+    async def get_row(
+        self,
+        task_id:int,
+        columns:Sequence,
+        project_id:int | None = None
+    ) -> Row | None:
+        """Get only the given columns of a task (optionally checking its project)."""
+        stmt = select(*columns).where(Task.id == task_id)
+        if project_id is not None:
+            stmt = stmt.where(Task.project_id == project_id)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return result.first()
+    
+    
+    async def iter_project_task_rows(
+        self,
+        project_id:int,
+        columns:Sequence,
+        batch_size:int
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield all tasks of a project in batches, oldest first, with the given columns.
+        
+        Keyset-paginated on (created_at, id) over ``ix_task_project_created_at``,
+        so every batch is a short index range scan. Rows also carry
+        ``created_at`` and ``id`` when they were not requested.
+        """
+        selected = {column.key for column in columns}
+        keys = [column for column in (Task.created_at, Task.id) if column.key not in selected]
+        base = (
+            select(*columns, *keys)
+            .where(Task.project_id == project_id)
+            .order_by(Task.created_at, Task.id)
+            .limit(batch_size)
+        )
+        stmt = base
+        while True:
+            rows = (await self.session.execute(stmt)).all()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            stmt = base.where(or_(
+                Task.created_at > last.created_at,
+                and_(Task.created_at == last.created_at, Task.id > last.id)
+            ))
     
     
+    def build_project_tasks_query(
+        self,
+        project_id:int,
+        filters:TaskFilter,
+        skip:int = 0,
+        limit:int = 100,
+        columns:Sequence | None = None
+    ) -> Select:
+        """Build the (index-checked) task list query for a project.
+        
+        Selects whole tasks, or only ``columns`` as plain rows.
+        """
+        compiled = compile_task_filter(project_id=project_id, filters=filters)
+        return (
+            (select(*columns) if columns else select(Task))
+            .where(*compiled.where)
+            .order_by(*compiled.order_by)
+            .offset(skip)
+            .limit(limit)
+        )
+
+
     async def get_project_tasks(
         self,
         project_id:int,
         skip:int = 0,
         limit:int = 100,
-        status:TaskStatusEnum | None = None
+        status:TaskStatusEnum | None = None,
+        filters:TaskFilter | None = None
     ) -> Sequence[Task]:
-        """Get all tasks in a project with optional status filter."""
-        stmt = select(Task).where(Task.project_id == project_id)
-        
-        if status:
-            stmt = stmt.where(Task.status == status)
-            
-        stmt = stmt.offset(skip).limit(limit=limit).order_by(desc(Task.created_at))
+        """Get tasks in a project matching the given filters."""
+        filters = filters or TaskFilter(status=status)
+        stmt = self.build_project_tasks_query(project_id, filters, skip=skip, limit=limit)
         result = await self.session.execute(stmt)
         return result.scalars().all()
     
     
     
+    async def get_latest_rows_by_project(
+        self,
+        project_ids:Sequence[int],
+        columns:Sequence,
+        limit:int
+    ) -> Sequence[Row]:
+        """The ``limit`` newest tasks of each project as plain column rows, in one query."""
+        if not project_ids:
+            return []
+        stmt = first_rows_per_project(Task, columns, project_ids, ("-created_at", "-id"), limit)
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
+    
+    async def get_project_task_rows(
+        self,
+        project_id:int,
+        filters:TaskFilter,
+        columns:Sequence,
+        skip:int = 0,
+        limit:int = 100
+    ) -> Sequence[Row]:
+        """Get a page of a project's tasks as plain column rows (no ORM objects)."""
+        stmt = self.build_project_tasks_query(project_id, filters, skip=skip, limit=limit, columns=columns)
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
+    
     async def get_project_tasks_count(
         self,
         project_id:int,
-        status:TaskStatusEnum | None = None
+        status:TaskStatusEnum | None = None,
+        filters:TaskFilter | None = None
     ) -> int:
-        """Count tasks in a project."""
-        stmt = select(func.count(Task.id)).where(Task.project_id == project_id)
-        
-        if status:
-            stmt = stmt.where(Task.status == status )
-            
+        """Count tasks in a project matching the given filters."""
+        filters = filters or TaskFilter(status=status)
+        compiled = compile_task_filter(project_id=project_id, filters=filters)
+        stmt = select(func.count(Task.id)).where(*compiled.where)
         result = await self.session.execute(stmt)
         return result.scalar() or 0
     
@@ -87,7 +215,7 @@ class TaskRepository:
         status:TaskStatusEnum | None = None
     ) -> Sequence[Task]:
         """Get all tasks assigned to a user."""
-        stmt = select(Task).where(Task.assignee_id == user_id)
+        stmt = select(Task).where(Task.assignee_id == user_id, _in_live_project())
         
         if status:
             stmt = stmt.where(Task.status == status)
@@ -101,22 +229,69 @@ class TaskRepository:
     async def update(
         self,
         task_id: int,
+        project_id: int | None = None,
+        expected_version: int | None = None,
+        editor_id: int | None = None,
         **kwargs
     ) -> Task | None:
-        """Delete a task."""
-        task = await self.get_by_id(task_id)
-        if not task:
-            return None
+        """Update task fields in one compare-and-set UPDATE ... RETURNING, bumping the version.
         
-        for key, value in kwargs.items():
-            if hasattr(task,key):
-                setattr(task,key,value)
-                
+        The task must be in a live project (``project_id``, if given), still
+        at ``expected_version`` (if given), and, with ``editor_id``, in a
+        project that user owns or assigned to them. Nothing is read first:
+        a status or priority change learns the rollup bucket the task leaves
+        from the decrement itself, and the UPDATE only matches while the
+        task is still in that bucket. Returns None, having changed nothing,
+        when the task does not match (see ``get_write_state``).
+        """
+        conditions = [Task.id == task_id, _in_live_project()]
+        if project_id is not None:
+            conditions.append(Task.project_id == project_id)
+        if expected_version is not None:
+            conditions.append(Task.version == expected_version)
+        if editor_id is not None:
+            conditions.append(or_(
+                Task.assignee_id == editor_id,
+                Task.project_id.in_(select(Project.id).where(Project.owner_id == editor_id))
+            ))
+        
+        moves_bucket = "status" in kwargs or "priority" in kwargs
+        if moves_bucket:
+            old_bucket = await self.rollups.take_out(conditions)
+            if old_bucket is None:
+                await self.session.rollback()
+                return None
+            conditions += [Task.status == old_bucket[0], Task.priority == old_bucket[1]]
+        
+        result = await self.session.execute(
+            update(Task)
+            .where(*conditions)
+            .values(**kwargs, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        task = result.scalar_one_or_none()
+        if task is None:
+            await self.session.rollback()
+            return None
+        if moves_bucket:
+            await self.rollups.apply_delta(task.project_id, task.status, task.priority, delta=1)
         await self.session.commit()
-        await self.session.refresh(task)
+        project_stats_cache.invalidate(task.project_id)
         return task
     
     
+    async def get_write_state(self, task_id:int) -> Row | None:
+        """(version, project_id, assignee_id, owner_id) of a task in a live project, to explain a failed update."""
+        stmt = (
+            select(Task.version, Task.project_id, Task.assignee_id, Project.owner_id)
+            .join(Project, Project.id == Task.project_id)
+            .where(Task.id == task_id, Project.deleted_at.is_(None))
+        )
+        result = await self.session.execute(stmt)
+        return result.first()
+    
+    
     
     
     async def delete(
@@ -129,7 +304,10 @@ class TaskRepository:
             return None
         
         await self.session.delete(task)
+        await self.rollups.apply_delta(task.project_id, task.status, task.priority, delta=-1)
         await self.session.commit()
+        self._loader().clear(task_id)
+        project_stats_cache.invalidate(task.project_id)
         return True
     
     
@@ -141,16 +319,146 @@ class TaskRepository:
         to_status: TaskStatusEnum
     ) -> int:
         """Update all tasks with a given status in a project."""
-        stmt = (
-            select(Task).where(and_(Task.project_id == project_id,
-                                    Task.status == from_status))
+        # RETURNING reports exactly the rows this statement changed, so the
+        # rollup deltas match the update even if tasks change concurrently
+        result = await self.session.execute(
+            update(Task)
+            .where(Task.project_id == project_id, Task.status == from_status)
+            .values(status=to_status, version=Task.version + 1)
+            .returning(Task.priority)
+            .execution_options(synchronize_session=False)
         )
-        result = await self.session.execute(stmt)
-        tasks = result.scalars().all()
+        moved_by_priority = Counter(result.scalars().all())
+        
+        deltas:dict[tuple[TaskStatusEnum, TaskPriorityEnum], int] = {}
+        if from_status != to_status:
+            for priority, count in moved_by_priority.items():
+                deltas[(from_status, priority)] = -count
+                deltas[(to_status, priority)] = count
+        await self.rollups.apply_deltas(project_id, deltas)
+        await self.session.commit()
+        project_stats_cache.invalidate(project_id)
+        return sum(moved_by_priority.values())
+    
+    
+    
+    async def reassign_open_tasks_batch(
+        self,
+        from_user_id:int,
+        to_user_id:int | None,
+        batch_size:int
+    ) -> int:
+        """Move up to ``batch_size`` open tasks of a user to another (or unassign them).
         
-        for task in tasks:
-            task.status = to_status
-            
+        One set-based UPDATE over ``ix_task_assignee``; closed tasks keep
+        their assignee. Tasks of projects the new assignee neither owns nor
+        is a member of are unassigned instead. Returns how many were moved;
+        0 once none are left.
+        """
+        batch = (
+            select(Task.id)
+            .where(Task.assignee_id == from_user_id, Task.status.in_(OPEN_TASK_STATUSES))
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        assignee = None
+        if to_user_id is not None:
+            can_see_project = or_(
+                Task.project_id.in_(select(Project.id).where(Project.owner_id == to_user_id)),
+                Task.project_id.in_(select(ProjectMember.project_id).where(ProjectMember.user_id == to_user_id))
+            )
+            assignee = case((can_see_project, to_user_id), else_=None)
+        result = await self.session.execute(
+            update(Task)
+            .where(Task.id.in_(batch))
+            .values(assignee_id=assignee, version=Task.version + 1)
+            .returning(Task.project_id)
+            .execution_options(synchronize_session=False)
+        )
+        project_ids = result.scalars().all()
         await self.session.commit()
-        return len(tasks)
-        
\ No newline at end of file
+        for project_id in set(project_ids):
+            project_stats_cache.invalidate(project_id)
+        return len(project_ids)
+    
+    
+    
+    def build_project_aggregates_query(
+        self,
+        project_id:int,
+        now:datetime
+    ) -> Select:
+        """Build the single-pass (status, priority, assignee) aggregate over a project's tasks."""
+        is_overdue = case(
+            (and_(Task.due_date < now, Task.status.in_(OPEN_TASK_STATUSES)), 1),
+            else_=0
+        )
+        return (
+            select(
+                Task.status,
+                Task.priority,
+                Task.assignee_id,
+                func.count(Task.id).label("task_count"),
+                func.sum(is_overdue).label("overdue")
+            )
+            .where(Task.project_id == project_id)
+            .group_by(Task.status, Task.priority, Task.assignee_id)
+        )
+    
+    
+    async def get_project_aggregates(
+        self,
+        project_id:int,
+        now:datetime
+    ) -> Sequence[Row]:
+        """Count a project's tasks per (status, priority, assignee) in one query.
+        
+        Each row carries the group's task count and how many of them are overdue.
+        """
+        stmt = self.build_project_aggregates_query(project_id=project_id, now=now)
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
+    
+    async def get_open_tasks_due(
+        self,
+        after:datetime,
+        until:datetime,
+        after_id:int = 0,
+        limit:int = 500
+    ) -> Sequence[Row]:
+        """Get open tasks due in (after, until], keyset-paginated on (due_date, id).
+        
+        The range is served by ``ix_task_due_date``.
+        """
+        stmt = (
+            select(Task.id, Task.project_id, Task.assignee_id, Task.title, Task.due_date, Task.updated_at)
+            .where(Task.due_date >= after)
+            .where(or_(Task.due_date > after, Task.id > after_id))
+            .where(Task.due_date <= until)
+            .where(Task.status.in_(OPEN_TASK_STATUSES))
+            .where(_in_live_project())
+            .order_by(Task.due_date, Task.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
+    async def get_overdue_among(
+        self,
+        task_ids:Sequence[int],
+        now:datetime
+    ) -> Sequence[Row]:
+        """Of the given tasks, get those that are still open and past due."""
+        stmt = (
+            select(Task.id, Task.project_id, Task.assignee_id, Task.title, Task.due_date)
+            .where(Task.id.in_(task_ids))
+            .where(Task.due_date <= now)
+            .where(Task.status.in_(OPEN_TASK_STATUSES))
+            .where(_in_live_project())
+            .order_by(Task.due_date, Task.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
@@ -0,0 +1,201 @@
+from typing import Mapping, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, delete, insert, update, text, literal, Row, ColumnElement
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.task import Task
+from app.models.project import Project
+from app.models.task_rollup import TaskRollup
+from app.core.constants import TaskStatusEnum, TaskPriorityEnum
+
+
+class TaskRollupRepository:
+    """Incrementally maintained task counts for portfolio reporting.
+
+    Deltas are applied in the caller's transaction and never commit, so the
+    rollups always move together with the task writes that caused them.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    def _insert(self):
+        """Dialect-specific INSERT supporting ON CONFLICT."""
+        if self.session.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(TaskRollup)
+        return sqlite.insert(TaskRollup)
+
+
+    @staticmethod
+    def _add_to_bucket(stmt):
+        """Make an INSERT of bucket rows add their counts to existing buckets."""
+        return stmt.on_conflict_do_update(
+            index_elements=[
+                TaskRollup.owner_id,
+                TaskRollup.project_id,
+                TaskRollup.status,
+                TaskRollup.priority
+            ],
+            set_={"task_count": TaskRollup.task_count + stmt.excluded.task_count}
+        )
+
+
+    async def apply_delta(
+        self,
+        project_id:int,
+        status:TaskStatusEnum,
+        priority:TaskPriorityEnum,
+        delta:int
+    ) -> None:
+        """Add ``delta`` to the count of one (project, status, priority) bucket."""
+        if not delta:
+            return
+        owner_id = select(Project.owner_id).where(Project.id == project_id).scalar_subquery()
+        stmt = self._insert().values(
+            owner_id=owner_id,
+            project_id=project_id,
+            status=status,
+            priority=priority,
+            task_count=delta
+        )
+        await self.session.execute(self._add_to_bucket(stmt))
+
+
+    async def take_out(
+        self,
+        task_conditions:Sequence[ColumnElement]
+    ) -> tuple[TaskStatusEnum, TaskPriorityEnum] | None:
+        """Decrement the bucket of the task matching ``task_conditions`` and return that bucket.
+
+        One statement, so an update can learn the bucket a task leaves
+        without reading the task first. None when no task matches.
+        """
+        buckets = (
+            select(Project.owner_id, Task.project_id, Task.status, Task.priority, literal(-1))
+            .join(Project, Project.id == Task.project_id)
+            .where(*task_conditions)
+        )
+        stmt = self._insert().from_select(
+            ["owner_id", "project_id", "status", "priority", "task_count"],
+            buckets
+        )
+        stmt = self._add_to_bucket(stmt).returning(TaskRollup.status, TaskRollup.priority)
+        row = (await self.session.execute(stmt)).first()
+        return (row.status, row.priority) if row else None
+
+
+    async def apply_deltas(
+        self,
+        project_id:int,
+        deltas:Mapping[tuple[TaskStatusEnum, TaskPriorityEnum], int]
+    ) -> None:
+        """Apply several bucket deltas of one project.
+
+        Buckets are always locked in the same (status, priority) order, so
+        two transactions touching the same buckets cannot deadlock.
+        """
+        for status, priority in sorted(deltas, key=lambda bucket: (bucket[0].name, bucket[1].name)):
+            await self.apply_delta(project_id, status, priority, delta=deltas[(status, priority)])
+
+
+    async def transfer_projects(self, project_ids:Sequence[int], owner_id:int) -> None:
+        """Move the buckets of projects that changed owner."""
+        await self.session.execute(
+            update(TaskRollup)
+            .where(TaskRollup.project_id.in_(project_ids))
+            .values(owner_id=owner_id)
+        )
+
+
+    async def delete_project(self, project_id:int) -> None:
+        """Drop all buckets of a project."""
+        await self.session.execute(delete(TaskRollup).where(TaskRollup.project_id == project_id))
+
+
+    async def rebuild(self) -> int:
+        """Recompute every bucket from the tasks table and commit.
+
+        Must be run once right after deploying the rollups: the table is
+        created empty, and decrements applied before the rebuild leave
+        negative counts. Returns the number of buckets written.
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            # Hold off concurrent deltas until the fresh counts are in place
+            await self.session.execute(text("LOCK TABLE task_rollups IN EXCLUSIVE MODE"))
+
+        await self.session.execute(delete(TaskRollup))
+        counts = (
+            select(
+                Project.owner_id,
+                Task.project_id,
+                Task.status,
+                Task.priority,
+                func.count(Task.id)
+            )
+            .join(Project, Project.id == Task.project_id)
+            .where(Project.deleted_at.is_(None))
+            .group_by(Project.owner_id, Task.project_id, Task.status, Task.priority)
+        )
+        await self.session.execute(
+            insert(TaskRollup).from_select(
+                ["owner_id", "project_id", "status", "priority", "task_count"],
+                counts
+            )
+        )
+        await self.session.commit()
+
+        result = await self.session.execute(select(func.count()).select_from(TaskRollup))
+        return result.scalar() or 0
+
+
+    async def get_owner_breakdown(self, owner_id:int) -> Sequence[Row]:
+        """Get (project, status, priority, count) rows for one owner."""
+        stmt = (
+            select(
+                TaskRollup.project_id,
+                TaskRollup.status,
+                TaskRollup.priority,
+                TaskRollup.task_count
+            )
+            .where(TaskRollup.owner_id == owner_id)
+            .where(TaskRollup.task_count != 0)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+
+    async def get_owners_breakdown(
+        self,
+        skip:int = 0,
+        limit:int = 100
+    ) -> Sequence[Row]:
+        """Get (owner, status, priority, count) rows for a page of owners."""
+        owners = (
+            select(TaskRollup.owner_id)
+            .distinct()
+            .order_by(TaskRollup.owner_id)
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        stmt = (
+            select(
+                TaskRollup.owner_id,
+                TaskRollup.status,
+                TaskRollup.priority,
+                func.sum(TaskRollup.task_count).label("task_count")
+            )
+            .where(TaskRollup.owner_id.in_(select(owners.c.owner_id)))
+            .group_by(TaskRollup.owner_id, TaskRollup.status, TaskRollup.priority)
+            .order_by(TaskRollup.owner_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+
+    async def count_owners(self) -> int:
+        """Count owners with at least one rollup bucket."""
+        stmt = select(func.count(func.distinct(TaskRollup.owner_id)))
+        result = await self.session.execute(stmt)
+        return result.scalar() or 0
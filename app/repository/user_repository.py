@@ -1,9 +1,14 @@
 from typing import  Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, Row
 from app.models.user import User
 from app.core.constants import RoleEnum
+from app.core.dataloader import DataLoader, session_loader
+from app.core.entity_cache import user_cache, column_values, attach
+
+# Left out of cached users: authentication reads them from the database
+UNCACHED_COLUMNS = ("hashed_password",)
 
 class UserRepository:
     """User data access layer."""
@@ -35,11 +40,46 @@ class UserRepository:
     
     
     
-    async def get_by_id(self,user_id:int) -> User | None:
-        """Get user by ID."""
-        stmt = select(User).where(User.id == user_id).where(User.is_active == True)
+    def _loader(self) -> DataLoader[int, User]:
+        return session_loader(self.session, "users", self._load_by_ids)
+    
+    async def _load_by_ids(self, user_ids:list[int]) -> dict[int, User]:
+        cached = await user_cache.get_many(user_ids, self._select_by_ids)
+        return {user_id: attach(self.session, User, values) for user_id, values in cached.items() if values}
+    
+    async def _select_by_ids(self, user_ids:list[int]) -> dict[int, dict]:
+        stmt = select(User).where(User.id.in_(user_ids)).where(User.is_active == True)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return {user.id: column_values(user, exclude=UNCACHED_COLUMNS) for user in result.scalars()}
+    
+    async def get_by_id(self,user_id:int, cached:bool = True) -> User | None:
+        """Get active user by ID (batched per request, cached across them: see app.core.dataloader, app.core.entity_cache).
+        
+        ``cached=False`` reads the row itself, for authentication: deactivation,
+        role and password changes must apply at once on every worker.
+        """
+        if not cached:
+            stmt = (
+                select(User)
+                .where(User.id == user_id)
+                .where(User.is_active == True)
+                .execution_options(populate_existing=True)
+            )
+            user = (await self.session.execute(stmt)).scalar_one_or_none()
+            if user is not None:
+                self._loader().prime(user_id, user)
+            return user
+        return await self._loader().load(user_id)
+    
+    async def get_many(self, user_ids:Sequence[int]) -> list[User]:
+        """Get the active users among the given IDs, in that order, in one query."""
+        return [user for user in await self._loader().load_many(user_ids) if user is not None]
+    
+    async def get_row(self, user_id:int, columns:Sequence) -> Row | None:
+        """Get only the given columns of an active user."""
+        stmt = select(*columns).where(User.id == user_id).where(User.is_active == True)
+        result = await self.session.execute(stmt)
+        return result.first()
     
     async def get_by_email(self, email: str) -> User | None:
         """Get user by email."""
@@ -66,7 +106,10 @@ class UserRepository:
                 setattr(user,key,value)
                 
         await self.session.commit()
+        await user_cache.invalidate([user_id])
         await self.session.refresh(user)
+        if not user.is_active:
+            self._loader().clear(user_id)
         return user
     
     
@@ -74,12 +117,14 @@ class UserRepository:
     
     async def delete(self, user_id:int) -> bool:
         """Soft delete user."""
-        user = self.get_by_id(user_id=user_id)
+        user = await self.get_by_id(user_id=user_id)
         if not user:
             return False
         
         user.is_active = False
         await self.session.commit()
+        await user_cache.invalidate([user_id])
+        self._loader().clear(user_id)
         return True
     
     
@@ -96,6 +141,24 @@ class UserRepository:
         return result.scalars().all()    
     
     
+    async def list_rows(
+        self,
+        columns:Sequence,
+        skip:int = 0,
+        limit:int = 100
+    ) -> Sequence[Row]:
+        """List active users as plain column rows (no ORM objects)."""
+        stmt = (
+            select(*columns)
+            .where(User.is_active == True)
+            .order_by(User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+    
+    
     async def count_all(self) -> int:
         """Count total active users."""
         stmt = select(func.count(User.id)).where(User.is_active == True)
@@ -1,7 +1,19 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, Any, Generic, TypeVar
 from datetime import datetime
-from app.core.constants import RoleEnum, TaskStatusEnum, TaskPriorityEnum, ProjectStatusEnum
+from app.core.constants import RoleEnum, TaskStatusEnum, TaskPriorityEnum, ProjectStatusEnum, JobStatusEnum
+
+
+ItemT = TypeVar("ItemT")
+
+
+# ========== Pagination ==========
+class Page(BaseModel, Generic[ItemT]):
+    total:int
+    skip:int
+    limit:int
+    items:list[ItemT]
+
 
 
 # ========== Auth Schemas ==========
@@ -44,6 +56,23 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+UserPage = Page[UserResponse]
+
+
+class UserSummary(BaseModel):
+    id:int
+    username:str
+    full_name:Optional[str]
+    
+    
+    class Config:
+        from_attributes = True
+
+# Fields selectable with ?fields= (sparse fieldsets), in response order
+USER_FIELDS = tuple(UserResponse.model_fields)
+USER_SUMMARY_FIELDS = tuple(UserSummary.model_fields)
+
+
 class UserUpdate(BaseModel):
     full_name:Optional[str] = None
         
@@ -59,6 +88,8 @@ class ProjectUpdate(BaseModel):
     name:Optional[str] = None
     description:Optional[str] = None
     status: Optional[ProjectStatusEnum] = None
+    # Apply only if the project is still at this version (or send If-Match)
+    version: Optional[int] = None
     
 
 class ProjectResponse(BaseModel):
@@ -67,11 +98,32 @@ class ProjectResponse(BaseModel):
     description:Optional[str]
     status:ProjectStatusEnum
     owner_id:int
+    version:int
     created_at:datetime
     updated_at:datetime
     
     class Config:
         from_attributes = True
+
+
+ProjectPage = Page[ProjectResponse]
+
+# Fields selectable with ?fields= (sparse fieldsets), in response order
+PROJECT_FIELDS = tuple(ProjectResponse.model_fields)
+
+
+class AssigneeLoad(BaseModel):
+    assignee_id:Optional[int]
+    open_tasks:int
+
+
+class ProjectStatsResponse(BaseModel):
+    project_id:int
+    total:int
+    overdue:int
+    by_status:dict[TaskStatusEnum, int]
+    by_priority:dict[TaskPriorityEnum, int]
+    assignee_load:list[AssigneeLoad]
         
         
     
@@ -91,6 +143,8 @@ class TaskUpdate(BaseModel):
     priority:Optional[TaskPriorityEnum] = None
     due_date: Optional[datetime] = None
     assignee_id:Optional[int] = None
+    # Apply only if the task is still at this version (or send If-Match)
+    version:Optional[int] = None
     
     
 class TaskResponse(BaseModel):
@@ -102,15 +156,142 @@ class TaskResponse(BaseModel):
     project_id:int
     assignee_id:Optional[int]
     due_date:Optional[datetime]
+    version:int
     created_at: datetime
     updated_at: datetime
     
     
     class Config:
         from_attributes = True
+
+
+TaskPage = Page[TaskResponse]
+
+# Fields selectable with ?fields= (sparse fieldsets), in response order
+TASK_FIELDS = tuple(TaskResponse.model_fields)
+
+
+class TaskBulkStatusUpdate(BaseModel):
+    from_status:TaskStatusEnum
+    to_status:TaskStatusEnum
+
+
+class TaskFilter(BaseModel):
+    """Task list filters; compiled to index-backed SQL by the task repository."""
+    status:Optional[TaskStatusEnum] = None
+    priority:Optional[TaskPriorityEnum] = None
+    assignee_id:Optional[int] = None
+    overdue:bool = False
+    due_after:Optional[datetime] = None
+    due_before:Optional[datetime] = None
+    created_after:Optional[datetime] = None
+    created_before:Optional[datetime] = None
+    updated_after:Optional[datetime] = None
+    updated_before:Optional[datetime] = None
+    sort:Optional[str] = None
         
         
 
+# ========== Portfolio Schemas ==========
+class TaskBreakdown(BaseModel):
+    total:int
+    by_status:dict[TaskStatusEnum, int]
+    by_priority:dict[TaskPriorityEnum, int]
+
+
+class ProjectBreakdown(TaskBreakdown):
+    project_id:int
+
+
+class OwnerPortfolioResponse(TaskBreakdown):
+    owner_id:int
+    projects:list[ProjectBreakdown] = []
+
+
+
+# ========== Job Schemas ==========
+class JobAcceptedResponse(BaseModel):
+    job_id:int
+    status:JobStatusEnum
+
+
+class JobResponse(BaseModel):
+    id:int
+    kind:str
+    status:JobStatusEnum
+    attempts:int
+    max_attempts:int
+    progress:Optional[dict[str, Any]]
+    result:Optional[dict[str, Any]]
+    error:Optional[str]
+    run_after:datetime
+    created_at:datetime
+    updated_at:datetime
+    
+    
+    class Config:
+        from_attributes = True
+
+
+
+# ========== Profile Schemas ==========
+class ProfileResponse(BaseModel):
+    profile_id:str
+    method:str
+    route:str
+    duration_ms:int
+    size_bytes:int
+    
+    
+    class Config:
+        from_attributes = True
+
+
+
+# ========== Health Schemas ==========
+class LivenessResponse(BaseModel):
+    status:str = "alive"
+
+
+class ReadinessResponse(BaseModel):
+    status:str
+    ready:bool
+    checked_at:datetime
+    database_ok:bool
+    database_latency_ms:Optional[float]
+    database_error:Optional[str]
+    pool_checked_out:Optional[int]
+    pool_capacity:Optional[int]
+    pool_saturation:Optional[float]
+    event_loop_lag_ms:float
+    draining:bool = False
+
+
+
+# ========== Batch Schemas ==========
+class BatchSubRequest(BaseModel):
+    method:str = Field(..., pattern="^(GET|POST|PUT|PATCH|DELETE)$")
+    path:str = Field(..., description="An /api/v1 path, query string included")
+    body:Optional[Any] = None
+    # Per sub-request headers, e.g. Idempotency-Key; Authorization is always the batch's own
+    headers:dict[str, str] = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    requests:list[BatchSubRequest] = Field(..., min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    status:int
+    headers:dict[str, str]
+    body:Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses:list[BatchSubResponse]
+
+
+
 # ========== ProjectMember Schemas ==========
 class ProjectMemberCreate(BaseModel):
     user_id:int
@@ -127,6 +308,24 @@ class ProjectMemberResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+PROJECT_MEMBER_FIELDS = tuple(ProjectMemberResponse.model_fields)
+
+
+
+# ========== Compound Documents (?include=) ==========
+class ProjectDetailResponse(ProjectResponse):
+    # Present only when included; members and tasks are capped per project
+    owner:Optional[UserSummary] = None
+    members:Optional[list[ProjectMemberResponse]] = None
+    tasks:Optional[list[TaskResponse]] = None
+
+
+ProjectDetailPage = Page[ProjectDetailResponse]
+
+# Related resources selectable with ?include=, in response order
+PROJECT_INCLUDES = ("owner", "members", "tasks")
         
         
 
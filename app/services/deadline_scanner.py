@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import Settings, get_settings
+from app.core.timing_wheel import HierarchicalTimingWheel
+from app.repository.deadline_scan_repository import DeadlineScanRepository
+from app.repository.task_repository import TaskRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DeadlineEvent:
+    """A task that just became due soon or overdue."""
+    kind: str  # "due_soon" or "overdue"
+    task_id: int
+    project_id: int
+    assignee_id: int | None
+    title: str
+    due_date: datetime
+
+
+DeadlineNotifier = Callable[[list[DeadlineEvent]], Awaitable[None]]
+
+
+async def log_deadline_events(events: list[DeadlineEvent]) -> None:
+    """Default notifier: log each batch."""
+    for event in events:
+        logger.info("Task %s is %s (due %s)", event.task_id, event.kind.replace("_", " "), event.due_date)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _event(kind: str, row) -> DeadlineEvent:
+    return DeadlineEvent(
+        kind=kind,
+        task_id=row.id,
+        project_id=row.project_id,
+        assignee_id=row.assignee_id,
+        title=row.title,
+        due_date=row.due_date
+    )
+
+
+class DeadlineScanner:
+    """Background scanner announcing tasks that become due soon or overdue.
+
+    Only the worker holding the database lease scans. Each pass walks
+    ``ix_task_due_date`` over (previous pass, now + due soon window], emits
+    "due_soon" for tasks not announced yet and parks them in a timing wheel
+    that emits "overdue" when their deadline passes. Rescanning the whole
+    window catches tasks created or rescheduled into it since the last
+    pass; tasks found already past due are announced as overdue right away.
+    A worker that takes over the lease reloads the wheel from the
+    watermarks.
+
+    The wheel stops emitting as soon as the lease this worker last renewed
+    has expired locally, so a stalled leader cannot emit next to its
+    successor.
+
+    Known gap: a task created, or rescheduled, between passes with a due
+    date already behind the previous pass is never announced. It is
+    outside every window still to be scanned. Finding such tasks would
+    mean scanning by ``updated_at`` across all projects, and no index
+    supports that.
+    """
+
+    LEASE_NAME = "deadlines"
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        notifier: DeadlineNotifier = log_deadline_events,
+        settings: Settings | None = None
+    ):
+        self.session_factory = session_factory
+        self.notifier = notifier
+        self.settings = settings or get_settings()
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.wheel = HierarchicalTimingWheel(
+            tick_seconds=self.settings.deadline_wheel_tick_seconds,
+            start=time.time()
+        )
+        self.is_leader = False
+        self._lease_expires_at: datetime | None = None
+        self._fired_until: datetime | None = None
+        # Due date each task was announced with as due soon, for tasks still ahead of the scan
+        self._announced: dict[int, datetime] = {}
+        self._tasks: list[asyncio.Task] = []
+
+
+    async def start(self) -> None:
+        """Start the scan and wheel loops."""
+        self._tasks = [
+            asyncio.create_task(self._scan_loop()),
+            asyncio.create_task(self._wheel_loop()),
+        ]
+
+
+    async def stop(self) -> None:
+        """Stop the loops and hand the lease back."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.is_leader:
+            async with self.session_factory() as session:
+                await DeadlineScanRepository(session).release_lease(self.LEASE_NAME, self.holder)
+            self._step_down()
+
+
+    async def _scan_loop(self) -> None:
+        while True:
+            try:
+                await self.scan_once()
+            except Exception:
+                logger.exception("Deadline scan failed")
+            await asyncio.sleep(self.settings.deadline_scan_interval_seconds)
+
+
+    async def _wheel_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.deadline_wheel_tick_seconds)
+            if not self.is_leader:
+                continue
+            try:
+                await self.fire_due()
+            except Exception:
+                logger.exception("Emitting overdue tasks failed")
+
+
+    def _step_down(self) -> None:
+        self.is_leader = False
+        self.wheel.clear()
+        self._announced.clear()
+        self._lease_expires_at = None
+        self._fired_until = None
+
+
+    async def _emit(self, events: Sequence[DeadlineEvent]) -> None:
+        batch_size = self.settings.deadline_scan_batch_size
+        for start in range(0, len(events), batch_size):
+            await self.notifier(list(events[start:start + batch_size]))
+
+
+    async def scan_once(self, now: datetime | None = None) -> int:
+        """Run one scan pass if this worker holds the lease.
+
+        Returns the number of tasks announced.
+        """
+        now = now or _utcnow()
+        ttl = timedelta(seconds=self.settings.deadline_lease_seconds)
+        async with self.session_factory() as session:
+            scan_repo = DeadlineScanRepository(session)
+            task_repo = TaskRepository(session)
+
+            acquired = await scan_repo.try_acquire_lease(self.LEASE_NAME, self.holder, now=now, ttl=ttl)
+            if not acquired:
+                if self.is_leader:
+                    self._step_down()
+                return 0
+            self._lease_expires_at = now + ttl
+
+            state = await scan_repo.get_state(self.LEASE_NAME)
+            if state is None:
+                # try_acquire_lease just updated or created it
+                raise RuntimeError(f"Scanner state {self.LEASE_NAME!r} vanished after taking its lease")
+            announced = 0
+            if not self.is_leader:
+                self.is_leader = True
+                if state.due_soon_watermark is None:
+                    # First scan ever: nothing was announced yet
+                    self._fired_until = now
+                else:
+                    announced += await self._reload_wheel(
+                        task_repo, state.overdue_watermark, state.due_soon_watermark, now
+                    )
+
+            horizon = now + timedelta(minutes=self.settings.deadline_due_soon_minutes)
+            after, after_id = min(state.due_soon_watermark or now, now), 0
+            batch_size = self.settings.deadline_scan_batch_size
+            while True:
+                rows = await task_repo.get_open_tasks_due(after, horizon, after_id=after_id, limit=batch_size)
+                if not rows:
+                    break
+
+                events = []
+                for row in rows:
+                    if self._announced.get(row.id) == row.due_date:
+                        continue
+                    if row.due_date > now and self.wheel.schedule(_epoch(row.due_date), key=row.id, item=row.id):
+                        self._announced[row.id] = row.due_date
+                        events.append(_event("due_soon", row))
+                    else:
+                        # Created or rescheduled into the past since the last pass
+                        self.wheel.cancel(row.id)
+                        self._announced.pop(row.id, None)
+                        events.append(_event("overdue", row))
+                await self._emit(events)
+                announced += len(events)
+
+                after, after_id = rows[-1].due_date, rows[-1].id
+                if len(rows) < batch_size:
+                    break
+
+            # The next pass starts at now; tasks due before it are the wheel's business
+            self._announced = {task_id: due for task_id, due in self._announced.items() if due > now}
+            still_leader = await scan_repo.save_watermarks(
+                self.LEASE_NAME,
+                self.holder,
+                due_soon_watermark=now,
+                overdue_watermark=self._fired_until
+            )
+            if not still_leader:
+                self._step_down()
+            return announced
+
+
+    async def _reload_wheel(
+        self,
+        task_repo: TaskRepository,
+        overdue_watermark: datetime,
+        due_soon_watermark: datetime,
+        now: datetime
+    ) -> int:
+        """Rebuild the wheel after taking the lease.
+
+        Reloads the tasks the previous leader announced as due soon but not
+        yet as overdue. Tasks changed after its last pass and due after it
+        are left to the regular scan.
+        """
+        self.wheel.clear()
+        self._announced.clear()
+        self._fired_until = overdue_watermark
+        announced_until = due_soon_watermark + timedelta(minutes=self.settings.deadline_due_soon_minutes)
+        overdue = []
+        after, after_id = overdue_watermark, 0
+        while True:
+            rows = await task_repo.get_open_tasks_due(
+                after, announced_until, after_id=after_id, limit=self.settings.deadline_scan_batch_size
+            )
+            if not rows:
+                break
+            for row in rows:
+                if row.updated_at > due_soon_watermark and row.due_date > due_soon_watermark:
+                    continue
+                if row.due_date <= now or not self.wheel.schedule(_epoch(row.due_date), key=row.id, item=row.id):
+                    overdue.append(_event("overdue", row))
+                self._announced[row.id] = row.due_date
+            after, after_id = rows[-1].due_date, rows[-1].id
+        await self._emit(overdue)
+        self._fired_until = now
+        return len(overdue)
+
+
+    async def fire_due(self, now: datetime | None = None) -> int:
+        """Emit overdue events for wheel entries whose deadline passed.
+
+        Steps down instead when the lease has expired since it was last renewed.
+        """
+        now = now or _utcnow()
+        if self._lease_expires_at is None or now >= self._lease_expires_at:
+            logger.warning("Deadline lease expired before renewal, stepping down")
+            self._step_down()
+            return 0
+        expired = self.wheel.advance(_epoch(now))
+        if expired:
+            async with self.session_factory() as session:
+                # Skip tasks completed or rescheduled since they were announced as due soon
+                rows = await TaskRepository(session).get_overdue_among(expired, now)
+            await self._emit([_event("overdue", row) for row in rows])
+        self._fired_until = now
+        return len(expired)
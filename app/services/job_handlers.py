@@ -0,0 +1,97 @@
+"""Handlers of the background job kinds, registered with the worker pool."""
+import asyncio
+
+from app.core.config import get_settings
+from app.core.constants import TaskStatusEnum
+from app.repository.project_repository import ProjectRepository
+from app.repository.task_repository import TaskRepository
+from app.repository.user_repository import UserRepository
+from app.services.job_worker import JobContext, job_handler
+
+DELETE_PROJECT = "project.delete"
+BULK_UPDATE_TASK_STATUS = "tasks.bulk_status"
+DEACTIVATE_USER = "user.deactivate"
+
+
+@job_handler(DELETE_PROJECT)
+async def delete_project(job: JobContext) -> dict:
+    """Purge a project: tasks in batches, each in its own short transaction, then the rest.
+
+    Never loads the rows it deletes, so memory stays flat however large the
+    project is. Reruns pick up where an interrupted attempt stopped.
+    """
+    project_id = job.payload["project_id"]
+    batch_size = get_settings().project_delete_batch_size
+    async with job.session_factory() as session:
+        repo = ProjectRepository(session)
+        await repo.mark_deleted(project_id)
+        total = await repo.count_tasks(project_id)
+        deleted_tasks = 0
+        while True:
+            deleted = await repo.delete_tasks_batch(project_id, batch_size=batch_size)
+            if not deleted:
+                break
+            deleted_tasks += deleted
+            await job.report_progress({"deleted_tasks": deleted_tasks, "total_tasks": total})
+            # Let request handlers run between batches
+            await asyncio.sleep(0)
+        purged = await repo.purge(project_id)
+    return {"deleted": purged, "deleted_tasks": deleted_tasks}
+
+
+@job_handler(BULK_UPDATE_TASK_STATUS)
+async def bulk_update_task_status(job: JobContext) -> dict:
+    """Move every task of a project from one status to another."""
+    async with job.session_factory() as session:
+        if not await ProjectRepository(session).get_by_id(job.payload["project_id"]):
+            # Deleted since the job was queued
+            return {"updated": 0}
+        updated = await TaskRepository(session).bulk_update_status(
+            project_id=job.payload["project_id"],
+            from_status=TaskStatusEnum(job.payload["from_status"]),
+            to_status=TaskStatusEnum(job.payload["to_status"])
+        )
+    return {"updated": updated}
+
+
+@job_handler(DEACTIVATE_USER)
+async def deactivate_user(job: JobContext) -> dict:
+    """Hand off a departing user's work: memberships, owned projects, then open tasks.
+
+    Projects go first so that tasks of transferred projects can go to their
+    new owner; open tasks of projects the new assignee cannot see are
+    unassigned.
+
+    Every step is a series of set-based statements over at most a batch of
+    rows, each committed on its own, so users with any number of tasks are
+    handled in short transactions. Reruns resume where they stopped.
+    """
+    user_id = job.payload["user_id"]
+    reassign_to = job.payload.get("reassign_to")
+    transfer_projects_to = job.payload.get("transfer_projects_to")
+    batch_size = get_settings().user_deactivation_batch_size
+    done = {"memberships": 0, "tasks": 0, "projects": 0}
+
+    async with job.session_factory() as session:
+        await UserRepository(session).delete(user_id)
+        project_repo = ProjectRepository(session)
+        task_repo = TaskRepository(session)
+        steps = (
+            ("memberships", lambda: project_repo.delete_memberships_batch(user_id, batch_size)),
+            ("projects", lambda: (
+                project_repo.transfer_owned_batch(user_id, transfer_projects_to, batch_size)
+                if transfer_projects_to is not None
+                else project_repo.archive_owned_batch(user_id, batch_size)
+            )),
+            ("tasks", lambda: task_repo.reassign_open_tasks_batch(user_id, reassign_to, batch_size)),
+        )
+        for name, run_batch in steps:
+            while True:
+                changed = await run_batch()
+                if not changed:
+                    break
+                done[name] += changed
+                await job.report_progress(dict(done))
+                # Let request handlers run between batches
+                await asyncio.sleep(0)
+    return done
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.core.constants import RoleEnum
+from app.models.job import Job
+from app.repository.job_repository import JobRepository
+from app.services.job_worker import JOB_HANDLERS
+from app.services import job_handlers  # noqa: F401 (register handlers)
+
+
+class JobService:
+    """Background job business logic layer"""
+
+    def __init__(self, session: AsyncSession):
+        self.repo = JobRepository(session=session)
+
+
+    async def enqueue(
+        self,
+        kind:str,
+        payload:dict[str, Any],
+        created_by:int | None = None
+    ) -> Job:
+        """Queue a job for the worker pool."""
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        return await self.repo.enqueue(
+            kind=kind,
+            payload=payload,
+            max_attempts=get_settings().job_max_attempts,
+            run_after=datetime.now(timezone.utc).replace(tzinfo=None),
+            created_by=created_by
+        )
+
+
+    async def get_job(
+        self,
+        job_id:int,
+        user_id:int,
+        user_role:RoleEnum
+    ) -> Job | None:
+        """Get a job (creator or admin only)."""
+        job = await self.repo.get_by_id(job_id)
+        if not job:
+            return None
+        if job.created_by != user_id and user_role != RoleEnum.ADMIN:
+            raise PermissionError("Not authorized to view this job")
+        return job
@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import logging
+import os
+import random
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.config import Settings, get_settings
+from app.core.constants import JobStatusEnum
+from app.models.job import Job
+from app.repository.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class JobContext:
+    """What a job handler gets to run one attempt of a job."""
+    job_id: int
+    kind: str
+    payload: dict[str, Any]
+    attempt: int
+    session_factory: async_sessionmaker[AsyncSession]
+    # Store progress visible on the job (e.g. {"done": 10, "total": 100})
+    report_progress: Callable[[dict[str, Any]], Awaitable[None]]
+
+
+JobHandler = Callable[[JobContext], Awaitable[dict[str, Any] | None]]
+
+# Handlers by job kind, filled by the ``job_handler`` decorator
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register a coroutine as the handler of a job kind.
+
+    Handlers may run more than once for the same job (retries, or a worker
+    dying mid-job), so they must be idempotent. The returned dict is stored
+    as the job result.
+    """
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class JobWorkerPool:
+    """Asyncio workers running queued jobs from the jobs table.
+
+    Every worker claims one job at a time and keeps its lock alive while the
+    handler runs. Failed attempts are retried with exponential backoff until
+    ``max_attempts``; jobs whose worker died are claimed again once their
+    lock lapses. On shutdown, running jobs are handed back to the queue.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        settings: Settings | None = None,
+        handlers: dict[str, JobHandler] | None = None
+    ):
+        self.session_factory = session_factory
+        self.settings = settings or get_settings()
+        self.handlers = JOB_HANDLERS if handlers is None else handlers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: list[asyncio.Task] = []
+
+
+    async def start(self) -> None:
+        """Start the workers."""
+        self._tasks = [
+            asyncio.create_task(self._worker_loop())
+            for _ in range(self.settings.job_workers)
+        ]
+
+
+    async def stop(self) -> None:
+        """Stop the workers, requeueing the jobs they were running."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+    async def _worker_loop(self) -> None:
+        while True:
+            try:
+                ran = await self.run_once()
+            except Exception:
+                logger.exception("Running a job failed")
+                ran = False
+            if not ran:
+                await asyncio.sleep(self.settings.job_poll_interval_seconds)
+
+
+    async def run_once(self) -> bool:
+        """Claim and run one job; False when none is due."""
+        lease = timedelta(seconds=self.settings.job_lease_seconds)
+        async with self.session_factory() as session:
+            job = await JobRepository(session).claim(self.worker_id, now=_utcnow(), lease=lease)
+        if job is None:
+            return False
+        await self._run(job)
+        return True
+
+
+    def retry_delay(self, attempt: int) -> float:
+        """Seconds to wait before retrying after the given failed attempt."""
+        delay = min(
+            self.settings.job_retry_base_seconds * 2 ** (attempt - 1),
+            self.settings.job_retry_max_seconds
+        )
+        # Jitter spreads retries of jobs that failed together
+        return random.uniform(delay / 2, delay)
+
+
+    async def _finish(self, job_id: int, **values) -> None:
+        async with self.session_factory() as session:
+            if not await JobRepository(session).finish(job_id, self.worker_id, **values):
+                logger.warning("Job %s was taken over by another worker", job_id)
+
+
+    async def _report_progress(self, job_id: int, progress: dict[str, Any]) -> None:
+        lease = timedelta(seconds=self.settings.job_lease_seconds)
+        async with self.session_factory() as session:
+            await JobRepository(session).set_progress(
+                job_id, self.worker_id, progress, locked_until=_utcnow() + lease
+            )
+
+
+    async def _heartbeat(self, job_id: int, handler: asyncio.Task) -> None:
+        lease = self.settings.job_lease_seconds
+        while True:
+            await asyncio.sleep(lease / 3)
+            async with self.session_factory() as session:
+                extended = await JobRepository(session).extend_lock(
+                    job_id, self.worker_id, locked_until=_utcnow() + timedelta(seconds=lease)
+                )
+            if not extended:
+                # Another worker owns the job now, or it was failed: stop working on it
+                logger.warning("Lost the lock on job %s, cancelling its handler", job_id)
+                handler.cancel()
+                return
+
+
+    async def _run(self, job: Job) -> None:
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            await self._finish(job.id, status=JobStatusEnum.FAILED, error=f"No handler for job kind '{job.kind}'")
+            return
+
+        context = JobContext(
+            job_id=job.id,
+            kind=job.kind,
+            payload=job.payload,
+            attempt=job.attempts,
+            session_factory=self.session_factory,
+            report_progress=functools.partial(self._report_progress, job.id)
+        )
+        handler_task = asyncio.create_task(handler(context))
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, handler_task))
+        try:
+            result = await handler_task
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if current is not None and not current.cancelling():
+                # Only the handler was cancelled, by the heartbeat: the job is no longer ours
+                return
+            # Shutting down: hand the job back without counting the attempt
+            await self._finish(job.id, status=JobStatusEnum.QUEUED, attempts=job.attempts - 1, run_after=_utcnow())
+            raise
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                retry_at = _utcnow() + timedelta(seconds=self.retry_delay(job.attempts))
+                await self._finish(job.id, status=JobStatusEnum.QUEUED, error=error, run_after=retry_at)
+            else:
+                await self._finish(job.id, status=JobStatusEnum.FAILED, error=error)
+        else:
+            await self._finish(job.id, status=JobStatusEnum.SUCCEEDED, result=result, error=None)
+        finally:
+            heartbeat.cancel()
@@ -0,0 +1,72 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repository.task_rollup_repository import TaskRollupRepository
+from app.core.constants import TaskStatusEnum, TaskPriorityEnum
+from app.schemas import OwnerPortfolioResponse, ProjectBreakdown
+
+
+def _empty_breakdown() -> dict:
+    return {
+        "total":0,
+        "by_status":{s:0 for s in TaskStatusEnum},
+        "by_priority":{p:0 for p in TaskPriorityEnum}
+    }
+
+
+def _add(breakdown:dict, status:TaskStatusEnum, priority:TaskPriorityEnum, count:int) -> None:
+    breakdown["total"] += count
+    breakdown["by_status"][status] += count
+    breakdown["by_priority"][priority] += count
+
+
+class PortfolioService:
+    """Portfolio reporting, served only from the task rollups."""
+    
+    def __init__(self, session: AsyncSession):
+        self.repo = TaskRollupRepository(session=session)
+        
+        
+    async def get_owner_portfolio(
+        self,
+        owner_id:int
+    ) -> OwnerPortfolioResponse:
+        """Status and priority breakdown across an owner's projects."""
+        rows = await self.repo.get_owner_breakdown(owner_id=owner_id)
+        
+        overall = _empty_breakdown()
+        projects:dict[int, dict] = {}
+        for row in rows:
+            _add(overall, row.status, row.priority, row.task_count)
+            _add(projects.setdefault(row.project_id, _empty_breakdown()), row.status, row.priority, row.task_count)
+        
+        return OwnerPortfolioResponse(
+            owner_id=owner_id,
+            projects=[
+                ProjectBreakdown(project_id=project_id, **breakdown)
+                for project_id, breakdown in sorted(projects.items())
+            ],
+            **overall
+        )
+    
+    
+    async def list_owner_portfolios(
+        self,
+        skip:int = 0,
+        limit:int = 100
+    ):
+        """Breakdown per owner, paginated by owner."""
+        rows = await self.repo.get_owners_breakdown(skip=skip, limit=limit)
+        total = await self.repo.count_owners()
+        
+        owners:dict[int, dict] = {}
+        for row in rows:
+            _add(owners.setdefault(row.owner_id, _empty_breakdown()), row.status, row.priority, row.task_count)
+        
+        return {
+            "total":total,
+            "skip":skip,
+            "limit":limit,
+            "items":[
+                OwnerPortfolioResponse(owner_id=owner_id, **breakdown)
+                for owner_id, breakdown in owners.items()
+            ]
+        }
@@ -1,7 +1,22 @@
+from datetime import datetime, timezone
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repository.project_repository import ProjectRepository
-from app.core.constants import ProjectStatusEnum, RoleEnum
-from app.schemas import ProjectResponse
+from app.repository.task_repository import TaskRepository
+from app.core.cache import project_stats_cache
+from app.core.serialization import response_columns, page_content
+from app.core.versioning import VersionConflictError
+from app.models.project import Project
+from app.models.project_member import ProjectMember
+from app.models.task import Task
+from app.core.config import get_settings
+from app.services.job_service import JobService
+from app.services.job_handlers import DELETE_PROJECT
+from app.core.constants import ProjectStatusEnum, RoleEnum, TaskStatusEnum, TaskPriorityEnum, OPEN_TASK_STATUSES
+from app.schemas import (
+    ProjectStatsResponse, AssigneeLoad,
+    PROJECT_FIELDS, PROJECT_MEMBER_FIELDS, TASK_FIELDS, USER_SUMMARY_FIELDS
+)
 
 
 class ProjectService:
@@ -9,6 +24,8 @@ class ProjectService:
     
     def __init__(self, session: AsyncSession):
         self.repo = ProjectRepository(session=session)
+        self.task_repo = TaskRepository(session=session)
+        self.jobs = JobService(session=session)
         
         
     async def create_project(
@@ -34,48 +51,168 @@ class ProjectService:
         return await self.repo.get_by_id(project_id=project_id)
     
     
+    async def get_project_fields(
+        self,
+        project_id: int,
+        fields: list[str]
+    ) -> dict | None:
+        """Get only the given fields of a project."""
+        row = await self.repo.get_row(project_id, columns=response_columns(Project, fields))
+        return row._asdict() if row else None
+    
+    
+    async def get_project_document(
+        self,
+        project_id: int,
+        fields: list[str],
+        includes: list[str]
+    ) -> dict | None:
+        """Get the given fields of a project with the included related resources.
+        
+        Costs one query, plus one per included collection (the owner is joined).
+        """
+        if not includes:
+            return await self.get_project_fields(project_id, fields)
+        if "owner" in includes:
+            project = await self.repo.get_with_owner(project_id=project_id)
+        else:
+            project = await self.repo.get_by_id(project_id=project_id)
+        if not project:
+            return None
+        [document] = await self._documents([project], fields, includes)
+        return document
+    
+    
+    async def _documents(
+        self,
+        projects: list[Project],
+        fields: list[str],
+        includes: list[str]
+    ) -> list[dict]:
+        """Wire-ready project documents: the given fields plus one query per included collection."""
+        settings = get_settings()
+        documents = [{name: getattr(project, name) for name in fields} for project in projects]
+        by_id = {project.id: document for project, document in zip(projects, documents)}
+        
+        if "owner" in includes:
+            for project, document in zip(projects, documents):
+                document["owner"] = {name: getattr(project.owner, name) for name in USER_SUMMARY_FIELDS}
+        if "members" in includes:
+            for document in documents:
+                document["members"] = []
+            rows = await self.repo.get_member_rows_by_project(
+                list(by_id), response_columns(ProjectMember, PROJECT_MEMBER_FIELDS), settings.include_members_limit
+            )
+            for row in rows:
+                by_id[row.project_id]["members"].append(row._asdict())
+        if "tasks" in includes:
+            for document in documents:
+                document["tasks"] = []
+            rows = await self.task_repo.get_latest_rows_by_project(
+                list(by_id), response_columns(Task, TASK_FIELDS), settings.include_tasks_limit
+            )
+            for row in rows:
+                by_id[row.project_id]["tasks"].append(row._asdict())
+        return documents
+    
+    
     async def list_user_projects(
         self,
         user_id:int,
         skip:int = 0,
-        limit:int = 100
+        limit:int = 100,
+        fields:list[str] | None = None,
+        includes:list[str] | None = None
     ):
-        """List projects owned by user."""
-        projects = await self.repo.get_user_projects(user_id=user_id, skip=skip,limit=limit)
+        """List projects owned by user, with only the given fields and the included related resources."""
+        if includes:
+            projects = await self.repo.get_user_projects(
+                user_id=user_id, skip=skip, limit=limit, with_owner="owner" in includes
+            )
+            total = await self.repo.get_user_projects_count(user_id=user_id)
+            return {
+                "total": total,
+                "skip": skip,
+                "limit": limit,
+                "items": await self._documents(list(projects), fields or list(PROJECT_FIELDS), includes)
+            }
+        
+        rows = await self.repo.get_user_project_rows(
+            user_id=user_id,
+            columns=response_columns(Project, fields or PROJECT_FIELDS),
+            skip=skip,
+            limit=limit
+        )
         total = await self.repo.get_user_projects_count(user_id=user_id)
-
-        project_items = [ProjectResponse.model_validate(p) for p in projects]
-        return {
-            "total":total,
-            "skip":skip,
-            "limit":limit,
-            "items":project_items
-        }
+        return page_content(total, skip, limit, rows)
         
         
         
+    async def get_projects_by_ids(
+        self,
+        project_ids:list[int],
+        user_id:int,
+        user_role:RoleEnum,
+        fields:list[str],
+        includes:list[str]
+    ) -> dict:
+        """Page of the given projects the user may see, in request order; others are left out."""
+        projects = await self.repo.get_many(project_ids, with_owner="owner" in includes)
+        projects = await self.accessible_projects(projects, user_id, user_role)
+        if includes:
+            items = await self._documents(projects, fields, includes)
+        else:
+            items = [{name: getattr(project, name) for name in fields} for project in projects]
+        return {"total": len(items), "skip": 0, "limit": len(project_ids), "items": items}
+    
+    
+    async def accessible_projects(
+        self,
+        projects:list[Project],
+        user_id:int,
+        user_role:RoleEnum
+    ) -> list[Project]:
+        """The projects the user may see (see ``verify_project_access``), checked together."""
+        if user_role == RoleEnum.ADMIN:
+            return projects
+        others = [project.id for project in projects if project.owner_id != user_id]
+        member_of = await self.repo.get_member_project_ids(user_id, others)
+        return [project for project in projects if project.owner_id == user_id or project.id in member_of]
+    
+    
     async def update_project(
         self,
         project_id:int,
         owner_id:int,
         user_role:RoleEnum,
+        version:int | None = None,
         **kwargs
     ):
-        """Update project (authorization check)."""
-        project = await self.repo.get_by_id(project_id=project_id)
-        if not project:
-            return None
-        
-        # Only owner or admin can update
-        if project.owner_id != owner_id and user_role != RoleEnum.ADMIN:
-            raise PermissionError("Not authorized to update this project")
-        
+        """Update project (authorization check), optionally only if still at ``version``.
         
+        Only owner or admin can update. The checks are part of the UPDATE; the
+        project is read only to explain a failure. Raises VersionConflictError
+        on a version mismatch.
+        """
         filtered_kwargs = {
             k:v for k, v in kwargs.items()
             if k in ["name", "description","status"] and v is not None
         }
-        return await self.repo.update(project_id=project_id, **filtered_kwargs)
+        project = await self.repo.update(
+            project_id=project_id,
+            expected_version=version,
+            owner_id=None if user_role == RoleEnum.ADMIN else owner_id,
+            **filtered_kwargs
+        )
+        if project:
+            return project
+        
+        state = await self.repo.get_write_state(project_id)
+        if not state:
+            return None
+        if state.owner_id != owner_id and user_role != RoleEnum.ADMIN:
+            raise PermissionError("Not authorized to update this project")
+        raise VersionConflictError(state.version)
     
     
     
@@ -86,16 +223,19 @@ class ProjectService:
         owner_id: int,
         user_role:RoleEnum
     ):
-        """Delete project (authorization check)."""
+        """Queue project deletion (authorization check); returns the job."""
         project = await self.repo.get_by_id(project_id=project_id)
         if not project:
-            return False
+            return None
         
         # Only owner or admin can delete
         if project.owner_id != owner_id and user_role != RoleEnum.ADMIN:
             raise PermissionError("Not authorized to delete this project")
         
-        return await self.repo.delete(project_id=project_id)
+        job = await self.jobs.enqueue(DELETE_PROJECT, {"project_id": project_id}, created_by=owner_id)
+        # Hidden right away; the job marks it too in case this never runs
+        await self.repo.mark_deleted(project_id)
+        return job
     
     
     
@@ -115,5 +255,50 @@ class ProjectService:
             return True
         
         # Check if user is project member
-        member_projects = await self.repo.get_projects_by_member(user_id=user_id)
-        return any(p.id == project_id for p in member_projects)
\ No newline at end of file
+        return bool(await self.repo.get_member_project_ids(user_id, [project_id]))
+    
+    
+    
+    async def get_project_stats(
+        self,
+        project_id:int
+    ) -> ProjectStatsResponse:
+        """Get task counts by status/priority, overdue count and assignee load.
+        
+        Served from a per-worker cache that task writes invalidate; a miss
+        costs a single aggregate query.
+        """
+        stats = project_stats_cache.get(project_id)
+        if stats is not None:
+            return stats
+        
+        # Taken before querying so a write committed meanwhile keeps the result out of the cache
+        token = project_stats_cache.token()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows = await self.task_repo.get_project_aggregates(project_id=project_id, now=now)
+        
+        by_status = {s:0 for s in TaskStatusEnum}
+        by_priority = {p:0 for p in TaskPriorityEnum}
+        load:dict[int | None, int] = {}
+        total = overdue = 0
+        for row in rows:
+            total += row.task_count
+            overdue += row.overdue or 0
+            by_status[row.status] += row.task_count
+            by_priority[row.priority] += row.task_count
+            if row.status in OPEN_TASK_STATUSES:
+                load[row.assignee_id] = load.get(row.assignee_id, 0) + row.task_count
+        
+        stats = ProjectStatsResponse(
+            project_id=project_id,
+            total=total,
+            overdue=overdue,
+            by_status=by_status,
+            by_priority=by_priority,
+            assignee_load=[
+                AssigneeLoad(assignee_id=assignee_id, open_tasks=count)
+                for assignee_id, count in sorted(load.items(), key=lambda item: -item[1])
+            ]
+        )
+        project_stats_cache.set(project_id, stats, token=token)
+        return stats
@@ -1,9 +1,20 @@
+from typing import Any, AsyncIterator
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repository.task_repository import TaskRepository
 from app.repository.project_repository import ProjectRepository
+from app.services.job_service import JobService
+from app.services.job_handlers import BULK_UPDATE_TASK_STATUS
+from app.core.config import get_settings
 from app.core.constants import TaskStatusEnum, RoleEnum
-from app.schemas import TaskResponse
+from app.core.serialization import response_columns, page_content
+from app.core.versioning import VersionConflictError
+from app.models.task import Task
+from app.schemas import TaskFilter, TASK_FIELDS
+
+# Tries of an update that keeps losing races to concurrent writes (without a version to conflict on)
+UPDATE_ATTEMPTS = 3
 
 
 class TaskService:
@@ -12,6 +23,7 @@ class TaskService:
     def __init__(self, session: AsyncSession):
         self.task_repo = TaskRepository(session=session)
         self.project_repo = ProjectRepository(session=session)
+        self.jobs = JobService(session=session)
         
         
         
@@ -53,6 +65,42 @@ class TaskService:
         return await self.task_repo.get_by_id(task_id=task_id)
     
     
+    async def get_tasks_by_ids(
+        self,
+        task_ids:list[int],
+        user_id:int,
+        user_role:RoleEnum,
+        fields:list[str]
+    ) -> dict:
+        """Page of the given tasks the user may see, in request order; others are left out.
+        
+        Same rule as the project task routes (project owner or admin), one
+        query for the tasks and one for their projects.
+        """
+        tasks = await self.task_repo.get_many(task_ids)
+        if user_role != RoleEnum.ADMIN:
+            projects = await self.project_repo.get_many(list(dict.fromkeys(task.project_id for task in tasks)))
+            owned = {project.id for project in projects if project.owner_id == user_id}
+            tasks = [task for task in tasks if task.project_id in owned]
+        items = [{name: getattr(task, name) for name in fields} for task in tasks]
+        return {"total": len(items), "skip": 0, "limit": len(task_ids), "items": items}
+    
+    
+    async def get_task_fields(
+        self,
+        project_id:int,
+        task_id:int,
+        fields:list[str]
+    ) -> dict | None:
+        """Get only the given fields of a task in a project."""
+        row = await self.task_repo.get_row(
+            task_id=task_id,
+            columns=response_columns(Task, fields),
+            project_id=project_id
+        )
+        return row._asdict() if row else None
+    
+    
     async def list_project_tasks(
         self,
         project_id:int,
@@ -60,9 +108,11 @@ class TaskService:
         user_role:RoleEnum,
         skip:int = 0,
         limit:int = 100,
-        status:TaskStatusEnum | None = None
+        status:TaskStatusEnum | None = None,
+        filters:TaskFilter | None = None,
+        fields:list[str] | None = None
     ):
-        """List tasks in a project (with access check)."""
+        """List tasks in a project (with access check), with only the given fields."""
         project = await self.project_repo.get_by_id(project_id=project_id)
         if not project:
             raise ValueError("project not found")
@@ -70,16 +120,45 @@ class TaskService:
         if project.owner_id != user_id and user_role != RoleEnum.ADMIN:
             raise PermissionError("Not authorized to view this project")
         
-        tasks = await self.task_repo.get_project_tasks(project_id=project_id,skip=skip,limit=limit,status=status)
-        total = await self.task_repo.get_project_tasks_count(project_id,status)
-
-        task_items = [TaskResponse.model_validate(t) for t in tasks]
-        return {
-            "total":total,
-            "skip":skip,
-            "limit":limit,
-            "items":task_items
-        }
+        filters = filters or TaskFilter(status=status)
+        rows = await self.task_repo.get_project_task_rows(
+            project_id=project_id,
+            filters=filters,
+            columns=response_columns(Task, fields or TASK_FIELDS),
+            skip=skip,
+            limit=limit
+        )
+        total = await self.task_repo.get_project_tasks_count(project_id,filters=filters)
+        return page_content(total, skip, limit, rows)
+        
+        
+        
+    async def export_project_tasks(
+        self,
+        project_id:int,
+        user_id:int,
+        user_role:RoleEnum,
+        fields:list[str] | None = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Check access, then return batches of all tasks in a project, with only the given fields."""
+        project = await self.project_repo.get_by_id(project_id=project_id)
+        if not project:
+            raise ValueError("project not found")
+        
+        if project.owner_id != user_id and user_role != RoleEnum.ADMIN:
+            raise PermissionError("Not authorized to view this project")
+        
+        fields = fields or list(TASK_FIELDS)
+        batches = self.task_repo.iter_project_task_rows(
+            project_id=project_id,
+            columns=response_columns(Task, fields),
+            batch_size=get_settings().export_batch_size
+        )
+        
+        async def export():
+            async for rows in batches:
+                yield [{name: getattr(row, name) for name in fields} for row in rows]
+        return export()
         
         
         
@@ -106,33 +185,42 @@ class TaskService:
         task_id:int,
         user_id:int,
         user_role:RoleEnum,
+        project_id:int | None = None,
+        version:int | None = None,
         **kwargs
     ):
-        """Update task with authorization."""
-        task = await self.task_repo.get_by_id(task_id=task_id)
-        if not task:
-            return None 
-        
-        # Get project to check authorization
-        project = await self.project_repo.get_by_id(task.project_id)
-        if not project:
-            return None
-        
-        # Only project owner, task assignee, or admin can update
-        is_owner = project.owner_id == user_id
-        is_assignee = task.assignee_id == user_id
-        is_admin = user_role == RoleEnum.ADMIN
-        
-        if not (is_owner or is_assignee or is_admin):
-            raise PermissionError("Not authorized to update this task.")
-        
+        """Update task with authorization, optionally only if still at ``version``.
         
+        Only project owner, task assignee, or admin can update. The checks are
+        part of the UPDATE; the task is read only to explain a failure.
+        Raises VersionConflictError on a version mismatch.
+        """
         filtered_kwargs = {
             k:v for k, v in kwargs.items()
             if k in ["title", "description","status","priority","due_date","assignee_id"] and v is not None
         }
+        editor_id = None if user_role == RoleEnum.ADMIN else user_id
         
-        return await self.task_repo.update(task_id=task_id, **filtered_kwargs)
+        for _ in range(UPDATE_ATTEMPTS):
+            task = await self.task_repo.update(
+                task_id,
+                project_id=project_id,
+                expected_version=version,
+                editor_id=editor_id,
+                **filtered_kwargs
+            )
+            if task:
+                return task
+            
+            state = await self.task_repo.get_write_state(task_id)
+            if not state or (project_id is not None and state.project_id != project_id):
+                return None
+            if editor_id is not None and editor_id not in (state.owner_id, state.assignee_id):
+                raise PermissionError("Not authorized to update this task.")
+            if version is not None and state.version != version:
+                raise VersionConflictError(state.version)
+            # Changed between the rollup decrement and the UPDATE: try again
+        raise VersionConflictError(state.version)
 
 
     async def delete_task(
@@ -158,6 +246,26 @@ class TaskService:
 
         return await self.task_repo.delete(task_id)
 
-    
-    
-    
\ No newline at end of file
+
+    async def bulk_update_status(
+            self,
+            project_id:int,
+            from_status:TaskStatusEnum,
+            to_status:TaskStatusEnum,
+            user_id:int,
+            user_role:RoleEnum
+    ):
+        """Queue a status change of all matching tasks (authorization check); returns the job."""
+        project = await self.project_repo.get_by_id(project_id)
+        if not project:
+            raise ValueError("Project not found")
+
+        # Only project owner or admin can change tasks in bulk
+        if project.owner_id != user_id and user_role != RoleEnum.ADMIN:
+            raise PermissionError("Not authorized to update tasks in this project")
+
+        return await self.jobs.enqueue(
+            BULK_UPDATE_TASK_STATUS,
+            {"project_id": project_id, "from_status": from_status.value, "to_status": to_status.value},
+            created_by=user_id
+        )
@@ -1,7 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repository.user_repository import UserRepository
+from app.services.job_service import JobService
+from app.services.job_handlers import DEACTIVATE_USER
 from app.core.constants import RoleEnum
-from app.schemas import UserResponse
+from app.core.serialization import response_columns, page_content
+from app.models.user import User
+from app.schemas import USER_FIELDS
 
 
 class UserService:
@@ -9,6 +13,7 @@ class UserService:
     
     def __init__(self, session: AsyncSession):
         self.repo = UserRepository(session=session)
+        self.jobs = JobService(session=session)
         
         
     async def get_user(
@@ -19,23 +24,41 @@ class UserService:
         return await self.repo.get_by_id(user_id=user_id)
     
     
+    async def get_user_fields(
+        self,
+        user_id: int,
+        fields: list[str]
+    ) -> dict | None:
+        """Get only the given fields of a user."""
+        row = await self.repo.get_row(user_id, columns=response_columns(User, fields))
+        return row._asdict() if row else None
+    
+    
+    async def get_users_by_ids(
+        self,
+        user_ids:list[int],
+        fields:list[str]
+    ) -> dict:
+        """Page of the given active users, in request order; missing ones are left out."""
+        users = await self.repo.get_many(user_ids)
+        items = [{name: getattr(user, name) for name in fields} for user in users]
+        return {"total": len(items), "skip": 0, "limit": len(user_ids), "items": items}
+    
+    
     async def list_users(
         self,
         skip:int = 0,
-        limit:int = 100
+        limit:int = 100,
+        fields:list[str] | None = None
     ):
-        """List all users with pagination."""
-        users = await self.repo.list_all(skip=skip, limit=limit)
+        """List all users with pagination, with only the given fields."""
+        rows = await self.repo.list_rows(
+            columns=response_columns(User, fields or USER_FIELDS),
+            skip=skip,
+            limit=limit
+        )
         total = await self.repo.count_all()
-
-        user_items = [UserResponse.model_validate(u) for u in users]
-        
-        return {
-            "total":total,
-            "skip":skip,
-            "limit":limit,
-            "items":user_items
-        }
+        return page_content(total, skip, limit, rows)
         
         
     
@@ -64,8 +87,33 @@ class UserService:
         return await self.repo.update(user_id=user_id,role=RoleEnum.ADMIN)
     
     
-    async def deactivate_user(self, user_id:int):
-        """Deactivate user account."""
-        return await self.repo.delete(user_id=user_id)
+    async def deactivate_user(
+        self,
+        user_id:int,
+        requested_by:int,
+        reassign_to:int | None = None,
+        transfer_projects_to:int | None = None
+    ):
+        """Deactivate a user account and queue the hand-off of their work; returns the job.
+        
+        Open tasks go to ``reassign_to`` (unassigned if None) and owned
+        projects to ``transfer_projects_to`` (archived if None).
+        """
+        user = await self.repo.get_by_id(user_id=user_id)
+        if not user:
+            return None
+        
+        for target in (reassign_to, transfer_projects_to):
+            if target is not None and (target == user_id or not await self.repo.get_by_id(user_id=target)):
+                raise ValueError(f"User {target} is not another active user")
+        
+        job = await self.jobs.enqueue(
+            DEACTIVATE_USER,
+            {"user_id": user_id, "reassign_to": reassign_to, "transfer_projects_to": transfer_projects_to},
+            created_by=requested_by
+        )
+        # Locked out right away; the job does it too in case this never runs
+        await self.repo.delete(user_id=user_id)
+        return job
     
     
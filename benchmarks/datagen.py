@@ -0,0 +1,389 @@
+"""Generate and bulk-load a large synthetic dataset for scale testing.
+
+    python -m benchmarks.datagen --tasks 10000000 [--database-url URL] [--seed 0]
+                                 [--workers 8] [--writers 4] [--chunk-size 50000]
+
+The schema is dropped and recreated, then filled with users, projects,
+memberships and tasks with realistic skew:
+
+* Project sizes follow a power law (Zipf, ``--project-skew``): a few
+  projects hold a large share of the tasks and many hold only a few.
+* Project owners and members are drawn with a milder power law over
+  users, so some users belong to many projects.
+* The status mix depends on project age: old projects are mostly
+  completed, young ones mostly open or in progress.
+
+Everything is derived from ``--seed`` and ``--as-of`` (the "now" of the
+data, today by default), and each chunk of tasks is generated from its own
+index. The same seed therefore gives the same rows whatever the number of
+workers.
+
+Tasks are generated in ``--workers`` processes, already in the format the
+database stores. On PostgreSQL (asyncpg), ``--writers`` connections load
+them in parallel with COPY. SQLite, which has a single writer anyway,
+gets batched inserts straight through the driver from one connection. The secondary indexes of the tasks table are
+dropped during the load and rebuilt afterwards. The portfolio rollups are
+rebuilt and the tables analysed, so the data is ready to query.
+"""
+import argparse
+import asyncio
+import bisect
+import contextlib
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, Sequence
+
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.constants import ProjectStatusEnum, RoleEnum
+from app.core.security import get_security_service
+from app.models.base import Base
+from app.models import task_rollup, deadline_scan_state, job, idempotency_key  # noqa: F401 (register mappers)
+from app.models.user import User
+from app.models.project import Project
+from app.models.project_member import ProjectMember
+from app.models.task import Task
+from app.repository.task_rollup_repository import TaskRollupRepository
+
+PASSWORD = "ScaleTest123!"
+
+USER_COLUMNS = ("id", "email", "username", "hashed_password", "full_name", "role", "is_active", "is_verified",
+                "created_at", "updated_at")
+PROJECT_COLUMNS = ("id", "name", "description", "owner_id", "status", "created_at", "updated_at")
+MEMBER_COLUMNS = ("id", "project_id", "user_id", "role", "created_at", "updated_at")
+TASK_COLUMNS = ("id", "title", "description", "project_id", "assignee_id", "status", "priority", "due_date",
+                "created_at", "updated_at")
+
+PRIORITY_WEIGHTS = {"LOW": 30, "MEDIUM": 45, "HIGH": 20, "CRITICAL": 5}
+# Oldest projects are up to this many days old
+MAX_PROJECT_AGE_DAYS = 3 * 365
+
+
+@dataclass(frozen=True)
+class Shape:
+    tasks: int
+    users: int
+    projects: int
+    members_per_project: int = 3
+    project_skew: float = 1.1
+    user_skew: float = 0.8
+
+    @classmethod
+    def for_tasks(cls, tasks: int, **overrides) -> "Shape":
+        """One user per 100 tasks and one project per 200 unless overridden."""
+        defaults = {"users": max(10, tasks // 100), "projects": max(5, tasks // 200)}
+        return cls(tasks=tasks, **{**defaults, **overrides})
+
+
+@dataclass
+class Plan:
+    """Everything but the task rows: small enough to build up front and ship to workers."""
+    shape: Shape
+    seed: int
+    as_of: datetime
+    # Per project (index = id - 1)
+    sizes: list[int]
+    ages: list[float]
+    owners: list[int]
+    members: list[tuple[int, ...]]
+    # Task index at which each project's tasks start
+    offsets: list[int]
+    # Emit datetimes in SQLite's text format, as SQLAlchemy stores them (done in the workers, not the writer)
+    text_dates: bool = False
+
+    def stamp(self, value: datetime | None) -> datetime | str | None:
+        if value is None or not self.text_dates:
+            return value
+        return value.isoformat(" ", "microseconds")
+
+    def project_at_size_percentile(self, fraction: float) -> int:
+        """Id of the project at a size percentile among non-empty projects (0.5 = a typical one)."""
+        ranked = sorted((size, project_id) for project_id, size in enumerate(self.sizes, 1) if size)
+        return ranked[min(len(ranked) - 1, int(fraction * len(ranked)))][1]
+
+    @staticmethod
+    def email(user_id: int) -> str:
+        return f"user{user_id}@example.com"
+
+
+def _zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+def make_plan(shape: Shape, seed: int = 0, as_of: datetime | None = None, text_dates: bool = False) -> Plan:
+    rng = random.Random(f"{seed}:plan")
+    as_of = as_of or datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+    # Power-law sizes, handed out to projects in random order
+    weights = [1 / rank ** shape.project_skew for rank in range(1, shape.projects + 1)]
+    total_weight = sum(weights)
+    sizes = [int(shape.tasks * w / total_weight) for w in weights]
+    for rank in range(shape.tasks - sum(sizes)):
+        sizes[rank % shape.projects] += 1
+    rng.shuffle(sizes)
+
+    # Users ranked by activity in random order; owners and members drawn by rank
+    user_ids = list(range(1, shape.users + 1))
+    rng.shuffle(user_ids)
+    user_cum_weights = _zipf_cum_weights(shape.users, shape.user_skew)
+    owners, members = [], []
+    for _ in range(shape.projects):
+        owner, *others = rng.choices(user_ids, cum_weights=user_cum_weights, k=1 + shape.members_per_project)
+        owners.append(owner)
+        members.append(tuple(dict.fromkeys(u for u in others if u != owner)))
+
+    return Plan(
+        shape=shape,
+        seed=seed,
+        as_of=as_of,
+        sizes=sizes,
+        ages=[rng.random() for _ in range(shape.projects)],
+        owners=owners,
+        members=members,
+        offsets=list(itertools.accumulate(sizes, initial=0))[:-1],
+        text_dates=text_dates
+    )
+
+
+def _status_weights(age: float) -> dict[str, float]:
+    """Old projects are mostly done; young ones mostly open or in progress."""
+    return {
+        "OPEN": 5 + 45 * (1 - age),
+        "IN_PROGRESS": 3 + 25 * (1 - age),
+        "BLOCKED": 5,
+        "COMPLETED": 20 + 60 * age,
+        "CANCELLED": 3 + 5 * age,
+    }
+
+
+def _picker(weights: dict[str, float]) -> tuple[list[str], list[float], float]:
+    """Choices with cumulative weights, for picking with one bisect per row."""
+    cum_weights = list(itertools.accumulate(weights.values()))
+    return list(weights), cum_weights, cum_weights[-1]
+
+
+def user_rows(plan: Plan) -> Iterator[tuple]:
+    hashed_password = get_security_service().hashpassword(PASSWORD)
+    created = plan.stamp(plan.as_of - timedelta(days=MAX_PROJECT_AGE_DAYS))
+    for user_id in range(1, plan.shape.users + 1):
+        yield (user_id, plan.email(user_id), f"user{user_id}", hashed_password, f"User {user_id}",
+               RoleEnum.USER.name, True, True, created, created)
+
+
+def project_rows(plan: Plan) -> Iterator[tuple]:
+    rng = random.Random(f"{plan.seed}:projects")
+    statuses = [ProjectStatusEnum.ACTIVE.name, ProjectStatusEnum.PLANNING.name, ProjectStatusEnum.ON_HOLD.name,
+                ProjectStatusEnum.COMPLETED.name]
+    for index, (owner, age) in enumerate(zip(plan.owners, plan.ages)):
+        created = plan.stamp(plan.as_of - timedelta(days=age * MAX_PROJECT_AGE_DAYS))
+        status = rng.choices(statuses, weights=[60 * (1 - age) + 10, 10, 5, 40 * age])[0]
+        yield (index + 1, f"Project {index + 1}", None, owner, status, created, created)
+
+
+def member_rows(plan: Plan) -> Iterator[tuple]:
+    member_id = itertools.count(1)
+    for index, members in enumerate(plan.members):
+        created = plan.stamp(plan.as_of - timedelta(days=plan.ages[index] * MAX_PROJECT_AGE_DAYS))
+        for user_id in members:
+            yield (next(member_id), index + 1, user_id, "member", created, created)
+
+
+_plan: Plan | None = None
+
+
+def _set_plan(plan: Plan) -> None:
+    global _plan
+    _plan = plan
+
+
+def task_chunk(chunk: int, chunk_size: int) -> list[tuple]:
+    """Task rows ``chunk * chunk_size`` onwards; depends only on the plan and the chunk index."""
+    plan = _plan
+    rng = random.Random(f"{plan.seed}:tasks:{chunk}")
+    random_ = rng.random
+    stamp = plan.stamp
+    priorities, priority_cum, priority_total = _picker(PRIORITY_WEIGHTS)
+    status_pickers: dict[int, tuple[list[str], list[float], float]] = {}
+    rows = []
+    start = chunk * chunk_size
+    for index in range(start, min(start + chunk_size, plan.shape.tasks)):
+        # Empty projects share their offset with the next one: bisect_right passes them
+        project = bisect.bisect_right(plan.offsets, index) - 1
+        if project not in status_pickers:
+            status_pickers[project] = _picker(_status_weights(plan.ages[project]))
+        statuses, status_cum, status_total = status_pickers[project]
+
+        age_days = plan.ages[project] * MAX_PROJECT_AGE_DAYS
+        created = plan.as_of - timedelta(days=random_() * age_days)
+        updated = created + (plan.as_of - created) * random_()
+        due = created + timedelta(days=1 + 59 * random_()) if random_() < 0.7 else None
+        assignee = None
+        if random_() < 0.6:
+            members = plan.members[project]
+            assignee = rng.choice(members) if members and random_() < 0.8 else plan.owners[project]
+        rows.append((
+            index + 1, f"Task {index + 1}", None, project + 1, assignee,
+            statuses[bisect.bisect(status_cum, random_() * status_total)],
+            priorities[bisect.bisect(priority_cum, random_() * priority_total)],
+            stamp(due), stamp(created), stamp(updated)
+        ))
+    return rows
+
+
+async def _write(conn: AsyncConnection, table: Table, columns: Sequence[str], rows: list[tuple]) -> None:
+    if not rows:
+        return
+    if conn.dialect.driver == "asyncpg":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table.name, records=rows, columns=list(columns))
+        return
+    if conn.dialect.name == "sqlite":
+        # Rows are already in storage format: hand them to the driver as they are
+        placeholders = ", ".join("?" * len(columns))
+        await conn.exec_driver_sql(f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+    else:
+        # SQLAlchemy converts enums and datetimes for the dialect
+        await conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+    await conn.commit()
+
+
+@contextlib.asynccontextmanager
+async def _writer(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    async with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # A crash mid-load means loading again anyway: skip the fsyncs
+            await conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        yield conn
+
+
+async def _write_all(engine: AsyncEngine, table: Table, columns: Sequence[str], rows: Iterator[tuple], batch: int) -> None:
+    async with _writer(engine) as conn:
+        while chunk := list(itertools.islice(rows, batch)):
+            await _write(conn, table, columns, chunk)
+
+
+async def _load_tasks(engine: AsyncEngine, plan: Plan, workers: int, writers: int, chunk_size: int) -> None:
+    chunks = math.ceil(plan.shape.tasks / chunk_size)
+    loop = asyncio.get_running_loop()
+    # Generated chunks waiting for a writer: bounded so memory stays flat
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, workers * 2))
+
+    with ProcessPoolExecutor(max(1, workers), initializer=_set_plan, initargs=(plan,)) as pool:
+        async def produce() -> None:
+            for chunk in range(chunks):
+                await queue.put(loop.run_in_executor(pool, task_chunk, chunk, chunk_size))
+            for _ in range(writers):
+                await queue.put(None)
+
+        async def write() -> None:
+            async with _writer(engine) as conn:
+                while (future := await queue.get()) is not None:
+                    await _write(conn, Task.__table__, TASK_COLUMNS, await future)
+
+        await asyncio.gather(produce(), *(write() for _ in range(writers)))
+
+
+async def load(
+    engine: AsyncEngine,
+    shape: Shape,
+    seed: int = 0,
+    as_of: datetime | None = None,
+    workers: int = 1,
+    writers: int = 1,
+    chunk_size: int = 50_000,
+    log=lambda message: None
+) -> Plan:
+    """Recreate the schema and load a dataset of ``shape``; returns its plan."""
+    plan = make_plan(shape, seed, as_of, text_dates=engine.dialect.name == "sqlite")
+    postgres = engine.dialect.name == "postgresql"
+    writers = writers if postgres else 1
+    task_indexes = list(Task.__table__.indexes)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        # Building indexes once after the load beats maintaining them per row
+        await conn.run_sync(lambda sync_conn: [index.drop(sync_conn) for index in task_indexes])
+
+    started = time.perf_counter()
+    await _write_all(engine, User.__table__, USER_COLUMNS, user_rows(plan), chunk_size)
+    await _write_all(engine, Project.__table__, PROJECT_COLUMNS, project_rows(plan), chunk_size)
+    await _write_all(engine, ProjectMember.__table__, MEMBER_COLUMNS, member_rows(plan), chunk_size)
+    log(f"users, projects, memberships: {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    await _load_tasks(engine, plan, workers, writers, chunk_size)
+    elapsed = time.perf_counter() - started
+    log(f"tasks: {shape.tasks:,} in {elapsed:.1f}s ({shape.tasks / elapsed:,.0f} rows/s)")
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: [index.create(sync_conn) for index in task_indexes])
+        if postgres:
+            # Ids were given explicitly: move the sequences past them
+            for table in (User.__table__, Project.__table__, ProjectMember.__table__, Task.__table__):
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT coalesce(max(id), 0) + 1 FROM {table.name}), false)"
+                ))
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        await TaskRollupRepository(session).rebuild()
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+    log(f"indexes, rollups, analyze: {time.perf_counter() - started:.1f}s")
+    return plan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, help="defaults to tasks / 100")
+    parser.add_argument("--projects", type=int, help="defaults to tasks / 200")
+    parser.add_argument("--members-per-project", type=int, default=3)
+    parser.add_argument("--project-skew", type=float, default=1.1, help="Zipf exponent of project sizes")
+    parser.add_argument("--user-skew", type=float, default=0.8, help="Zipf exponent of user activity")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--as-of", type=datetime.fromisoformat, help="the data's 'now'; defaults to today")
+    parser.add_argument("--database-url", default="sqlite+aiosqlite:///./datagen.db")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="generator processes")
+    parser.add_argument("--writers", type=int, default=4, help="parallel COPY connections (PostgreSQL)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    sizes = {name: value for name, value in (("users", args.users), ("projects", args.projects)) if value}
+    shape = Shape.for_tasks(
+        args.tasks,
+        members_per_project=args.members_per_project,
+        project_skew=args.project_skew,
+        user_skew=args.user_skew,
+        **sizes
+    )
+
+    async def run() -> Plan:
+        engine = create_async_engine(args.database_url)
+        try:
+            return await load(engine, shape, args.seed, args.as_of, args.workers, args.writers, args.chunk_size,
+                              log=lambda message: print(message, flush=True))
+        finally:
+            await engine.dispose()
+
+    started = time.perf_counter()
+    plan = asyncio.run(run())
+    largest = max(plan.sizes)
+    print(
+        f"Loaded {shape.users:,} users, {shape.projects:,} projects, {shape.tasks:,} tasks "
+        f"in {time.perf_counter() - started:.1f}s (largest project: {largest:,} tasks, "
+        f"median: {plan.sizes[plan.project_at_size_percentile(0.5) - 1]:,})"
+    )
+
+
+if __name__ == "__main__":
+    main()
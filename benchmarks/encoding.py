@@ -0,0 +1,89 @@
+"""Payload size and encode/decode time of task pages, JSON vs MessagePack.
+
+    python -m benchmarks.encoding [--pages 20,100] [--repeat 2000]
+
+Pages are built like the list endpoints build them (plain column rows with
+enum and datetime values) and encoded with the functions the responses
+use; decoding uses orjson and msgpack as a consuming service would.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import msgpack
+import orjson
+
+from app.core.constants import TaskStatusEnum, TaskPriorityEnum
+from app.core.serialization import encode, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE
+
+DECODERS = {
+    JSON_MEDIA_TYPE: orjson.loads,
+    MSGPACK_MEDIA_TYPE: msgpack.unpackb,
+}
+
+
+def task_page(rows: int) -> dict:
+    """A task list page as served by GET /projects/{id}/tasks."""
+    now = datetime(2030, 1, 1, 12, 30, 15, 123456)
+    statuses, priorities = list(TaskStatusEnum), list(TaskPriorityEnum)
+    return {
+        "total": rows * 10,
+        "skip": 0,
+        "limit": rows,
+        "items": [
+            {
+                "id": 100000 + i,
+                "title": f"Task {i}: follow up with the customer",
+                "description": "Lorem ipsum dolor sit amet " * 4,
+                "status": statuses[i % len(statuses)],
+                "priority": priorities[i % len(priorities)],
+                "project_id": 42,
+                "assignee_id": 7 if i % 3 else None,
+                "due_date": now + timedelta(hours=i) if i % 2 else None,
+                "created_at": now - timedelta(days=i),
+                "updated_at": now,
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def _per_call_us(func, arg, repeat: int) -> float:
+    func(arg)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(rows: int, repeat: int) -> dict[str, dict[str, float]]:
+    """Return bytes, encode and decode microseconds per page for each encoding."""
+    page = task_page(rows)
+    results = {}
+    for media_type, decode in DECODERS.items():
+        body = encode(page, media_type)
+        results[media_type] = {
+            "bytes": len(body),
+            "encode_us": _per_call_us(lambda p: encode(p, media_type), page, repeat),
+            "decode_us": _per_call_us(decode, body, repeat),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="20,100", help="comma-separated page sizes")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>5} {'encoding':>20} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+    for rows in (int(size) for size in args.pages.split(",")):
+        for media_type, result in run(rows, args.repeat).items():
+            print(
+                f"{rows:>5} {media_type:>20} {result['bytes']:>8} "
+                f"{result['encode_us']:>10.1f} {result['decode_us']:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
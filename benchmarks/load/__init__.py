@@ -0,0 +1,7 @@
+"""HTTP load tests: seeded data, scenario load generator and baseline regression gate.
+
+    python -m benchmarks.load --help
+
+Nothing here imports the app at module level: the CLI first points the
+settings (database URL, background workers) at the benchmark database.
+"""
@@ -0,0 +1,176 @@
+"""Load test the API and gate on regressions against a stored baseline.
+
+    python -m benchmarks.load [--transport asgi|uvicorn|both] [--duration 10] [--concurrency 8]
+                              [--out results.json] [--update-baseline]
+
+Seeds a fresh database (a temporary SQLite file unless --database-url is
+given), then runs each scenario (login, list_tasks, board_update,
+create_burst) against the app. The "asgi" transport calls the app
+in-process. The "uvicorn" transport runs a real uvicorn server in a
+subprocess and goes over its socket. The output has RPS, p50/p95/p99 and
+the error rate for each scenario.
+
+SQLite serialises writers, so create_burst at high concurrency measures lock
+waits (and "database is locked" errors) rather than the app; pass a
+PostgreSQL --database-url for write-heavy runs.
+
+The exit status is 1 when a scenario regresses past the thresholds
+compared with the baseline (benchmarks/load/baseline.json by default).
+Baselines only compare on the machine that recorded them: record one with
+--update-baseline on the machine that runs the gate.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+import httpx
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["asgi", "uvicorn", "both"], default="asgi")
+    parser.add_argument("--scenarios", default="login,list_tasks,board_update,create_burst")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--projects-per-user", type=int, default=5)
+    parser.add_argument("--tasks-per-project", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--out", type=Path, help="write the results as JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--max-rps-drop", type=float, default=0.20)
+    parser.add_argument("--max-latency-rise", type=float, default=0.25)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def _uvicorn_server() -> AsyncIterator[str]:
+    """Run the app under uvicorn in a subprocess; yields its base URL once it answers."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy()
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url) as probe:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await probe.get("/api/v1/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def _run_transport(transport: str, args: argparse.Namespace) -> dict[str, dict]:
+    from app.core.database import engine
+    from benchmarks.load.runner import run_scenario
+    from benchmarks.load.scenarios import SCENARIOS, CREATE_BURST_SIZE
+    from benchmarks.load.seed import seed_load_data
+
+    # Fresh data per transport, so both runs start from the same state
+    data = await seed_load_data(engine, args.users, args.projects_per_user, args.tasks_per_project, args.seed)
+    # The engine is connected now: its first-connect hook, which must not run
+    # under concurrent checkouts, is done before the workers start
+
+    limits = httpx.Limits(max_connections=args.concurrency * CREATE_BURST_SIZE)
+    async with contextlib.AsyncExitStack() as stack:
+        if transport == "asgi":
+            from app.main import app
+            # Unhandled app errors become 500s, as a server would answer
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                base_url="http://load",
+                timeout=60
+            )
+        else:
+            base_url = await stack.enter_async_context(_uvicorn_server())
+            client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+        await stack.enter_async_context(client)
+
+        results = {}
+        for name in args.scenarios.split(","):
+            result = await run_scenario(
+                client, SCENARIOS[name], data, args.duration, args.concurrency, args.warmup, args.seed
+            )
+            results[name] = result.as_dict()
+            print(
+                f"{transport:>8} {name:>13}: {result.rps:8.1f} rps  p50 {result.p50_ms:8.2f} ms  "
+                f"p95 {result.p95_ms:8.2f} ms  p99 {result.p99_ms:8.2f} ms  errors {result.errors}",
+                flush=True
+            )
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    args = _parse_args()
+    tmpdir = None
+    if not args.database_url:
+        tmpdir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite+aiosqlite:///{tmpdir.name}/load.db"
+    # Before the app is imported: settings are read once
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DEADLINE_SCAN_ENABLED"] = "false"
+    os.environ["JOBS_ENABLED"] = "false"
+
+    from benchmarks.load.runner import Thresholds, find_regressions
+
+    transports = ["asgi", "uvicorn"] if args.transport == "both" else [args.transport]
+    results = {transport: asyncio.run(_run_transport(transport, args)) for transport in transports}
+    if tmpdir:
+        tmpdir.cleanup()
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=2) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    thresholds = Thresholds(args.max_rps_drop, args.max_latency_rise, args.max_error_rate)
+    regressions = [
+        f"{transport} {line}"
+        for transport, transport_results in results.items()
+        for line in find_regressions(transport_results, baseline.get(transport, {}), thresholds)
+    ]
+    if regressions:
+        print("Regressions against the baseline:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print("No regressions against the baseline" if baseline else "No baseline to compare with")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Closed-loop load generator, latency percentiles and the baseline comparison."""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, asdict
+
+import httpx
+
+from benchmarks.load.scenarios import Scenario
+from benchmarks.load.seed import LoadData
+
+
+@dataclass
+class ScenarioResult:
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "error_rate": round(self.error_rate, 4)}
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """How much worse than the baseline a result may be before it counts as a regression."""
+    max_rps_drop: float = 0.20
+    max_latency_rise: float = 0.25
+    max_error_rate: float = 0.01
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values) + 0.5))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    data: LoadData,
+    duration: float,
+    concurrency: int,
+    warmup: float = 1.0,
+    seed: int = 0
+) -> ScenarioResult:
+    """Run ``concurrency`` workers back to back for ``duration`` seconds after a warm-up.
+
+    Every request's latency is the time of the operation it was part of
+    (a create burst counts each of its requests at the burst's latency).
+    """
+    latencies: list[float] = []
+    errors = 0
+    measuring = False
+
+    async def worker(worker_seed: int, deadline: float) -> None:
+        nonlocal errors
+        rng = random.Random(worker_seed)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                responses = await scenario(client, data, rng)
+                failed = sum(1 for r in responses if r.status_code >= 400)
+                count = len(responses)
+            except httpx.HTTPError:
+                failed = count = 1
+            elapsed = time.perf_counter() - started
+            if measuring:
+                latencies.extend([elapsed] * count)
+                errors += failed
+
+    if warmup:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(seed * 1000 + i, deadline) for i in range(concurrency)))
+
+    measuring = True
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker(seed * 1000 + concurrency + i, deadline) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return ScenarioResult(
+        requests=len(latencies),
+        errors=errors,
+        rps=round(len(latencies) / elapsed, 1),
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 0.95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 2),
+    )
+
+
+def find_regressions(results: dict[str, dict], baseline: dict[str, dict], thresholds: Thresholds) -> list[str]:
+    """Describe every scenario result that is worse than its baseline beyond the thresholds."""
+    regressions = []
+    for name, base in baseline.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        if result["error_rate"] > thresholds.max_error_rate:
+            regressions.append(f"{name}: error rate {result['error_rate']:.2%} > {thresholds.max_error_rate:.2%}")
+        if base["rps"] and result["rps"] < base["rps"] * (1 - thresholds.max_rps_drop):
+            regressions.append(f"{name}: {result['rps']} rps, baseline {base['rps']} (-{1 - result['rps'] / base['rps']:.0%})")
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and result[key] > base[key] * (1 + thresholds.max_latency_rise):
+                regressions.append(f"{name}: {key} {result[key]}, baseline {base[key]} (+{result[key] / base[key] - 1:.0%})")
+    return regressions
@@ -0,0 +1,60 @@
+"""Load test scenarios. Each runs one operation and returns the responses it got."""
+import asyncio
+import random
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.load.seed import LoadData, PASSWORD
+
+Scenario = Callable[[httpx.AsyncClient, LoadData, random.Random], Awaitable[list[httpx.Response]]]
+
+BOARD_STATUSES = ["open", "in_progress", "blocked", "completed"]
+CREATE_BURST_SIZE = 10
+
+
+async def login(client: httpx.AsyncClient, data: LoadData, rng: random.Random) -> list[httpx.Response]:
+    """Password login (bcrypt-bound)."""
+    user = rng.choice(data.users)
+    return [await client.post("/api/v1/auth/login", json={"email": user.email, "password": PASSWORD})]
+
+
+async def list_tasks(client: httpx.AsyncClient, data: LoadData, rng: random.Random) -> list[httpx.Response]:
+    """First page of a project's task list, as a board loads it."""
+    user = rng.choice(data.users)
+    project_id = rng.choice(user.project_ids)
+    return [await client.get(f"/api/v1/projects/{project_id}/tasks", params={"limit": 50}, headers=user.headers)]
+
+
+async def board_update(client: httpx.AsyncClient, data: LoadData, rng: random.Random) -> list[httpx.Response]:
+    """Drag a card to another column."""
+    user = rng.choice(data.users)
+    project_id = rng.choice(user.project_ids)
+    task_id = rng.choice(data.task_ids[project_id])
+    return [await client.put(
+        f"/api/v1/projects/{project_id}/tasks/{task_id}",
+        json={"status": rng.choice(BOARD_STATUSES)},
+        headers=user.headers
+    )]
+
+
+async def create_burst(client: httpx.AsyncClient, data: LoadData, rng: random.Random) -> list[httpx.Response]:
+    """Several tasks created at once in one project, as an import or template does."""
+    user = rng.choice(data.users)
+    project_id = rng.choice(user.project_ids)
+    return list(await asyncio.gather(*(
+        client.post(
+            f"/api/v1/projects/{project_id}/tasks",
+            json={"title": f"Burst task {i}", "priority": "medium"},
+            headers=user.headers
+        )
+        for i in range(CREATE_BURST_SIZE)
+    )))
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "login": login,
+    "list_tasks": list_tasks,
+    "board_update": board_update,
+    "create_burst": create_burst,
+}
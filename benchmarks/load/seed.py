@@ -0,0 +1,108 @@
+"""Seed a database for load tests: owners with projects and tasks, plus ready-made tokens."""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession
+
+from app.core.constants import RoleEnum, TaskStatusEnum, TaskPriorityEnum
+from app.core.security import get_security_service
+from app.models.base import Base
+from app.models import project_member, task_rollup, deadline_scan_state, job, idempotency_key  # noqa: F401 (register mappers)
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.repository.task_rollup_repository import TaskRollupRepository
+
+PASSWORD = "LoadTest123!"
+
+# Roughly what a live board looks like: mostly open or in progress
+STATUS_WEIGHTS = {
+    TaskStatusEnum.OPEN: 45,
+    TaskStatusEnum.IN_PROGRESS: 25,
+    TaskStatusEnum.BLOCKED: 5,
+    TaskStatusEnum.COMPLETED: 22,
+    TaskStatusEnum.CANCELLED: 3,
+}
+
+
+@dataclass
+class LoadUser:
+    id: int
+    email: str
+    token: str
+    project_ids: list[int] = field(default_factory=list)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+@dataclass
+class LoadData:
+    users: list[LoadUser]
+    task_ids: dict[int, list[int]]
+
+
+async def seed_load_data(
+    engine: AsyncEngine,
+    users: int,
+    projects_per_user: int,
+    tasks_per_project: int,
+    seed: int = 0
+) -> LoadData:
+    """Create the schema and seed it; returns what the scenarios need to address it."""
+    rng = random.Random(seed)
+    security = get_security_service()
+    # One bcrypt hash for everyone: hashing per user would dominate seeding
+    hashed_password = security.hashpassword(PASSWORD)
+    now = datetime.utcnow()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        user_ids = (await conn.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": f"load{i}@example.com", "username": f"load{i}", "hashed_password": hashed_password,
+                 "role": RoleEnum.USER, "is_active": True, "is_verified": True}
+                for i in range(users)
+            ]
+        )).scalars().all()
+        load_users = [
+            LoadUser(id=user_id, email=f"load{i}@example.com",
+                     token=security.create_access_token({"sub": str(user_id), "role": RoleEnum.USER.value}))
+            for i, user_id in enumerate(user_ids)
+        ]
+
+        task_ids: dict[int, list[int]] = {}
+        statuses, weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+        for user in load_users:
+            project_ids = (await conn.execute(
+                insert(Project).returning(Project.id),
+                [{"name": f"Project {user.id}-{p}", "owner_id": user.id} for p in range(projects_per_user)]
+            )).scalars().all()
+            user.project_ids = list(project_ids)
+            for project_id in project_ids:
+                task_ids[project_id] = list((await conn.execute(
+                    insert(Task).returning(Task.id),
+                    [
+                        {
+                            "title": f"Task {t}",
+                            "description": "Seeded for load tests",
+                            "status": rng.choices(statuses, weights)[0],
+                            "priority": rng.choice(list(TaskPriorityEnum)),
+                            "project_id": project_id,
+                            "assignee_id": user.id if rng.random() < 0.6 else None,
+                            "due_date": now + timedelta(days=rng.randint(-10, 30)) if rng.random() < 0.7 else None,
+                        }
+                        for t in range(tasks_per_project)
+                    ]
+                )).scalars().all())
+
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as session:
+        await TaskRollupRepository(session).rebuild()
+    return LoadData(users=load_users, task_ids=task_ids)
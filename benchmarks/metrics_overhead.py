@@ -0,0 +1,73 @@
+"""Per-request cost of MetricsMiddleware.
+
+    python -m benchmarks.metrics_overhead [--requests 20000]
+
+Drives a minimal FastAPI app (one templated route returning a small dict)
+straight through ASGI, with and without the middleware, so the difference
+is the middleware's own cost rather than network or client overhead.
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp
+
+from app.core.metrics import MetricsMiddleware
+
+
+def _app(with_metrics: bool) -> ASGIApp:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id, "title": "Item"}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def _per_request_us(app: ASGIApp, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope(i: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/items/{i}", "raw_path": f"/items/{i}".encode(),
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+        }
+
+    for i in range(200):  # warm up
+        await app(scope(i), receive, send)
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scope(i), receive, send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def run(requests: int) -> dict[str, float]:
+    """Microseconds per request without and with the middleware."""
+    return {
+        "bare": await _per_request_us(_app(with_metrics=False), requests),
+        "metrics": await _per_request_us(_app(with_metrics=True), requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    timings = asyncio.run(run(args.requests))
+    for name, micros in timings.items():
+        print(f"{name:>9}: {micros:7.1f} us/request")
+    print(f"{'overhead':>9}: {timings['metrics'] - timings['bare']:7.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
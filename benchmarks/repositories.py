@@ -0,0 +1,251 @@
+"""How repository reads scale with table size: latency, memory and query plans.
+
+    python -m benchmarks.repositories [--scales 1000,10000,100000] [--database-url URL ...]
+                                      [--repeat 50] [--out results.json] [--report report.md]
+
+For every database and every scale (number of tasks), a fresh schema is
+loaded by ``benchmarks.datagen``, with skewed project sizes. These reads
+are then benchmarked against a typical (median-sized) project and one of
+its members, each call in a fresh session as a request would make it:
+
+* ``TaskRepository.get_project_tasks`` (a page of 50)
+* ``TaskRepository.get_project_tasks_count``
+* ``TaskRepository.get_user_assigned_tasks`` (a page of 50)
+* ``ProjectRepository.get_projects_by_member``
+* ``UserRepository.get_by_email``
+
+Latency is the median and p95 over ``--repeat`` calls after a warm-up.
+Memory is the peak Python allocation of one call (tracemalloc). The plan
+is the database's EXPLAIN of the SQL the method sent. The report is a
+Markdown table per method across scales and databases; "growth" is how
+much slower the median got per tenfold more rows.
+
+The database defaults to a temporary SQLite file. Pass ``--database-url``
+once per database to compare, e.g. a PostgreSQL URL as well. Its schema is
+dropped and recreated, so never point it at data you want to keep.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.repository.project_repository import ProjectRepository
+from app.repository.task_repository import TaskRepository
+from app.repository.user_repository import UserRepository
+from benchmarks import datagen
+
+PAGE = 50
+
+Operation = Callable[[AsyncSession], Awaitable[Any]]
+
+
+@dataclass
+class Targets:
+    """Rows the benchmarked reads look up: a typical project and user at this scale."""
+    project_id: int
+    user_id: int
+    email: str
+
+
+@dataclass
+class MethodResult:
+    database: str
+    scale: int
+    method: str
+    median_ms: float
+    p95_ms: float
+    peak_kib: float
+    rows: int
+    plan: list[str] = field(default_factory=list)
+
+
+async def seed(engine: AsyncEngine, tasks: int, seed_value: int = 0, workers: int = 1) -> Targets:
+    """Recreate the schema with ``tasks`` tasks (see ``benchmarks.datagen``); returns typical rows to look up."""
+    plan = await datagen.load(engine, datagen.Shape.for_tasks(tasks), seed_value, workers=workers)
+    project_id = plan.project_at_size_percentile(0.5)
+    members = plan.members[project_id - 1]
+    # A member of a typical project: has memberships and assigned tasks
+    user_id = members[0] if members else plan.owners[project_id - 1]
+    return Targets(project_id=project_id, user_id=user_id, email=plan.email(user_id))
+
+
+def operations(targets: Targets) -> dict[str, Operation]:
+    return {
+        "TaskRepository.get_project_tasks":
+            lambda s: TaskRepository(s).get_project_tasks(targets.project_id, limit=PAGE),
+        "TaskRepository.get_project_tasks_count":
+            lambda s: TaskRepository(s).get_project_tasks_count(targets.project_id),
+        "TaskRepository.get_user_assigned_tasks":
+            lambda s: TaskRepository(s).get_user_assigned_tasks(targets.user_id, limit=PAGE),
+        "ProjectRepository.get_projects_by_member":
+            lambda s: ProjectRepository(s).get_projects_by_member(targets.user_id),
+        "UserRepository.get_by_email":
+            lambda s: UserRepository(s).get_by_email(targets.email),
+    }
+
+
+def _row_count(value: Any) -> int:
+    if isinstance(value, int):
+        return 1
+    if value is None:
+        return 0
+    return len(value) if isinstance(value, (list, tuple)) else 1
+
+
+async def _explain(engine: AsyncEngine, session_factory: async_sessionmaker, operation: Operation) -> list[str]:
+    """EXPLAIN every statement the operation sends."""
+    captured: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with session_factory() as session:
+            await operation(session)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    plan = []
+    async with engine.connect() as conn:
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(prefix + statement, parameters)
+            # SQLite returns (id, parent, notused, detail); PostgreSQL a single text column
+            plan.extend(row[-1] for row in result.all())
+    return plan
+
+
+async def measure(
+    engine: AsyncEngine,
+    database: str,
+    scale: int,
+    name: str,
+    operation: Operation,
+    repeat: int
+) -> MethodResult:
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def call() -> Any:
+        async with session_factory() as session:
+            return await operation(session)
+
+    for _ in range(3):
+        value = await call()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    tracemalloc.start()
+    try:
+        await call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return MethodResult(
+        database=database,
+        scale=scale,
+        method=name,
+        median_ms=round(statistics.median(timings) * 1000, 3),
+        p95_ms=round(timings[min(len(timings) - 1, math.ceil(0.95 * len(timings)) - 1)] * 1000, 3),
+        peak_kib=round(peak / 1024, 1),
+        rows=_row_count(value),
+        plan=await _explain(engine, session_factory, operation)
+    )
+
+
+async def run(database_url: str, scales: list[int], repeat: int, seed_value: int, workers: int) -> list[MethodResult]:
+    database = make_url(database_url).get_backend_name()
+    engine = create_async_engine(database_url)
+    results = []
+    try:
+        for scale in scales:
+            started = time.perf_counter()
+            targets = await seed(engine, scale, seed_value, workers)
+            print(f"{database}: seeded {scale:,} tasks in {time.perf_counter() - started:.1f}s", flush=True)
+            for name, operation in operations(targets).items():
+                results.append(await measure(engine, database, scale, name, operation, repeat))
+    finally:
+        await engine.dispose()
+    return results
+
+
+def _growth(results: list[MethodResult]) -> dict[tuple[str, int], str]:
+    """Median slowdown per tenfold more rows, against the previous scale of the same database."""
+    growth = {}
+    previous: dict[str, MethodResult] = {}
+    for result in sorted(results, key=lambda r: (r.database, r.scale)):
+        before = previous.get(result.database)
+        if before and before.median_ms:
+            decades = math.log10(result.scale / before.scale)
+            factor = (result.median_ms / before.median_ms) ** (1 / decades) if decades else 1.0
+            growth[(result.database, result.scale)] = f"x{factor:.2f}"
+        previous[result.database] = result
+    return growth
+
+
+def render_report(results: list[MethodResult]) -> str:
+    lines = ["# Repository benchmarks", ""]
+    for method in dict.fromkeys(r.method for r in results):
+        rows = [r for r in results if r.method == method]
+        growth = _growth(rows)
+        lines += [
+            f"## {method}", "",
+            "| database | tasks | median ms | p95 ms | growth / 10x | peak KiB | rows | plan |",
+            "|---|---:|---:|---:|---:|---:|---:|---|",
+        ]
+        for r in rows:
+            plan = "<br>".join(step.strip().replace("|", "\\|") for step in r.plan)
+            lines.append(
+                f"| {r.database} | {r.scale:,} | {r.median_ms} | {r.p95_ms} | {growth.get((r.database, r.scale), '')} "
+                f"| {r.peak_kib} | {r.rows} | {plan} |"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1000,10000,100000", help="comma-separated task counts")
+    parser.add_argument("--database-url", action="append", dest="database_urls",
+                        help="repeat to compare databases; defaults to a temporary SQLite file")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="data generator processes")
+    parser.add_argument("--out", type=Path, help="write the raw results as JSON")
+    parser.add_argument("--report", type=Path, help="write the Markdown report here instead of stdout")
+    args = parser.parse_args()
+
+    scales = sorted(int(scale) for scale in args.scales.split(","))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        urls = args.database_urls or [f"sqlite+aiosqlite:///{tmpdir}/repositories.db"]
+        results = [result for url in urls for result in asyncio.run(run(url, scales, args.repeat, args.seed, args.workers))]
+
+    if args.out:
+        args.out.write_text(json.dumps([asdict(r) for r in results], indent=2) + "\n")
+    report = render_report(results)
+    if args.report:
+        args.report.write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
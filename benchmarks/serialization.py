@@ -0,0 +1,103 @@
+"""Per-row CPU cost of encoding a task list page, ORM path vs column-row path.
+
+    python -m benchmarks.serialization [--rows 100] [--repeat 200]
+
+"orm" is the former list endpoint path: load Task objects, validate each
+into TaskResponse, run FastAPI's jsonable_encoder and json.dumps.
+"columns" is the current one: select the response columns as plain rows
+and encode them with orjson. Both include running the query against an
+in-memory SQLite database.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.core.serialization import response_columns, page_content
+from app.models.base import Base
+from app.models import project_member, task_rollup, deadline_scan_state, job, idempotency_key  # noqa: F401 (register mappers)
+from app.models.user import User
+from app.models.project import Project
+from app.models.task import Task
+from app.schemas import TaskResponse, TASK_FIELDS
+
+
+async def _seed(session: AsyncSession, rows: int) -> int:
+    user = User(email="bench@example.com", username="bench", hashed_password="x")
+    session.add(user)
+    await session.flush()
+    project = Project(name="Bench", owner_id=user.id)
+    session.add(project)
+    await session.flush()
+    now = datetime(2030, 1, 1)
+    session.add_all([
+        Task(
+            title=f"Task {i}",
+            description="Lorem ipsum dolor sit amet " * 8,
+            project_id=project.id,
+            assignee_id=user.id,
+            due_date=now + timedelta(hours=i)
+        )
+        for i in range(rows)
+    ])
+    await session.commit()
+    return project.id
+
+
+async def _orm_page(session: AsyncSession, project_id: int, rows: int) -> bytes:
+    result = await session.execute(select(Task).where(Task.project_id == project_id).limit(rows))
+    tasks = result.scalars().all()
+    page = {"total": rows, "skip": 0, "limit": rows, "items": [TaskResponse.model_validate(t) for t in tasks]}
+    content = json.dumps(jsonable_encoder(page)).encode()
+    # Drop the loaded objects so every run pays the ORM load again
+    session.expunge_all()
+    return content
+
+
+async def _column_page(session: AsyncSession, project_id: int, rows: int) -> bytes:
+    stmt = select(*response_columns(Task, TASK_FIELDS)).where(Task.project_id == project_id).limit(rows)
+    result = await session.execute(stmt)
+    return orjson.dumps(page_content(rows, 0, rows, result.all()))
+
+
+async def run(rows: int, repeat: int) -> dict[str, float]:
+    """Return microseconds per row for each path."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    timings = {}
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with session_factory() as session:
+            project_id = await _seed(session, rows)
+            for name, page in (("orm", _orm_page), ("columns", _column_page)):
+                await page(session, project_id, rows)  # warm up
+                start = time.process_time()
+                for _ in range(repeat):
+                    await page(session, project_id, rows)
+                timings[name] = (time.process_time() - start) / (repeat * rows) * 1e6
+    finally:
+        await engine.dispose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    timings = asyncio.run(run(args.rows, args.repeat))
+    for name, micros in timings.items():
+        print(f"{name:>8}: {micros:7.2f} us/row")
+    print(f"{'speedup':>8}: {timings['orm'] / timings['columns']:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
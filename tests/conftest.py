@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, Asyn
 from httpx import  AsyncClient
 from app.main import create_app
 from app.core.database import get_session
+from app.core.query_stats import instrument_engine
+from app.core.entity_cache import project_cache, user_cache
 from app.models.base import Base
 from app.core.security import get_security_service
 from app.core.constants import  RoleEnum
@@ -16,12 +18,17 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 @pytest_asyncio.fixture
 async  def test_db():
     """Create test database."""
+    # Ids start over in every database
+    project_cache.clear()
+    user_cache.clear()
     engine = create_async_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread":False},
         poolclass=None
     )
 
+    instrument_engine(engine.sync_engine)
+
     async  with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
@@ -127,4 +134,54 @@ def admin_token(test_admin_user):
         "email":test_admin_user.email,
         "role":test_admin_user.role
     }
-    return get_security_service().create_access_token(token_data)
\ No newline at end of file
+    return get_security_service().create_access_token(token_data)
+
+
+# Distinct values per column used to fake production-sized planner statistics
+TASK_COLUMN_CARDINALITY = {"project_id": 1000, "status": 5, "priority": 4, "assignee_id": 20}
+TASK_ROW_COUNT = 1_000_000
+
+
+@pytest_asyncio.fixture
+async def query_plan(test_db):
+    """Return a helper that runs EXPLAIN against production-like planner statistics."""
+    from sqlalchemy import text
+    from app.core.query_plan import explain_plan
+    from app.models.task import Task
+
+    async with test_db() as session:
+        await session.execute(text("ANALYZE"))
+        for index in Task.__table__.indexes:
+            rows, stat = TASK_ROW_COUNT, [TASK_ROW_COUNT]
+            for column in index.columns:
+                rows = max(1, rows // TASK_COLUMN_CARDINALITY.get(column.name, TASK_ROW_COUNT))
+                stat.append(rows)
+            await session.execute(
+                text("INSERT INTO sqlite_stat1 VALUES ('tasks', :idx, :stat)"),
+                {"idx": index.name, "stat": " ".join(map(str, stat))}
+            )
+        # Reload the statistics into the planner
+        await session.execute(text("ANALYZE sqlite_schema"))
+        await session.commit()
+
+    async def _query_plan(statement):
+        async with test_db() as session:
+            return await explain_plan(session, statement)
+    return _query_plan
+
+
+
+# ========== Query budget plugin ==========
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Fail a test when a route it calls runs more SQL statements than its @query_budget."""
+    from app.core.query_stats import budget_exceeded_listeners
+
+    violations = []
+    budget_exceeded_listeners.append(violations.append)
+    try:
+        yield
+    finally:
+        budget_exceeded_listeners.remove(violations.append)
+    if violations:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(violations), pytrace=False)
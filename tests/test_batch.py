@@ -0,0 +1,76 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from app.models.project import Project
+from app.repository.user_repository import UserRepository
+
+
+@pytest_asyncio.fixture
+async def project_id(test_db, test_user) -> int:
+    async with test_db() as session:
+        project = Project(name="Batched", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        return project.id
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_in_order(client: AsyncClient, test_token, project_id, monkeypatch):
+    """Reads see the writes before them; responses come back in order; the user is loaded once."""
+    user_lookups = []
+    get_by_id = UserRepository.get_by_id
+
+    async def counting_get_by_id(self, user_id, **kwargs):
+        user_lookups.append(user_id)
+        return await get_by_id(self, user_id, **kwargs)
+    monkeypatch.setattr(UserRepository, "get_by_id", counting_get_by_id)
+
+    response = await client.post(
+        "/api/v1/batch",
+        headers={"Authorization": f"Bearer {test_token}"},
+        json={"requests": [
+            {"method": "GET", "path": f"/api/v1/projects/{project_id}"},
+            {"method": "GET", "path": f"/api/v1/projects/{project_id}/tasks"},
+            {"method": "POST", "path": f"/api/v1/projects/{project_id}/tasks", "body": {"title": "First"}},
+            {"method": "PUT", "path": f"/api/v1/projects/{project_id}", "body": {"name": "Renamed"}},
+            {"method": "GET", "path": f"/api/v1/projects/{project_id}/tasks?limit=10"},
+            {"method": "GET", "path": f"/api/v1/projects/{project_id}"},
+            {"method": "GET", "path": "/api/v1/projects/999999"},
+            {"method": "POST", "path": f"/api/v1/projects/{project_id}/tasks", "body": {"title": ""}},
+        ]}
+    )
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+
+    assert [r["status"] for r in responses] == [200, 200, 201, 200, 200, 200, 403, 422]
+    assert responses[0]["body"]["name"] == "Batched"
+    assert responses[1]["body"]["total"] == 0
+    assert responses[2]["body"]["title"] == "First"
+    assert [task["title"] for task in responses[4]["body"]["items"]] == ["First"]
+    assert responses[5]["body"]["name"] == "Renamed"
+    assert responses[0]["headers"]["content-type"].startswith("application/json")
+    assert user_lookups == [int(responses[0]["body"]["owner_id"])]
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_invalid_batches(client: AsyncClient, test_token, monkeypatch):
+    headers = {"Authorization": f"Bearer {test_token}"}
+    nested = await client.post(
+        "/api/v1/batch", headers=headers,
+        json={"requests": [{"method": "POST", "path": "/api/v1/batch", "body": {"requests": []}}]}
+    )
+    assert nested.status_code == 400
+
+    outside = await client.post("/api/v1/batch", headers=headers, json={"requests": [{"method": "GET", "path": "/metrics"}]})
+    assert outside.status_code == 400
+
+    from app.core.config import get_settings
+    monkeypatch.setattr(get_settings(), "batch_max_requests", 2)
+    too_many = await client.post(
+        "/api/v1/batch", headers=headers, json={"requests": [{"method": "GET", "path": "/api/v1/health"}] * 3}
+    )
+    assert too_many.status_code == 400
+
+    anonymous = await client.post("/api/v1/batch", json={"requests": [{"method": "GET", "path": "/api/v1/health"}]})
+    assert anonymous.status_code == 403
@@ -0,0 +1,77 @@
+import gzip
+
+import brotli
+import pytest
+import zstandard
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, CompressionStats, negotiate_encoding
+
+BIG = b'{"title": "Task"}\n' * 500
+
+
+def _compression_app(stats: CompressionStats) -> Starlette:
+    async def big(request):
+        return Response(BIG, media_type="application/json")
+
+    async def small(request):
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    async def png(request):
+        return Response(BIG, media_type="image/png")
+
+    async def stream(request):
+        async def chunks():
+            for _ in range(10):
+                yield BIG[:900]
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    app = Starlette(routes=[Route("/big", big), Route("/small", small), Route("/png", png), Route("/stream", stream)])
+    return CompressionMiddleware(app, min_size=1024, stats=stats)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("coding, decompress", [
+    ("gzip", gzip.decompress),
+    ("br", brotli.decompress),
+    ("zstd", lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)),
+])
+async def test_compression_middleware(coding, decompress):
+    """Test negotiated compression of whole and streamed bodies, and what is skipped."""
+    stats = CompressionStats()
+    async with AsyncClient(app=_compression_app(stats), base_url="http://test") as client:
+        # Compare raw bytes: httpx would transparently decode some codings
+        async with client.stream("GET", "/big", headers={"Accept-Encoding": coding}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.headers["content-encoding"] == coding
+        assert response.headers["content-length"] == str(len(raw))
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert decompress(raw) == BIG
+
+        async with client.stream("GET", "/stream", headers={"Accept-Encoding": coding}) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        assert response.headers["content-encoding"] == coding
+        assert "content-length" not in response.headers
+        assert decompress(raw) == BIG[:900] * 10
+
+        for path in ("/small", "/png"):
+            response = await client.get(path, headers={"Accept-Encoding": coding})
+            assert "content-encoding" not in response.headers
+
+    assert stats.encodings[coding].responses == 2
+    assert stats.encodings[coding].ratio > 5
+    assert stats.skipped == {"too_small": 1, "compressed_content_type": 1}
+
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding negotiation with q-values and server preference."""
+    offered = ["zstd", "br", "gzip"]
+    assert negotiate_encoding(None, offered) is None
+    assert negotiate_encoding("identity", offered) is None
+    assert negotiate_encoding("gzip, br", offered) == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5", offered) == "gzip"
+    assert negotiate_encoding("*", offered) == "zstd"
+    assert negotiate_encoding("*, zstd;q=0", offered) == "br"
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import Settings
+from app.core.timing_wheel import HierarchicalTimingWheel
+
+
+def test_timing_wheel_expires_in_deadline_order():
+    """Test that entries on every level expire at their deadline, in order."""
+    wheel = HierarchicalTimingWheel(tick_seconds=1, wheel_size=10, levels=2, start=0)
+    for deadline in (5, 95, 42, 250, 7):
+        assert wheel.schedule(deadline, key=deadline, item=deadline)
+    assert len(wheel) == 5
+
+    assert wheel.advance(4) == []
+    assert wheel.advance(7) == [5, 7]
+    assert wheel.advance(41) == []
+    assert wheel.advance(100) == [42, 95]
+    assert wheel.advance(249) == []
+    assert wheel.advance(250) == [250]
+    assert len(wheel) == 0
+
+
+def test_timing_wheel_cancel_and_reschedule():
+    """Test that cancelled keys never fire and rescheduling moves the deadline."""
+    wheel = HierarchicalTimingWheel(tick_seconds=1, wheel_size=10, levels=2, start=0)
+    wheel.schedule(20, key="a", item="a")
+    wheel.schedule(30, key="b", item="b")
+    wheel.cancel("a")
+    wheel.schedule(35, key="b", item="b")
+
+    assert not wheel.schedule(0, key="late")
+    assert wheel.advance(34) == []
+    assert wheel.advance(35) == ["b"]
+
+
+def _scanner(test_db, events):
+    from app.services.deadline_scanner import DeadlineScanner
+
+    async def notifier(batch):
+        events.extend(batch)
+
+    settings = Settings(deadline_due_soon_minutes=60, deadline_scan_batch_size=2, deadline_lease_seconds=3600)
+    return DeadlineScanner(session_factory=test_db, notifier=notifier, settings=settings)
+
+
+async def _seed_tasks(test_db, owner_id, due_dates):
+    from app.models.project import Project
+    from app.models.task import Task
+
+    async with test_db() as session:
+        project = Project(name="Deadlines", owner_id=owner_id)
+        session.add(project)
+        await session.commit()
+        tasks = [Task(title=f"T{i}", project_id=project.id, due_date=due) for i, due in enumerate(due_dates)]
+        session.add_all(tasks)
+        await session.commit()
+        return [t.id for t in tasks]
+
+
+@pytest.mark.asyncio
+async def test_scanner_announces_due_soon_then_overdue(test_db, test_user):
+    """Test incremental due-soon scans and overdue events from the timing wheel."""
+    now = datetime(2030, 1, 1, 12, 0, 0)
+    events = []
+    scanner = _scanner(test_db, events)
+    # First pass only sets the watermarks
+    assert await scanner.scan_once(now=now) == 0
+
+    ids = await _seed_tasks(test_db, test_user.id, [
+        now + timedelta(minutes=10),
+        now + timedelta(minutes=20),
+        now + timedelta(minutes=30),
+        now + timedelta(hours=3),
+    ])
+
+    assert await scanner.scan_once(now=now + timedelta(minutes=1)) == 3
+    assert [(e.kind, e.task_id) for e in events] == [("due_soon", i) for i in ids[:3]]
+    assert len(scanner.wheel) == 3
+
+    # Nothing new below the watermark
+    events.clear()
+    assert await scanner.scan_once(now=now + timedelta(minutes=2)) == 0
+
+    async with test_db() as session:
+        from app.repository.task_repository import TaskRepository
+        from app.core.constants import TaskStatusEnum
+        await TaskRepository(session).update(ids[1], status=TaskStatusEnum.COMPLETED)
+
+    assert await scanner.fire_due(now=now + timedelta(minutes=25)) == 2
+    assert [(e.kind, e.task_id) for e in events] == [("overdue", ids[0])]
+
+
+@pytest.mark.asyncio
+async def test_scanner_single_leader_and_takeover(test_db, test_user):
+    """Test that only the lease holder scans and a successor reloads its wheel."""
+    now = datetime(2030, 1, 1, 12, 0, 0)
+    first_events, second_events = [], []
+    first = _scanner(test_db, first_events)
+    second = _scanner(test_db, second_events)
+
+    await first.scan_once(now=now)
+    ids = await _seed_tasks(test_db, test_user.id, [now + timedelta(minutes=10)])
+    assert await first.scan_once(now=now + timedelta(minutes=1)) == 1
+    assert await second.scan_once(now=now + timedelta(minutes=1)) == 0
+    assert first.is_leader and not second.is_leader
+
+    await first.stop()
+    await second.scan_once(now=now + timedelta(minutes=2))
+    assert second.is_leader
+    assert ids[0] in second.wheel
+    assert second_events == []
+
+    await second.fire_due(now=now + timedelta(minutes=11))
+    assert [(e.kind, e.task_id) for e in second_events] == [("overdue", ids[0])]
+
+
+@pytest.mark.asyncio
+async def test_scanner_announces_tasks_added_behind_earlier_ones(test_db, test_user):
+    """Test that a task created after a pass, due before already announced ones, is announced."""
+    now = datetime(2030, 1, 1, 12, 0, 0)
+    events = []
+    scanner = _scanner(test_db, events)
+    await scanner.scan_once(now=now)
+
+    later = await _seed_tasks(test_db, test_user.id, [now + timedelta(minutes=50)])
+    assert await scanner.scan_once(now=now + timedelta(minutes=1)) == 1
+
+    sooner = await _seed_tasks(test_db, test_user.id, [now + timedelta(minutes=10)])
+    past_due = await _seed_tasks(test_db, test_user.id, [now + timedelta(minutes=1, seconds=30)])
+    events.clear()
+    assert await scanner.scan_once(now=now + timedelta(minutes=2)) == 2
+    assert [(e.kind, e.task_id) for e in events] == [("overdue", past_due[0]), ("due_soon", sooner[0])]
+    assert later[0] in scanner.wheel and sooner[0] in scanner.wheel
+
+
+@pytest.mark.asyncio
+async def test_scanner_stops_emitting_once_lease_lapses(test_db, test_user):
+    """Test that the wheel goes quiet when the lease was not renewed in time."""
+    from app.services.deadline_scanner import DeadlineScanner
+
+    now = datetime(2030, 1, 1, 12, 0, 0)
+    events = []
+
+    async def notifier(batch):
+        events.extend(batch)
+
+    settings = Settings(deadline_scan_interval_seconds=60, deadline_lease_seconds=180)
+    scanner = DeadlineScanner(session_factory=test_db, notifier=notifier, settings=settings)
+    await scanner.scan_once(now=now)
+    await _seed_tasks(test_db, test_user.id, [now + timedelta(minutes=2)])
+    await scanner.scan_once(now=now + timedelta(minutes=1))
+    events.clear()
+
+    # The scan loop stalled: the lease taken at minute 1 expired at minute 4
+    assert await scanner.fire_due(now=now + timedelta(minutes=4)) == 0
+    assert events == []
+    assert not scanner.is_leader
+
+
+def test_settings_reject_scan_interval_outliving_lease():
+    """Test that the lease must outlast the interval between renewals."""
+    from pydantic import ValidationError
+
+    with pytest.raises(ValidationError):
+        Settings(deadline_scan_interval_seconds=300, deadline_lease_seconds=180)
+
+
+@pytest.mark.asyncio
+async def test_scanner_skips_tasks_due_behind_previous_pass(test_db, test_user):
+    """Test the documented gap: a task added with a due date behind the last pass is not announced."""
+    now = datetime(2030, 1, 1, 12, 0, 0)
+    events = []
+    scanner = _scanner(test_db, events)
+    assert await scanner.scan_once(now=now) == 0
+
+    await _seed_tasks(test_db, test_user.id, [now - timedelta(minutes=5)])
+
+    assert await scanner.scan_once(now=now + timedelta(minutes=1)) == 0
+    assert events == []
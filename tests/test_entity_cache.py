@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from app.core import query_stats
+from app.core.cache import TTLCache
+from app.core.entity_cache import EntityCache, MemorySharedCache, ENTITY_CACHE_LOOKUPS
+from app.repository.user_repository import UserRepository
+
+
+def lookups(result: str) -> float:
+    return ENTITY_CACHE_LOOKUPS.get(("things", result))
+
+
+@pytest.mark.asyncio
+async def test_entity_cache_tiers_and_singleflight():
+    """Concurrent misses share one load; the shared tier refills a cold worker; writes invalidate both tiers."""
+    loads = []
+    release = asyncio.Event()
+
+    async def load(ids):
+        loads.append(list(ids))
+        await release.wait()
+        return {entity_id: {"id": entity_id, "name": f"thing {entity_id}"} for entity_id in ids if entity_id != 404}
+
+    shared = MemorySharedCache()
+    cache = EntityCache("things", local=TTLCache(ttl_seconds=60), shared=shared)
+    before = {result: lookups(result) for result in ("local_hit", "shared_hit", "coalesced", "miss")}
+
+    first = asyncio.create_task(cache.get_many([1, 2, 404], load))
+    second = asyncio.create_task(cache.get_many([2, 1], load))
+    await asyncio.sleep(0)
+    release.set()
+    assert await first == {1: {"id": 1, "name": "thing 1"}, 2: {"id": 2, "name": "thing 2"}, 404: None}
+    assert await second == {2: {"id": 2, "name": "thing 2"}, 1: {"id": 1, "name": "thing 1"}}
+    assert loads == [[1, 2, 404]]
+
+    assert (await cache.get_many([1], load))[1]["name"] == "thing 1"
+    # Another worker: nothing local, but the shared tier has it
+    cold = EntityCache("things", local=TTLCache(ttl_seconds=60), shared=shared)
+    assert (await cold.get_many([2], load))[2]["name"] == "thing 2"
+    assert loads == [[1, 2, 404]]
+
+    await cache.invalidate([2])
+    assert (await cold.get_many([2], load))[2] is not None  # its own local tier, until the TTL
+    await cache.get_many([2], load)
+    assert loads == [[1, 2, 404], [2]]
+
+    after = {result: lookups(result) - before[result] for result in before}
+    assert after == {"local_hit": 2, "shared_hit": 1, "coalesced": 2, "miss": 4}
+
+
+@pytest.mark.asyncio
+async def test_users_are_cached_across_sessions(test_db, test_user):
+    """Test that a user loaded by one request is served to the next without a query, until it is written."""
+    async with test_db() as session:
+        assert (await UserRepository(session).get_by_id(test_user.id)).username == test_user.username
+
+    async with test_db() as session:
+        with query_stats.track_queries() as stats:
+            user = await UserRepository(session).get_by_id(test_user.id)
+        assert stats.count == 0
+        assert user in session
+        await UserRepository(session).update(test_user.id, full_name="Renamed")
+
+    async with test_db() as session:
+        with query_stats.track_queries() as stats:
+            user = await UserRepository(session).get_by_id(test_user.id)
+        assert (stats.count, user.full_name) == (1, "Renamed")
+
+        await UserRepository(session).delete(test_user.id)
+    async with test_db() as session:
+        assert await UserRepository(session).get_by_id(test_user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_authentication_bypasses_cached_users(client, test_db, test_user, test_token):
+    """Test that cached users hold no password hash, and a user deactivated by another worker is refused at once."""
+    from sqlalchemy import update
+    from app.core.entity_cache import user_cache
+    from app.models.user import User
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 200
+    async with test_db() as session:
+        await UserRepository(session).get_by_id(test_user.id)
+        assert "hashed_password" not in user_cache.local.get(test_user.id)
+        # Loaded by the first query that selects the whole row
+        assert (await UserRepository(session).get_by_email(test_user.email)).hashed_password
+
+        # Another worker's write: this worker's cache is not invalidated
+        await session.execute(update(User).where(User.id == test_user.id).values(is_active=False))
+        await session.commit()
+    assert (await client.get("/api/v1/users/me", headers=headers)).status_code == 401
@@ -18,4 +18,71 @@ async def test_root_endpoint(client:AsyncClient):
     assert response.status_code == 200
     data = response.json()
     assert "app" in data
-    assert "version" in data
\ No newline at end of file
+    assert "version" in data
+
+@pytest.fixture(autouse=True)
+def fresh_readiness_probe():
+    from app.core.health import readiness_probe
+    readiness_probe.clear()
+    yield
+    readiness_probe.clear()
+
+
+@pytest.mark.asyncio
+async def test_liveness(client:AsyncClient):
+    """Test that liveness answers without checking dependencies."""
+    response = await client.get("/api/v1/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_is_cached(client:AsyncClient):
+    """Test that readiness pings the database and serves the cached report to later probes."""
+    response = await client.get("/api/v1/health/ready")
+    assert response.status_code == 200
+    report = response.json()
+    assert report["status"] == "ready"
+    assert report["database_ok"] is True
+    assert report["event_loop_lag_ms"] >= 0
+
+    response = await client.get("/api/v1/health/ready")
+    assert response.json()["checked_at"] == report["checked_at"]
+
+
+@pytest.mark.asyncio
+async def test_readiness_fails_on_exhausted_pool(tmp_path, monkeypatch):
+    """Test that a worker whose pool is used up reports not ready within the ping timeout."""
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from app.core.config import get_settings
+    from app.core.health import readiness_probe
+
+    monkeypatch.setattr(get_settings(), "readiness_db_timeout_seconds", 0.2)
+    monkeypatch.setattr(get_settings(), "database_max_overflow", 0)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/ready.db",
+        poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=get_settings().database_max_overflow
+    )
+    try:
+        async with engine.connect():
+            async with async_sessionmaker(engine, class_=AsyncSession)() as session:
+                report = await readiness_probe.check(session)
+    finally:
+        await engine.dispose()
+
+    assert not report.ready
+    assert report.pool_saturation == 1.0
+    assert report.database_error == "no answer within 0.2s"
+
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_sees_blocking_callbacks():
+    """Test that lag counts a callback blocking the loop while the probe sleeps."""
+    import asyncio
+    import time
+    from app.core.health import event_loop_lag
+
+    loop = asyncio.get_running_loop()
+    loop.call_later(0.005, time.sleep, 0.1)
+    assert await event_loop_lag(0.01) >= 0.09
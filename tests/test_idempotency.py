@@ -0,0 +1,150 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, func
+
+from app.core.idempotency import idempotency_cache, request_fingerprint, _utcnow
+from app.models.idempotency_key import IdempotencyKey
+from app.models.project import Project
+from app.repository.idempotency_repository import IdempotencyRepository
+
+
+@pytest.fixture(autouse=True)
+def empty_idempotency_cache():
+    idempotency_cache.clear()
+    yield
+    idempotency_cache.clear()
+
+
+async def _project_count(test_db) -> int:
+    async with test_db() as session:
+        return (await session.execute(select(func.count(Project.id)))).scalar_one()
+
+
+def _create_project(client: AsyncClient, token: str, key: str, name: str = "Retried"):
+    return client.post(
+        "/api/v1/projects",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": key},
+        json={"name": name, "description": "Created once"}
+    )
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_stored_response(client: AsyncClient, test_token, test_db):
+    """A retry with the same key gets the first response back, from the table once the cache is gone."""
+    first = await _create_project(client, test_token, "key-1")
+    idempotency_cache.clear()
+    retry = await _create_project(client, test_token, "key-1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert await _project_count(test_db) == 1
+
+    other = await _create_project(client, test_token, "key-2")
+    assert other.status_code == 201
+    assert other.json()["id"] != first.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_replay_gets_cors_headers_for_its_own_origin(client: AsyncClient, test_token, test_db):
+    """A replayed response carries the CORS headers of the retry, not of the request that was stored."""
+    headers = {"Authorization": f"Bearer {test_token}", "Idempotency-Key": "key-1"}
+    body = {"name": "Retried", "description": "Created once"}
+    first = await client.post("/api/v1/projects", headers=headers, json=body)
+    assert "access-control-allow-origin" not in first.headers
+
+    retry = await client.post(
+        "/api/v1/projects", headers={**headers, "Origin": "http://localhost:3000"}, json=body
+    )
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert retry.headers["access-control-allow-credentials"] == "true"
+    assert await _project_count(test_db) == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_another_request_is_rejected(client: AsyncClient, test_token, test_db):
+    assert (await _create_project(client, test_token, "key-1", name="First")).status_code == 201
+    response = await _create_project(client, test_token, "key-1", name="Second")
+    assert response.status_code == 422
+    assert await _project_count(test_db) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_run_once(client: AsyncClient, test_token, test_db):
+    responses = await asyncio.gather(*(_create_project(client, test_token, "key-1") for _ in range(5)))
+
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert sum(response.headers.get("idempotent-replayed") == "true" for response in responses) == 4
+    assert await _project_count(test_db) == 1
+
+
+@pytest.mark.asyncio
+async def test_waits_for_request_processing_on_another_worker(client: AsyncClient, test_token, test_user, test_db, monkeypatch):
+    """A key claimed elsewhere is waited for, then replayed; past the wait, 409."""
+    from app.core.config import get_settings
+    monkeypatch.setattr(get_settings(), "idempotency_wait_seconds", 0.3)
+
+    body = b'{"name":"Elsewhere","description":"Created once"}'
+    fingerprint = request_fingerprint({"method": "POST", "path": "/api/v1/projects", "query_string": b""}, body)
+    now = _utcnow()
+    async with test_db() as session:
+        record = await IdempotencyRepository(session).claim(
+            str(test_user.id), "key-1", fingerprint, now + timedelta(seconds=60), now + timedelta(days=1)
+        )
+    headers = {"Authorization": f"Bearer {test_token}", "Idempotency-Key": "key-1", "Content-Type": "application/json"}
+
+    response = await client.post("/api/v1/projects", headers=headers, content=body)
+    assert response.status_code == 409
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.15)
+        async with test_db() as session:
+            await IdempotencyRepository(session).complete(
+                record.id, 201, [["content-type", "application/json"]], b'{"id":42}'
+            )
+
+    response, _ = await asyncio.gather(client.post("/api/v1/projects", headers=headers, content=body), finish_elsewhere())
+    assert response.status_code == 201
+    assert response.json() == {"id": 42}
+    assert await _project_count(test_db) == 0
+
+
+@pytest.mark.asyncio
+async def test_lapsed_and_expired_keys_are_taken_over(client: AsyncClient, test_token, test_user, test_db):
+    now = _utcnow()
+    async with test_db() as session:
+        repo = IdempotencyRepository(session)
+        # A worker died processing key-1; key-2 ran long ago
+        await repo.claim(str(test_user.id), "key-1", "lost", now - timedelta(seconds=1), now + timedelta(days=1))
+        stale = await repo.claim(str(test_user.id), "key-2", "old", now - timedelta(days=2), now - timedelta(days=1))
+        await repo.complete(stale.id, 201, [], b"{}")
+
+    assert (await _create_project(client, test_token, "key-1")).status_code == 201
+    assert (await _create_project(client, test_token, "key-2", name="Again")).status_code == 201
+    assert await _project_count(test_db) == 2
+
+    async with test_db() as session:
+        purged = await IdempotencyRepository(session).purge_expired(now + timedelta(days=2), 100)
+        remaining = (await session.execute(select(func.count(IdempotencyKey.id)))).scalar_one()
+    assert purged == 2
+    assert remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_without_key_are_untouched(client: AsyncClient, test_token, test_db):
+    for _ in range(2):
+        response = await client.post(
+            "/api/v1/projects",
+            headers={"Authorization": f"Bearer {test_token}"},
+            json={"name": "Twice", "description": "No key"}
+        )
+        assert response.status_code == 201
+    assert await _project_count(test_db) == 2
+    async with test_db() as session:
+        assert (await session.execute(select(func.count(IdempotencyKey.id)))).scalar_one() == 0
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import Settings
+from app.core.constants import JobStatusEnum
+
+
+async def _enqueue(test_db, kind, payload=None, max_attempts=3, created_by=None):
+    from app.repository.job_repository import JobRepository
+
+    async with test_db() as session:
+        return await JobRepository(session).enqueue(
+            kind=kind,
+            payload=payload or {},
+            max_attempts=max_attempts,
+            run_after=datetime.utcnow(),
+            created_by=created_by
+        )
+
+
+async def _get_job(test_db, job_id):
+    from app.repository.job_repository import JobRepository
+
+    async with test_db() as session:
+        return await JobRepository(session).get_by_id(job_id)
+
+
+@pytest.mark.asyncio
+async def test_job_retries_with_backoff_then_fails(test_db):
+    """Test that a failing job is retried after a backoff until its attempts run out."""
+    from app.services.job_worker import JobWorkerPool
+
+    calls = []
+
+    async def flaky(job):
+        calls.append(job.attempt)
+        raise RuntimeError("boom")
+
+    settings = Settings(job_retry_base_seconds=60, job_retry_max_seconds=600)
+    pool = JobWorkerPool(session_factory=test_db, settings=settings, handlers={"flaky": flaky})
+    job = await _enqueue(test_db, "flaky", max_attempts=2)
+
+    assert await pool.run_once()
+    job = await _get_job(test_db, job.id)
+    assert job.status == JobStatusEnum.QUEUED
+    assert job.attempts == 1
+    assert job.error == "RuntimeError: boom"
+    assert job.run_after >= datetime.utcnow() + timedelta(seconds=29)
+
+    # Not due again until the backoff passes
+    assert not await pool.run_once()
+
+    async with test_db() as session:
+        job = await session.get(type(job), job.id)
+        job.run_after = datetime.utcnow()
+        await session.commit()
+    assert await pool.run_once()
+    job = await _get_job(test_db, job.id)
+    assert job.status == JobStatusEnum.FAILED
+    assert job.locked_by is None
+    assert calls == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_job_with_lapsed_lock_is_claimed_again(test_db):
+    """Test that a job whose worker died is picked up once its lock lapses."""
+    from app.repository.job_repository import JobRepository
+    from app.services.job_worker import JobWorkerPool
+
+    async def ok(job):
+        return {"attempt": job.attempt}
+
+    job = await _enqueue(test_db, "ok")
+    async with test_db() as session:
+        claimed = await JobRepository(session).claim("dead-worker", now=datetime.utcnow(), lease=timedelta(seconds=-1))
+    assert claimed.id == job.id
+
+    pool = JobWorkerPool(session_factory=test_db, handlers={"ok": ok})
+    assert await pool.run_once()
+    job = await _get_job(test_db, job.id)
+    assert job.status == JobStatusEnum.SUCCEEDED
+    assert job.result == {"attempt": 2}
+
+
+@pytest.mark.asyncio
+async def test_lapsed_job_out_of_attempts_fails(test_db):
+    """Test that a job whose worker died on its last attempt is failed, not claimed again."""
+    from app.repository.job_repository import JobRepository
+
+    job = await _enqueue(test_db, "ok", max_attempts=1)
+    async with test_db() as session:
+        claimed = await JobRepository(session).claim("dead-worker", now=datetime.utcnow(), lease=timedelta(seconds=-1))
+    assert claimed.id == job.id
+
+    async with test_db() as session:
+        assert await JobRepository(session).claim("worker", now=datetime.utcnow(), lease=timedelta(seconds=60)) is None
+    job = await _get_job(test_db, job.id)
+    assert job.status == JobStatusEnum.FAILED
+    assert job.error == "Worker lost while running the last attempt"
+    assert (job.attempts, job.locked_by) == (1, None)
+
+
+@pytest.mark.asyncio
+async def test_handler_cancelled_when_lock_is_lost(test_db):
+    """Test that a worker stops running a job once another worker has taken it over."""
+    import asyncio
+    from app.models.job import Job
+    from app.services.job_worker import JobWorkerPool
+
+    cancelled = asyncio.Event()
+
+    async def slow(job):
+        async with job.session_factory() as session:
+            (await session.get(Job, job.job_id)).locked_by = "other-worker"
+            await session.commit()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    settings = Settings(job_lease_seconds=1)
+    pool = JobWorkerPool(session_factory=test_db, settings=settings, handlers={"slow": slow})
+    job = await _enqueue(test_db, "slow")
+
+    assert await asyncio.wait_for(pool.run_once(), timeout=5)
+    assert cancelled.is_set()
+    job = await _get_job(test_db, job.id)
+    assert (job.status, job.locked_by) == (JobStatusEnum.RUNNING, "other-worker")
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_runs_as_job(client:AsyncClient, test_token, test_db, test_user):
+    """Test that bulk status changes are accepted with 202 and applied by a worker."""
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.services.job_worker import JobWorkerPool
+
+    async with test_db() as session:
+        project = Project(name="Bulk", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        session.add_all([Task(title=f"T{i}", project_id=project.id) for i in range(3)])
+        await session.commit()
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = await client.post(
+        f"/api/v1/projects/{project.id}/tasks/bulk-status",
+        headers=headers,
+        json={"from_status": "open", "to_status": "completed"}
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == "queued"
+
+    assert await JobWorkerPool(session_factory=test_db).run_once()
+    response = await client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"] == {"updated": 3}
+
+
+@pytest.mark.asyncio
+async def test_job_visible_to_creator_only(client:AsyncClient, test_token, test_db, test_admin_user):
+    """Test that jobs are only visible to whoever queued them and admins."""
+    from app.services.job_handlers import DELETE_PROJECT
+
+    job = await _enqueue(test_db, DELETE_PROJECT, {"project_id": 0}, created_by=test_admin_user.id)
+    response = await client.get(
+        f"/api/v1/jobs/{job.id}",
+        headers={"Authorization": f"Bearer {test_token}"}
+    )
+    assert response.status_code == 403
+
+    response = await client.get(
+        "/api/v1/jobs/999",
+        headers={"Authorization": f"Bearer {test_token}"}
+    )
+    assert response.status_code == 404
@@ -0,0 +1,89 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import MetricsRegistry, HTTP_REQUESTS, HTTP_LATENCY
+
+
+@pytest.mark.asyncio
+async def test_metrics_per_route(client:AsyncClient, test_token, test_user):
+    """Test that requests are recorded per route template and exposed at /metrics."""
+    labels = ("GET", "/api/v1/users/{user_id}", "200")
+    before = HTTP_REQUESTS.get(labels)
+    latency_before = HTTP_LATENCY.count(labels[:2])
+
+    response = await client.get(f"/api/v1/users/{test_user.id}", headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 200
+    await client.get("/no/such/path")
+
+    assert HTTP_REQUESTS.get(labels) == before + 1
+    assert HTTP_LATENCY.count(labels[:2]) == latency_before + 1
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/api/v1/users/{user_id}",status="200"}' in response.text
+    assert 'route="unmatched",status="404"' in response.text
+    assert "http_requests_in_progress" in response.text
+
+
+def test_metrics_text_format():
+    """Test the Prometheus text rendering of counters and cumulative histogram buckets."""
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+    histogram = registry.histogram("wait_seconds", "Wait.", buckets=(0.1, 1.0))
+    counter.inc(('say "hi"',), 2)
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs.",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="say \\"hi\\""} 2',
+        "# HELP wait_seconds Wait.",
+        "# TYPE wait_seconds histogram",
+        'wait_seconds_bucket{le="0.1"} 1',
+        'wait_seconds_bucket{le="1.0"} 3',
+        'wait_seconds_bucket{le="+Inf"} 4',
+        "wait_seconds_sum 4.05",
+        "wait_seconds_count 4",
+    ]
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Again.")
+
+
+
+@pytest.mark.asyncio
+async def test_query_accounting(test_db, monkeypatch):
+    """Test per-request query counts in debug headers and metrics, and budget overruns."""
+    from sqlalchemy import text
+    from fastapi import FastAPI
+    from app.core import query_stats
+
+    api = FastAPI()
+
+    @api.get("/two")
+    @query_stats.query_budget(1)
+    async def two_queries():
+        async with test_db() as session:
+            await session.execute(text("SELECT 1"))
+            await session.execute(text("SELECT 2"))
+        return "ok"
+
+    # Listen instead of the suite's budget plugin: this overrun is the point of the test
+    overruns = []
+    monkeypatch.setattr(query_stats, "budget_exceeded_listeners", [overruns.append])
+    exceeded_before = query_stats.DB_QUERY_BUDGET_EXCEEDED.get(("GET", "/two"))
+
+    app = query_stats.QueryAccountingMiddleware(api, debug_headers=True)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/two")
+
+    assert response.headers[query_stats.QUERY_COUNT_HEADER] == "2"
+    assert float(response.headers[query_stats.QUERY_TIME_HEADER]) > 0
+    assert query_stats.DB_QUERY_BUDGET_EXCEEDED.get(("GET", "/two")) == exceeded_before + 1
+    assert len(overruns) == 1 and "SELECT 2" in overruns[0]
+
+    with query_stats.track_queries() as stats:
+        async with test_db() as session:
+            await session.execute(text("SELECT 1"))
+    assert stats.count == 1
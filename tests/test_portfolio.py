@@ -0,0 +1,98 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_rollups_follow_task_writes(client:AsyncClient, test_token, admin_token, test_user):
+    """Test that task writes keep the owner portfolio rollups up to date."""
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = await client.post("/api/v1/projects", headers=headers, json={"name": "Portfolio"})
+    project_id = response.json()["id"]
+
+    task_ids = []
+    for priority in ("high", "high", "low"):
+        response = await client.post(
+            f"/api/v1/projects/{project_id}/tasks", headers=headers, json={"title": "T", "priority": priority}
+        )
+        task_ids.append(response.json()["id"])
+
+    await client.put(
+        f"/api/v1/projects/{project_id}/tasks/{task_ids[0]}", headers=headers, json={"status": "completed"}
+    )
+    await client.delete(f"/api/v1/projects/{project_id}/tasks/{task_ids[2]}", headers=headers)
+
+    response = await client.get(
+        f"/api/v1/portfolio/owners/{test_user.id}", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    portfolio = response.json()
+    assert portfolio["total"] == 2
+    assert portfolio["by_status"]["completed"] == 1
+    assert portfolio["by_status"]["open"] == 1
+    assert portfolio["by_priority"] == {"low": 0, "medium": 0, "high": 2, "critical": 0}
+    assert portfolio["projects"][0]["project_id"] == project_id
+
+    response = await client.get("/api/v1/portfolio/owners", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.json()["total"] == 1
+    assert response.json()["items"][0]["owner_id"] == test_user.id
+
+
+@pytest.mark.asyncio
+async def test_portfolio_admin_only(client:AsyncClient, test_token, test_user):
+    """Test that regular users cannot read portfolio reports."""
+    response = await client.get(
+        f"/api/v1/portfolio/owners/{test_user.id}", headers={"Authorization": f"Bearer {test_token}"}
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rollups(test_db, test_user):
+    """Test rebuilding rollups from tasks written outside the repository."""
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.core.constants import TaskStatusEnum
+    from app.repository.task_rollup_repository import TaskRollupRepository
+    from app.services.portfolio_service import PortfolioService
+
+    async with test_db() as session:
+        project = Project(name="Imported", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        session.add_all([
+            Task(title="A", project_id=project.id),
+            Task(title="B", project_id=project.id, status=TaskStatusEnum.BLOCKED),
+        ])
+        await session.commit()
+
+        assert (await PortfolioService(session).get_owner_portfolio(test_user.id)).total == 0
+        assert await TaskRollupRepository(session).rebuild() == 2
+
+        portfolio = await PortfolioService(session).get_owner_portfolio(test_user.id)
+        assert portfolio.total == 2
+        assert portfolio.by_status[TaskStatusEnum.BLOCKED] == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_update_moves_rollups(test_db, test_user):
+    """Test that a bulk status change moves exactly the updated tasks between buckets."""
+    from app.models.project import Project
+    from app.core.constants import TaskStatusEnum, TaskPriorityEnum
+    from app.repository.task_repository import TaskRepository
+    from app.services.portfolio_service import PortfolioService
+
+    async with test_db() as session:
+        project = Project(name="Bulk", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        repo = TaskRepository(session)
+        for title, priority in (("A", TaskPriorityEnum.HIGH), ("B", TaskPriorityEnum.HIGH), ("C", TaskPriorityEnum.LOW)):
+            await repo.create(title=title, description=None, project_id=project.id, priority=priority)
+
+        moved = await repo.bulk_update_status(project.id, TaskStatusEnum.OPEN, TaskStatusEnum.COMPLETED)
+        assert moved == 3
+
+        portfolio = await PortfolioService(session).get_owner_portfolio(test_user.id)
+        assert portfolio.by_status[TaskStatusEnum.OPEN] == 0
+        assert portfolio.by_status[TaskStatusEnum.COMPLETED] == 3
+        assert portfolio.by_priority[TaskPriorityEnum.HIGH] == 2
@@ -0,0 +1,57 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_admin_requested_profile(test_db, test_token, admin_token, tmp_path, monkeypatch):
+    """Test that X-Profile with an admin token stores a profile that admins can list and download."""
+    from app.main import create_app
+    from app.core.config import get_settings
+    from app.core.database import get_session
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_max_files", 2)
+
+    app = create_app()
+
+    async def override_get_session():
+        async with test_db() as session:
+            yield session
+    app.dependency_overrides[get_session] = override_get_session
+
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        # Not an admin: served without profiling
+        response = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {test_token}", "X-Profile": "1"})
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+        profile_ids = []
+        for _ in range(3):
+            response = await client.get("/api/v1/users/me", headers={**admin, "X-Profile": "1"})
+            profile_ids.append(response.headers["x-profile-id"])
+
+        response = await client.get("/api/v1/admin/profiles", headers=admin)
+        listed = response.json()
+        # Bounded: only the newest two are kept
+        assert [p["profile_id"] for p in listed] == profile_ids[:0:-1]
+        assert listed[0]["method"] == "GET" and listed[0]["route"] == "api_v1_users_me"
+
+        response = await client.get(f"/api/v1/admin/profiles/{listed[0]['profile_id']}", headers=admin)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/html")
+
+        response = await client.get("/api/v1/admin/profiles/..%2F..%2Fetc%2Fpasswd", headers=admin)
+        assert response.status_code == 404
+        response = await client.get("/api/v1/admin/profiles", headers={"Authorization": f"Bearer {test_token}"})
+        assert response.status_code == 403
+
+
+def test_profiling_middleware_not_installed_when_off():
+    """Test that profiling adds nothing to the middleware stack unless enabled."""
+    from app.main import create_app
+    from app.core.profiling import ProfilingMiddleware
+
+    assert all(m.cls is not ProfilingMiddleware for m in create_app().user_middleware)
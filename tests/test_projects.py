@@ -119,12 +119,16 @@ async def test_update_project(client:AsyncClient, test_token, test_db, test_user
 
 
 @pytest.mark.asyncio
-async def test_delete_project(client:AsyncClient, test_token, test_db, test_user):
-    """Test deleting a project."""
-    # Create project
-    async with test_db() as session:
-        from app.models.project import Project
+async def test_delete_project(client:AsyncClient, test_token, test_db, test_user, monkeypatch):
+    """Test that a deleted project disappears at once and is purged in batches by a job."""
+    from sqlalchemy import select, func
+    from app.core.config import get_settings
+    from app.models.project import Project
+    from app.models.project_member import ProjectMember
+    from app.models.task import Task
+    from app.services.job_worker import JobWorkerPool
 
+    async with test_db() as session:
         project = Project(
             name="To Delete",
             owner_id=test_user.id
@@ -133,9 +137,211 @@ async def test_delete_project(client:AsyncClient, test_token, test_db, test_user
         await session.commit()
         await session.refresh(project)
         project_id = project.id
+        session.add_all([Task(title=f"T{i}", project_id=project_id) for i in range(5)])
+        session.add(ProjectMember(project_id=project_id, user_id=test_user.id))
+        await session.commit()
 
-    response = await client.delete(
-        f"/api/v1/projects/{project_id}",
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = await client.delete(f"/api/v1/projects/{project_id}", headers=headers)
+    assert  response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.headers["Location"] == f"/api/v1/jobs/{job_id}"
+
+    # Hidden before the job even ran
+    response = await client.get("/api/v1/projects", headers=headers)
+    assert response.json()["total"] == 0
+    response = await client.delete(f"/api/v1/projects/{project_id}", headers=headers)
+    assert response.status_code == 404
+
+    monkeypatch.setattr(get_settings(), "project_delete_batch_size", 2)
+    assert await JobWorkerPool(session_factory=test_db).run_once()
+
+    response = await client.get(f"/api/v1/jobs/{job_id}", headers=headers)
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["progress"] == {"deleted_tasks": 5, "total_tasks": 5}
+    assert response.json()["result"] == {"deleted": True, "deleted_tasks": 5}
+
+    async with test_db() as session:
+        for model in (Project, Task, ProjectMember):
+            assert (await session.execute(select(func.count()).select_from(model))).scalar() == 0
+
+
+
+@pytest.mark.asyncio
+async def test_get_project_stats(client:AsyncClient, test_token, test_db, test_user):
+    """Test project dashboard aggregates and their invalidation on task writes."""
+    from datetime import datetime, timedelta
+    from app.core.cache import project_stats_cache
+    from app.core.constants import TaskPriorityEnum, TaskStatusEnum
+
+    async with test_db() as session:
+        from app.models.project import Project
+        from app.models.task import Task
+
+        project = Project(name="Dashboard", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+
+        session.add_all([
+            Task(title="Mine", project_id=project.id, assignee_id=test_user.id,
+                 priority=TaskPriorityEnum.HIGH, due_date=datetime.utcnow() - timedelta(days=1)),
+            Task(title="Mine too", project_id=project.id, assignee_id=test_user.id),
+            Task(title="Done", project_id=project.id, status=TaskStatusEnum.COMPLETED,
+                 due_date=datetime.utcnow() - timedelta(days=1)),
+        ])
+        await session.commit()
+        project_id = project.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = await client.get(f"/api/v1/projects/{project_id}/stats", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["total"] == 3
+    assert stats["overdue"] == 1
+    assert stats["by_status"]["open"] == 2
+    assert stats["by_status"]["completed"] == 1
+    assert stats["by_priority"]["high"] == 1
+    assert stats["assignee_load"] == [{"assignee_id": test_user.id, "open_tasks": 2}]
+    assert project_stats_cache.get(project_id) is not None
+
+    response = await client.post(
+        f"/api/v1/projects/{project_id}/tasks", headers=headers, json={"title": "New"}
+    )
+    assert response.status_code == 201
+    assert project_stats_cache.get(project_id) is None
+
+    response = await client.get(f"/api/v1/projects/{project_id}/stats", headers=headers)
+    assert response.json()["total"] == 4
+
+
+def test_stats_cache_drops_results_computed_before_invalidation():
+    """Test that a value computed before a concurrent invalidation is not cached."""
+    from app.core.cache import TTLCache
+
+    cache = TTLCache(ttl_seconds=60, maxsize=2)
+    token = cache.token()
+    cache.invalidate(1)  # a write commits while the reader is querying
+    cache.set(1, "stale", token=token)
+    assert cache.get(1) is None
+
+    cache.set(1, "fresh", token=cache.token())
+    assert cache.get(1) == "fresh"
+
+    # Once a key's invalidation falls out of the bounded history, older tokens are refused
+    token = cache.token()
+    for key in (1, 2, 3):
+        cache.invalidate(key)
+    cache.set(1, "stale", token=token)
+    assert cache.get(1) is None
+
+
+
+@pytest.mark.asyncio
+async def test_project_stats_query_plan(query_plan):
+    """Test that the dashboard aggregate is one index search over the project's tasks."""
+    from datetime import datetime
+    from app.repository.task_repository import TaskRepository
+
+    stmt = TaskRepository(session=None).build_project_aggregates_query(1, datetime.utcnow())
+    plan = await query_plan(stmt)
+    assert plan[0].startswith("SEARCH tasks USING INDEX ix_task_project_"), plan
+    assert "(project_id=?)" in plan[0]
+    assert not any(step.startswith("SCAN tasks") for step in plan), plan
+
+
+
+@pytest.mark.asyncio
+async def test_project_includes(client:AsyncClient, test_token, test_db, test_user, test_admin_user, monkeypatch):
+    """Test embedding owner, members and newest tasks, capped per project, at a fixed query cost."""
+    from datetime import datetime, timedelta
+    from app.core.config import get_settings
+    from app.models.project import Project
+    from app.models.project_member import ProjectMember
+    from app.models.task import Task
+
+    monkeypatch.setattr(get_settings(), "include_tasks_limit", 2)
+    started = datetime(2026, 1, 1)
+    async with test_db() as session:
+        projects = [Project(name=f"Project {i}", owner_id=test_user.id) for i in range(3)]
+        session.add_all(projects)
+        await session.flush()
+        for project in projects:
+            session.add(ProjectMember(project_id=project.id, user_id=test_admin_user.id, role="viewer"))
+            session.add_all(
+                Task(title=f"{project.name} task {i}", project_id=project.id, created_at=started + timedelta(minutes=i))
+                for i in range(4)
+            )
+        await session.commit()
+        project_id = projects[0].id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = await client.get(f"/api/v1/projects/{project_id}?include=tasks,owner,members&fields=name", headers=headers)
+    assert response.status_code == 200
+    project = response.json()
+    assert project["name"] == "Project 0"
+    assert "status" not in project
+    assert project["owner"] == {"id": test_user.id, "username": test_user.username, "full_name": test_user.full_name}
+    assert [(m["user_id"], m["role"]) for m in project["members"]] == [(test_admin_user.id, "viewer")]
+    assert [t["title"] for t in project["tasks"]] == ["Project 0 task 3", "Project 0 task 2"]
+
+    response = await client.get("/api/v1/projects?include=tasks,members", headers=headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [p["name"] for p in items] == ["Project 0", "Project 1", "Project 2"]
+    for item in items:
+        assert "owner" not in item
+        assert [t["title"] for t in item["tasks"]] == [f"{item['name']} task 3", f"{item['name']} task 2"]
+        assert len(item["members"]) == 1
+
+    plain = await client.get(f"/api/v1/projects/{project_id}", headers=headers)
+    assert not {"owner", "members", "tasks"} & set(plain.json())
+
+    unknown = await client.get(f"/api/v1/projects/{project_id}?include=comments", headers=headers)
+    assert unknown.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_projects_by_ids(client:AsyncClient, test_token, test_db, test_user, test_admin_user):
+    """Test multi-get: owned and member projects in request order, others left out, includes applied."""
+    from app.models.project import Project
+    from app.models.project_member import ProjectMember
+
+    async with test_db() as session:
+        owned = Project(name="Owned", owner_id=test_user.id)
+        shared = Project(name="Shared", owner_id=test_admin_user.id)
+        private = Project(name="Private", owner_id=test_admin_user.id)
+        session.add_all([owned, shared, private])
+        await session.flush()
+        session.add(ProjectMember(project_id=shared.id, user_id=test_user.id, role="viewer"))
+        await session.commit()
+        ids = f"{shared.id},{private.id},{owned.id}"
+
+    response = await client.get(
+        f"/api/v1/projects?ids={ids}&include=owner&fields=name",
         headers={"Authorization": f"Bearer {test_token}"}
     )
-    assert  response.status_code == 204
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [(p["name"], p["owner"]["username"]) for p in items] == [("Shared", "admin"), ("Owned", "testuser")]
+
+
+@pytest.mark.asyncio
+async def test_update_project_compare_and_set(client:AsyncClient, test_token, admin_token, test_user):
+    """Test that a stale version gets 409 and that admins update through the same guarded statement."""
+    headers = {"Authorization": f"Bearer {test_token}"}
+    project = (await client.post("/api/v1/projects", headers=headers, json={"name": "Versioned"})).json()
+    assert project["version"] == 1
+    url = f"/api/v1/projects/{project['id']}"
+
+    renamed = await client.put(url, headers={**headers, "If-Match": '"1"'}, json={"name": "Renamed"})
+    assert (renamed.status_code, renamed.headers["etag"]) == (200, '"2"')
+
+    stale = await client.put(url, headers=headers, json={"name": "Lost update", "version": 1})
+    assert (stale.status_code, stale.headers["etag"]) == (409, '"2"')
+
+    by_admin = await client.put(url, headers={"Authorization": f"Bearer {admin_token}", "If-Match": 'W/"2"'}, json={"status": "active"})
+    assert by_admin.status_code == 200
+    assert (by_admin.json()["name"], by_admin.json()["version"]) == ("Renamed", 3)
+
+    missing = await client.put("/api/v1/projects/999999", headers=headers, json={"name": "x", "version": 1})
+    assert missing.status_code == 404
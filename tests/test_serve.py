@@ -0,0 +1,53 @@
+import signal
+
+import pytest
+import uvicorn
+from httpx import AsyncClient
+
+from app.commands.serve import DrainingServer, RestartBudget, worker_pool_sizes
+
+
+def test_worker_pool_sizes_split_the_budget():
+    """Test that all workers' pools together stay within the connection budget."""
+    # No budget: the configured sizes
+    assert worker_pool_sizes(0, 4, 20, 10) == (20, 10)
+    # 90 connections for 4 workers: 22 each, 20 pooled and 2 overflow
+    assert worker_pool_sizes(90, 4, 20, 10) == (20, 2)
+    # Tight budget: pools shrink and overflow goes first
+    assert worker_pool_sizes(40, 8, 20, 10) == (5, 0)
+    with pytest.raises(ValueError):
+        worker_pool_sizes(3, 4, 20, 10)
+
+
+def test_restart_budget_caps_restarts_per_window():
+    """Test that restarts beyond the cap within the window are refused, and allowed again once it slides."""
+    budget = RestartBudget(max_restarts=2, window_seconds=60)
+    assert budget.allow(0)
+    assert budget.allow(10)
+    assert not budget.allow(20)
+    # The first restart left the window
+    assert budget.allow(61)
+    assert not budget.allow(65)
+
+
+@pytest.mark.asyncio
+async def test_draining_server_reports_not_ready_before_exiting(client: AsyncClient):
+    """Test that the first SIGTERM starts a drain during which readiness answers 503."""
+    from app.core.health import readiness_probe
+
+    readiness_probe.clear()
+    server = DrainingServer(uvicorn.Config(app=None), drain_seconds=30)
+    try:
+        server.handle_exit(signal.SIGTERM, None)
+        assert not server.should_exit
+        assert not await server.on_tick(1)
+
+        response = await client.get("/api/v1/health/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "draining"
+
+        # A second signal skips the rest of the drain
+        server.handle_exit(signal.SIGTERM, None)
+        assert server.should_exit
+    finally:
+        readiness_probe.clear()
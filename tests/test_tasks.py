@@ -1,5 +1,10 @@
 from pickletools import read_stringnl_noescape_pair
 
+import io
+import json
+
+from datetime import datetime
+
 import pytest
 from httpx import AsyncClient
 
@@ -187,3 +192,406 @@ async def test_delete_task(client:AsyncClient, test_token, test_db, test_user):
         }
     )
     assert response.status_code == 204
+
+
+
+@pytest.mark.asyncio
+async def test_list_project_tasks_filters(client:AsyncClient, test_token, test_db, test_user):
+    """Test filtering and sorting tasks by priority, assignee and due date."""
+    from datetime import datetime, timedelta
+    from app.core.constants import TaskPriorityEnum, TaskStatusEnum
+
+    now = datetime.utcnow()
+    async with test_db() as session:
+        from app.models.project import Project
+        from app.models.task import Task
+
+        project = Project(name="Filter Project", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+
+        session.add_all([
+            Task(title="Late", project_id=project.id, priority=TaskPriorityEnum.HIGH,
+                 assignee_id=test_user.id, due_date=now - timedelta(days=2)),
+            Task(title="Late but done", project_id=project.id, status=TaskStatusEnum.COMPLETED,
+                 due_date=now - timedelta(days=1)),
+            Task(title="Upcoming", project_id=project.id, priority=TaskPriorityEnum.CRITICAL,
+                 due_date=now + timedelta(days=3)),
+        ])
+        await session.commit()
+        project_id = project.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks", headers=headers, params={"overdue": "true"}
+    )
+    assert response.status_code == 200
+    assert [t["title"] for t in response.json()["items"]] == ["Late"]
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks", headers=headers, params={"assignee_id": test_user.id}
+    )
+    assert response.json()["total"] == 1
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks",
+        headers=headers,
+        params={"due_after": (now - timedelta(days=3)).isoformat(), "sort": "-due_date"}
+    )
+    assert [t["title"] for t in response.json()["items"]] == ["Upcoming", "Late but done", "Late"]
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks", headers=headers, params={"priority": "critical"}
+    )
+    assert [t["title"] for t in response.json()["items"]] == ["Upcoming"]
+
+
+
+@pytest.mark.asyncio
+async def test_list_project_tasks_rejects_unindexed_filters(client:AsyncClient, test_token, test_db, test_user):
+    """Test that filter combinations without a covering index are rejected."""
+    async with test_db() as session:
+        from app.models.project import Project
+
+        project = Project(name="Filter Project", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        project_id = project.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    for params in (
+        {"due_after": "2024-01-01T00:00:00", "created_after": "2024-01-01T00:00:00"},
+        {"priority": "high", "assignee_id": 1},
+        {"sort": "priority"},
+        {"due_after": "2024-01-01T00:00:00", "sort": "-created_at"},
+        {"overdue": "true", "status": "completed"},
+    ):
+        response = await client.get(f"/api/v1/projects/{project_id}/tasks", headers=headers, params=params)
+        assert response.status_code == 400
+
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters, index", [
+    ({}, "ix_task_project_created_at"),
+    ({"status": "open"}, "ix_task_project_status_created"),
+    ({"priority": "high"}, "ix_task_project_priority_created"),
+    ({"assignee_id": 1}, "ix_task_project_assignee_created"),
+    ({"overdue": True}, "ix_task_project_due_date"),
+    ({"status": "open", "due_before": "2024-01-01T00:00:00"}, "ix_task_project_status_due"),
+    ({"status": "blocked", "sort": "-due_date"}, "ix_task_project_status_due"),
+    ({"updated_after": "2024-01-01T00:00:00"}, "ix_task_project_updated_at"),
+])
+async def test_task_filter_query_plan(query_plan, filters, index):
+    """Test that filters and sort are both served by the planned index, without a sort step."""
+    from app.repository.task_filters import compile_task_filter
+    from app.repository.task_repository import TaskRepository
+    from app.schemas import TaskFilter
+
+    task_filter = TaskFilter(**filters)
+    assert compile_task_filter(1, task_filter).index == index
+
+    plan = await query_plan(TaskRepository(session=None).build_project_tasks_query(1, task_filter))
+    assert plan[0].startswith(f"SEARCH tasks USING INDEX {index} "), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+
+@pytest.mark.asyncio
+async def test_upgrade_schema_adds_task_indexes(tmp_path):
+    """Test that the schema upgrade brings an old tasks table to the current indexes."""
+    from sqlalchemy import text, inspect
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.commands.upgrade_schema import upgrade_schema
+    from app.models.base import Base
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("DROP INDEX ix_task_project_status_created"))
+        await conn.execute(text("CREATE INDEX ix_task_project_status ON tasks (project_id, status)"))
+
+    executed = await upgrade_schema(engine)
+    assert any("ix_task_project_status_created" in statement for statement in executed)
+
+    async with engine.connect() as conn:
+        indexes = await conn.run_sync(lambda c: {i["name"] for i in inspect(c).get_indexes("tasks")})
+    await engine.dispose()
+    assert "ix_task_project_status_created" in indexes
+    assert "ix_task_project_status" not in indexes
+    assert await upgrade_schema(engine) == []
+
+
+
+@pytest.mark.asyncio
+async def test_task_sparse_fieldsets(client:AsyncClient, test_token, test_db, test_user):
+    """Test that ?fields= returns only the requested fields, id always included."""
+    async with test_db() as session:
+        from app.models.project import Project
+        from app.models.task import Task
+
+        project = Project(name="Board Project", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        task = Task(title="Card", project_id=project.id, assignee_id=test_user.id)
+        session.add(task)
+        await session.commit()
+        project_id, task_id = project.id, task.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    board_fields = "title,status,priority,assignee_id"
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks", headers=headers, params={"fields": board_fields}
+    )
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {"id": task_id, "title": "Card", "status": "open", "priority": "medium", "assignee_id": test_user.id}
+    ]
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks/{task_id}", headers=headers, params={"fields": "title"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": task_id, "title": "Card"}
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks", headers=headers, params={"fields": "title,hashed_password"}
+    )
+    assert response.status_code == 400
+
+
+
+@pytest.mark.asyncio
+async def test_msgpack_content_negotiation(client:AsyncClient, test_token, test_db, test_user, monkeypatch):
+    """Test that Accept: application/msgpack gets the same content as JSON, pages and export alike."""
+    import msgpack
+    from app.core.config import get_settings
+
+    # Export across several keyset batches
+    monkeypatch.setattr(get_settings(), "export_batch_size", 2)
+
+    async with test_db() as session:
+        from app.models.project import Project
+        from app.models.task import Task
+
+        project = Project(name="Wire Project", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        session.add_all([Task(title=f"Task {i}", project_id=project.id) for i in range(3)])
+        await session.commit()
+        project_id = project.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    msgpack_headers = {**headers, "Accept": "application/msgpack"}
+
+    as_json = await client.get(f"/api/v1/projects/{project_id}/tasks", headers=headers)
+    as_msgpack = await client.get(f"/api/v1/projects/{project_id}/tasks", headers=msgpack_headers)
+    assert as_json.headers["content-type"] == "application/json"
+    assert as_msgpack.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.content) == as_json.json()
+
+    # Routes returning models are negotiated too
+    response = await client.get(f"/api/v1/projects/{project_id}", headers=msgpack_headers)
+    assert msgpack.unpackb(response.content)["name"] == "Wire Project"
+
+    response = await client.get(f"/api/v1/projects/{project_id}/tasks/export", headers=headers)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert [t["title"] for t in exported] == ["Task 0", "Task 1", "Task 2"]
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks/export", headers=msgpack_headers, params={"fields": "title"}
+    )
+    assert list(msgpack.Unpacker(io.BytesIO(response.content))) == [
+        {"id": t["id"], "title": t["title"]} for t in exported
+    ]
+
+
+def test_negotiate_media_type():
+    """Test Accept header negotiation between JSON and MessagePack."""
+    from app.core.serialization import negotiate_media_type
+
+    assert negotiate_media_type(None) == "application/json"
+    assert negotiate_media_type("*/*") == "application/json"
+    assert negotiate_media_type("application/x-msgpack") == "application/msgpack"
+    assert negotiate_media_type("application/json;q=0.5, application/msgpack") == "application/msgpack"
+    assert negotiate_media_type("application/msgpack;q=0.2, application/json") == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_by_ids(client:AsyncClient, test_token, admin_token, test_db, test_user, test_admin_user):
+    """Multi-get keeps request order and leaves out missing tasks and tasks of others' projects."""
+    async with test_db() as session:
+        from app.models.project import Project
+        from app.models.task import Task
+
+        mine = Project(name="Mine", owner_id=test_user.id)
+        theirs = Project(name="Theirs", owner_id=test_admin_user.id)
+        session.add_all([mine, theirs])
+        await session.commit()
+        first = Task(title="First", project_id=mine.id)
+        second = Task(title="Second", project_id=mine.id)
+        hidden = Task(title="Hidden", project_id=theirs.id)
+        session.add_all([first, second, hidden])
+        await session.commit()
+        ids = f"{second.id},{hidden.id},999999,{first.id},{second.id}"
+
+    response = await client.get(
+        f"/api/v1/tasks?ids={ids}&fields=title",
+        headers={"Authorization": f"Bearer {test_token}"}
+    )
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()["items"]] == ["Second", "First"]
+    assert response.json()["total"] == 2
+
+    response = await client.get(f"/api/v1/tasks?ids={ids}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert [task["title"] for task in response.json()["items"]] == ["Second", "Hidden", "First"]
+
+    for bad in ("", "1,x", ",".join(str(n) for n in range(101))):
+        response = await client.get(f"/api/v1/tasks?ids={bad}", headers={"Authorization": f"Bearer {test_token}"})
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_lookups_are_batched(test_db, test_user):
+    """Concurrent get_by_id calls share one IN query, and repeats are served from the session."""
+    import asyncio
+    from app.core import query_stats
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.repository.task_repository import TaskRepository
+
+    async with test_db() as session:
+        project = Project(name="Loaded", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        tasks = [Task(title=f"Task {n}", project_id=project.id) for n in range(3)]
+        session.add_all(tasks)
+        await session.commit()
+        task_ids = [task.id for task in tasks]
+
+    async with test_db() as session:
+        repo = TaskRepository(session)
+        with query_stats.track_queries() as stats:
+            found = await asyncio.gather(*[repo.get_by_id(task_id) for task_id in [*task_ids, 999999]])
+            again = await repo.get_by_id(task_ids[0])
+        assert stats.count == 1
+        assert [task.title if task else None for task in found] == ["Task 0", "Task 1", "Task 2", None]
+        assert again is found[0]
+
+        await repo.delete(task_ids[1])
+        assert await repo.get_by_id(task_ids[1]) is None
+
+
+@pytest.mark.asyncio
+async def test_update_task_compare_and_set(client:AsyncClient, test_token, test_db, test_user, test_admin_user):
+    """Updates carry a version: a stale If-Match gets 409, and nothing is read before the UPDATE."""
+    from app.core import query_stats
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.services.task_service import TaskService
+    from app.core.constants import TaskStatusEnum
+
+    async with test_db() as session:
+        project = Project(name="Board", owner_id=test_user.id)
+        other = Project(name="Elsewhere", owner_id=test_admin_user.id)
+        session.add_all([project, other])
+        await session.commit()
+        task = Task(title="Card", project_id=project.id)
+        hidden = Task(title="Not mine", project_id=other.id)
+        session.add_all([task, hidden])
+        await session.commit()
+        project_id, task_id, hidden_id, other_id = project.id, task.id, hidden.id, other.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    url = f"/api/v1/projects/{project_id}/tasks/{task_id}"
+    first = await client.put(url, headers={**headers, "If-Match": '"1"'}, json={"status": "in_progress"})
+    assert first.status_code == 200
+    assert first.json()["version"] == 2
+    assert first.headers["etag"] == '"2"'
+
+    stale = await client.put(url, headers={**headers, "If-Match": '"1"'}, json={"title": "Overwritten"})
+    assert stale.status_code == 409
+    assert stale.headers["etag"] == '"2"'
+
+    second = await client.put(url, headers=headers, json={"title": "Renamed", "version": 2})
+    assert second.status_code == 200
+    assert (second.json()["title"], second.json()["version"]) == ("Renamed", 3)
+
+    unversioned = await client.put(url, headers=headers, json={"priority": "high"})
+    assert unversioned.json()["version"] == 4
+
+    disagree = await client.put(url, headers={**headers, "If-Match": '"4"'}, json={"title": "x", "version": 3})
+    assert disagree.status_code == 400
+    malformed = await client.put(url, headers={**headers, "If-Match": "*"}, json={"title": "x"})
+    assert malformed.status_code == 400
+
+    forbidden = await client.put(f"/api/v1/projects/{other_id}/tasks/{hidden_id}", headers=headers, json={"title": "x"})
+    assert forbidden.status_code == 403
+    wrong_project = await client.put(f"/api/v1/projects/{other_id}/tasks/{task_id}", headers=headers, json={"title": "x"})
+    assert wrong_project.status_code == 404
+
+    async with test_db() as session:
+        with query_stats.track_queries() as stats:
+            updated = await TaskService(session).update_task(
+                task_id, user_id=test_user.id, user_role=test_user.role, version=4, status=TaskStatusEnum.COMPLETED
+            )
+        assert updated.version == 5
+        # Old rollup bucket out (reporting the bucket), guarded UPDATE, new bucket in
+        assert [statement.split()[0] for statement in stats.statements] == ["INSERT", "UPDATE", "INSERT"]
+
+
+
+@pytest.mark.asyncio
+async def test_list_project_tasks_matches_response_schema(client:AsyncClient, test_token, test_db, test_user):
+    """Test that the column-row fast path encodes exactly what the response schema would."""
+    from sqlalchemy import select
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.schemas import TaskResponse
+
+    async with test_db() as session:
+        project = Project(name="Test Project", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        session.add_all(Task(title=f"Task {i}", project_id=project.id) for i in range(3))
+        await session.commit()
+        project_id = project.id
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks",
+        headers={"Authorization": f"Bearer {test_token}"}
+    )
+    async with test_db() as session:
+        tasks = (await session.execute(select(Task).order_by(Task.created_at.desc(), Task.id.desc()))).scalars().all()
+    assert response.json()["items"] == [TaskResponse.model_validate(t).model_dump(mode="json") for t in tasks]
+
+
+
+@pytest.mark.asyncio
+async def test_update_task_moves_updated_at(client:AsyncClient, test_token, test_db, test_user):
+    """Test that an update refreshes updated_at, so updated_after lists find the task."""
+    from app.models.project import Project
+    from app.models.task import Task
+
+    async with test_db() as session:
+        project = Project(name="Test Project", owner_id=test_user.id)
+        session.add(project)
+        await session.commit()
+        task = Task(title="Test Task", project_id=project.id, assignee_id=test_user.id, updated_at=datetime(2020, 1, 1))
+        session.add(task)
+        await session.commit()
+        project_id, task_id = project.id, task.id
+
+    headers = {"Authorization": f"Bearer {test_token}"}
+    response = await client.put(f"/api/v1/projects/{project_id}/tasks/{task_id}", headers=headers, json={"status": "in_progress"})
+    assert response.status_code == 200
+
+    response = await client.get(
+        f"/api/v1/projects/{project_id}/tasks",
+        headers=headers,
+        params={"updated_after": "2021-01-01T00:00:00"}
+    )
+    assert [t["id"] for t in response.json()["items"]] == [task_id]
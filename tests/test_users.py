@@ -85,4 +85,130 @@ async  def  test_cannot_update_user_profile(client:AsyncClient, test_token, test
         }
     )
 
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_deactivate_user_hands_off_work(
+        client:AsyncClient, test_token, admin_token, test_db, test_user, test_admin_user, monkeypatch
+):
+    """Test that deactivation reassigns open tasks, transfers projects and drops memberships in batches."""
+    from sqlalchemy import select, func
+    from app.core.config import get_settings
+    from app.core.constants import TaskStatusEnum
+    from app.models.project import Project
+    from app.models.project_member import ProjectMember
+    from app.models.task import Task
+    from app.models.task_rollup import TaskRollup
+    from app.repository.task_repository import TaskRepository
+    from app.services.job_worker import JobWorkerPool
+
+    async with test_db() as session:
+        owned = Project(name="Owned", owner_id=test_user.id)
+        other = Project(name="Other", owner_id=test_admin_user.id)
+        session.add_all([owned, other])
+        await session.commit()
+        session.add(ProjectMember(project_id=other.id, user_id=test_user.id))
+        await session.commit()
+        repo = TaskRepository(session)
+        for i in range(5):
+            await repo.create(title=f"T{i}", description=None, project_id=owned.id, assignee_id=test_user.id)
+        done = await repo.create(title="Done", description=None, project_id=other.id, assignee_id=test_user.id)
+        await repo.update(done.id, status=TaskStatusEnum.COMPLETED)
+
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await client.delete(
+        f"/api/v1/users/{test_user.id}", headers=admin_headers, params={"reassign_to": test_user.id}
+    )
+    assert response.status_code == 400
+
+    response = await client.delete(
+        f"/api/v1/users/{test_user.id}",
+        headers=admin_headers,
+        params={"reassign_to": test_admin_user.id, "transfer_projects_to": test_admin_user.id}
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    # Locked out before the job ran
+    response = await client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 401
+
+    monkeypatch.setattr(get_settings(), "user_deactivation_batch_size", 2)
+    assert await JobWorkerPool(session_factory=test_db).run_once()
+    response = await client.get(f"/api/v1/jobs/{job_id}", headers=admin_headers)
+    assert response.json()["status"] == "succeeded"
+    assert response.json()["result"] == {"memberships": 1, "tasks": 5, "projects": 1}
+
+    async with test_db() as session:
+        assignees = dict((await session.execute(select(Task.title, Task.assignee_id))).all())
+        assert assignees.pop("Done") == test_user.id
+        assert set(assignees.values()) == {test_admin_user.id}
+        assert (await session.get(Project, owned.id)).owner_id == test_admin_user.id
+        owners = (await session.execute(select(TaskRollup.owner_id).distinct())).scalars().all()
+        assert owners == [test_admin_user.id]
+        members = await session.execute(select(func.count()).select_from(ProjectMember))
+        assert members.scalar() == 0
+
+
+
+@pytest.mark.asyncio
+async def test_deactivate_user_never_assigns_tasks_to_outsiders(
+        client:AsyncClient, admin_token, test_db, test_user, test_admin_user
+):
+    """Test that open tasks of projects the new assignee cannot see are unassigned, not handed to them."""
+    from sqlalchemy import select
+    from app.models.project import Project
+    from app.models.project_member import ProjectMember
+    from app.models.task import Task
+    from app.repository.task_repository import TaskRepository
+    from app.services.job_worker import JobWorkerPool
+
+    async with test_db() as session:
+        shared = Project(name="Shared", owner_id=test_admin_user.id)
+        private = Project(name="Private", owner_id=test_user.id)
+        session.add_all([shared, private])
+        await session.commit()
+        session.add(ProjectMember(project_id=shared.id, user_id=test_user.id))
+        await session.commit()
+        repo = TaskRepository(session)
+        await repo.create(title="Shared task", description=None, project_id=shared.id, assignee_id=test_user.id)
+        await repo.create(title="Private task", description=None, project_id=private.id, assignee_id=test_user.id)
+
+    # Private is archived, not transferred: the admin never gets access to it
+    response = await client.delete(
+        f"/api/v1/users/{test_user.id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"reassign_to": test_admin_user.id}
+    )
+    assert response.status_code == 202
+    assert await JobWorkerPool(session_factory=test_db).run_once()
+
+    async with test_db() as session:
+        assignees = dict((await session.execute(select(Task.title, Task.assignee_id))).all())
+    assert assignees == {"Shared task": test_admin_user.id, "Private task": None}
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_sparse_fields(client:AsyncClient, test_token, test_user):
+    """Test that /users/me honours ?fields=."""
+    response = await client.get(
+        "/api/v1/users/me",
+        headers={"Authorization": f"Bearer {test_token}"},
+        params={"fields": "username"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": test_user.id, "username": test_user.username}
+
+
+@pytest.mark.asyncio
+async def test_get_users_by_ids(client:AsyncClient, test_token, admin_token, test_user, test_admin_user):
+    """Admins multi-get anyone in request order; other users only themselves."""
+    ids = f"{test_admin_user.id},999999,{test_user.id}"
+    response = await client.get(f"/api/v1/users?ids={ids}&fields=username", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert [user["username"] for user in response.json()["items"]] == ["admin", "testuser"]
+
+    response = await client.get(f"/api/v1/users?ids={ids}", headers={"Authorization": f"Bearer {test_token}"})
+    assert response.status_code == 200
+    assert [user["id"] for user in response.json()["items"]] == [test_user.id]